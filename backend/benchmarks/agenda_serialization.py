@@ -0,0 +1,73 @@
+"""
+Serialization cost of large multi-day agendas: stdlib json + dicts vs. the
+typed models in services/models.py (and orjson when installed).
+
+    cd backend
+    PYTHONPATH=. python3 benchmarks/agenda_serialization.py
+"""
+import json
+import timeit
+
+from services.models import Agenda
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+REPEAT = 50
+
+
+def _agenda_json(days: int) -> str:
+    return json.dumps({
+        "title": "Quarterly Program",
+        "summary": "Long multi-day program.",
+        "days": [
+            {
+                "date": f"2025-01-{d % 28 + 1:02d}",
+                "start_time": "08:30",
+                "end_time": "17:30",
+                "items": [
+                    {
+                        "time_slot": f"{h:02d}:00 - {h:02d}:45",
+                        "title": f"Session {d}-{h}",
+                        "description": "Discuss progress, risks and next steps.",
+                        "duration": "45 mins",
+                        "type": "work",
+                    }
+                    for h in range(8, 18)
+                ],
+            }
+            for d in range(days)
+        ],
+    }, indent=2)
+
+
+def _per_call_ms(stmt) -> float:
+    return min(timeit.repeat(stmt, number=REPEAT, repeat=3)) / REPEAT * 1000
+
+
+def run_benchmark() -> None:
+    print(f"{'days':>5} {'KiB':>6} | {'json.loads':>10} {'validate':>9} {'orjson':>8} | "
+          f"{'json.dumps':>10} {'dump_json':>9} {'orjson':>8}   (ms per call)")
+    for days in (5, 30, 120):
+        raw = _agenda_json(days)
+        data = json.loads(raw)
+        model = Agenda.model_validate_json(raw)
+
+        parse_json = _per_call_ms(lambda: json.loads(raw))
+        parse_model = _per_call_ms(lambda: Agenda.model_validate_json(raw))
+        encode_json = _per_call_ms(lambda: json.dumps(data))
+        encode_model = _per_call_ms(lambda: model.model_dump_json(exclude_none=True))
+        if orjson is not None:
+            parse_orjson = f"{_per_call_ms(lambda: orjson.loads(raw)):8.3f}"
+            encode_orjson = f"{_per_call_ms(lambda: orjson.dumps(data)):8.3f}"
+        else:
+            parse_orjson = encode_orjson = f"{'n/a':>8}"
+
+        print(f"{days:>5} {len(raw) / 1024:>6.0f} | {parse_json:>10.3f} {parse_model:>9.3f} {parse_orjson} | "
+              f"{encode_json:>10.3f} {encode_model:>9.3f} {encode_orjson}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,50 @@
+"""
+Throughput of bulk scheduling vs. one calculate_time_slots call per meeting.
+
+    cd backend
+    PYTHONPATH=. python3 benchmarks/bulk_schedule.py
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from services import bulk_scheduler
+from services.time_slot_calculator import calculate_time_slots
+
+MEETINGS = 100_000
+
+
+def _meetings(count: int):
+    rng = random.Random(7)
+    base = datetime(2025, 1, 6, 8, 0)
+    starts, ends = [], []
+    for _ in range(count):
+        start = base + timedelta(days=rng.randrange(365), minutes=15 * rng.randrange(40))
+        # Mostly same-day meetings, some workshops spanning a few days
+        length = rng.choice([30, 60, 90, 180, 240, 480]) if rng.random() < 0.9 else 1440 * rng.randrange(1, 4)
+        starts.append(start.isoformat())
+        ends.append((start + timedelta(minutes=length)).isoformat())
+    return starts, ends
+
+
+def run_benchmark() -> None:
+    starts, ends = _meetings(MEETINGS)
+
+    started = time.perf_counter()
+    columns = bulk_scheduler.bulk_time_slots(starts, ends)
+    bulk_seconds = time.perf_counter() - started
+
+    sample = 10_000
+    started = time.perf_counter()
+    for start, end in zip(starts[:sample], ends[:sample]):
+        calculate_time_slots(start, end)
+    loop_seconds = (time.perf_counter() - started) * MEETINGS / sample
+
+    mode = "numpy" if bulk_scheduler.np is not None else "fallback (no numpy)"
+    print(f"{MEETINGS} meetings, {len(columns['slots']['day'])} slots")
+    print(f"bulk_time_slots [{mode}]: {bulk_seconds:.2f}s ({MEETINGS / bulk_seconds:,.0f} meetings/s)")
+    print(f"calculate_time_slots loop:  {loop_seconds:.2f}s ({MEETINGS / loop_seconds:,.0f} meetings/s, extrapolated)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,108 @@
+"""
+Event-loop latency under mixed load, with CPU stages inline vs. on the worker pool.
+
+Runs large multi-day ICS exports concurrently with cheap /health calls and a
+probe that measures how late the event loop wakes up from short sleeps.
+
+    cd backend
+    PYTHONPATH=. python3 benchmarks/event_loop_latency.py
+"""
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, timedelta
+
+import main
+from services import worker_pool
+
+EXPORTS = 24
+HEALTH_CALLS = 200
+PROBE_INTERVAL = 0.002
+
+
+def _large_agenda(days: int = 60) -> str:
+    start = date(2025, 1, 6)
+    return json.dumps({
+        "title": "Quarterly Program",
+        "summary": "Long multi-day program used to stress ICS rendering.",
+        "days": [
+            {
+                "date": (start + timedelta(days=d)).isoformat(),
+                "items": [
+                    {
+                        "time_slot": f"{h:02d}:00 - {h:02d}:45",
+                        "title": f"Session {d}-{h} introduction and wrap up",
+                        "duration": "45 mins",
+                        "description": "Discuss progress, risks and next steps in detail. " * 4,
+                    }
+                    for h in range(8, 18)
+                ],
+            }
+            for d in range(days)
+        ],
+    })
+
+
+async def _probe(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def _export(agenda: str, index: int) -> None:
+    await main.create_ics(
+        topic=f"Program {index}",
+        start_time="2025-01-06T08:30:00",
+        end_time="2025-03-06T17:30:00",
+        location="HQ",
+        agenda_content=agenda,
+        recurrence=None,
+        if_none_match=None,
+    )
+
+
+async def _health_calls(latencies: list) -> None:
+    for _ in range(HEALTH_CALLS):
+        started = time.perf_counter()
+        await main.health_check()
+        await asyncio.sleep(0)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.001)
+
+
+async def _run(kind: str) -> dict:
+    worker_pool.configure(kind=kind)
+    agenda = _large_agenda()
+    stop = asyncio.Event()
+    lags, health = [], []
+    probe = asyncio.create_task(_probe(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(_health_calls(health), *(_export(agenda, i) for i in range(EXPORTS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    worker_pool.shutdown()
+    lags.sort()
+    return {
+        "mode": kind,
+        "wall_s": elapsed,
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+        "health_max_ms": max(health),
+    }
+
+
+def run_benchmark() -> None:
+    print(f"{EXPORTS} concurrent ICS exports + {HEALTH_CALLS} health calls")
+    print(f"{'mode':<8} {'wall s':>8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9} {'health max':>11}")
+    for kind in ("inline", "thread", "process"):
+        r = asyncio.run(_run(kind))
+        print(f"{r['mode']:<8} {r['wall_s']:>8.2f} {r['lag_p50_ms']:>8.1f}ms {r['lag_p99_ms']:>8.1f}ms "
+              f"{r['lag_max_ms']:>8.1f}ms {r['health_max_ms']:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
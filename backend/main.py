@@ -1,13 +1,66 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import Response
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response
+from pydantic_core import to_json
+import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Optional
-from services.agenda_generator import generate_agenda_content
-from icalendar import Calendar, Event, vText
 from datetime import datetime
+from services.agenda_generator import BILINGUAL_LANGUAGES, generate_agenda_content, translate_agenda
+from services.ics_builder import build_ics, build_ics_filename
+from services.time_slot_calculator import calculate_time_slots
+from services.busy_calendar import attendee_calendar_paths, build_busy_index, spool_to_paths
+from services.recurrence import series_occurrences, series_variations
+from services.attachments import extract_attachments, extract_stored_attachments
+from services.email_compaction import COMPACTION_ENABLED, compact_context
+from services.attachment_store import AttachmentNotFound, AttachmentTooLarge, attachment_store, is_content_hash
+from services.worker_pool import WorkerPoolFull, pool_stats, run_cpu, uses_processes
+from services.agenda_store import AgendaNotFound, VersionConflict, agenda_store
+from services.model_router import model_stats
+from services.output_budget import OutputTruncated, budget_stats
+from services.deadlines import ClientDisconnected, DeadlineExceeded, deadline_scope, parse_timeout, run_cancellable
+from services.models import (
+    AgendaTranslation,
+    BulkScheduleRequest,
+    ContextCompaction,
+    GenerateAgendaResponse,
+    RefineTextResponse,
+    RescheduledAgenda,
+    RescheduleStats,
+    Schedule,
+    Series,
+    StoredAgenda,
+    StoredAttachment,
+    parse_agenda,
+)
+from services.rescheduler import reschedule_agenda
+from services.schedule_preview import preview_stats, schedule_preview
+from services.bulk_scheduler import MAX_MEETINGS, TooManyMeetingDays, bulk_time_slots, schedules_from_columns
+from services import profiling
+from services.tracing import TracingMiddleware, span
+from services.profiling import ProfilingMiddleware, load_profile, sampling_profile, set_sampling
+from services.http_cache import (
+    COMPRESSION_MIN_BYTES,
+    GENERATE_ETAG_CACHE_SIZE,
+    ICS_MAX_AGE_SECONDS,
+    CompressionMiddleware,
+    EtagCache,
+    content_etag,
+    etag_matches,
+    not_modified,
+)
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Agenda Planner API")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Walking the attachment directory can take a while; do it once, off the event loop
+    await asyncio.to_thread(attachment_store.load_index)
+    yield
+
+app = FastAPI(title="Agenda Planner API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,45 +68,251 @@ app.add_middleware(
     allow_credentials=False,  # Must be False when allow_origins is ["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Content-Disposition", "X-Profile-Id", "X-Trace-Id"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES, compresslevel=6)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+
+# Request fingerprint -> ETag of the latest agenda generated for it
+generate_etags = EtagCache(GENERATE_ETAG_CACHE_SIZE)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "worker_pool": pool_stats(),
+        "schedule_preview_cache": preview_stats(),
+        "models": model_stats(),
+        "output_budget": budget_stats(),
+        "attachments": await asyncio.to_thread(attachment_store.stats),
+    }
+
+async def load_busy_index(start_time: str, end_time: str, calendars: Optional[List[UploadFile]], attendees: Optional[str]):
+    """Build the busy index for uploaded calendars and named attendees (None if neither given)."""
+    # Uploads are parsed straight from their spooled files inside the worker,
+    # line by line, so a large calendar is never read into memory at once.
+    uploads = []
+    for calendar in calendars or []:
+        await calendar.seek(0)
+        uploads.append(calendar.file)
+    sources = []
+    if attendees:
+        try:
+            sources.extend(attendee_calendar_paths(attendees.split(",")))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if not uploads and not sources:
+        return None
+    window = (
+        datetime.fromisoformat(start_time.replace('Z', '')),
+        datetime.fromisoformat(end_time.replace('Z', '')),
+    )
+    # Worker processes cannot receive open files: hand them on-disk copies
+    spooled = await asyncio.to_thread(spool_to_paths, uploads) if uploads and uses_processes() else []
+    try:
+        with span("calendars.index", calendars=len(uploads) + len(sources)):
+            return await run_cpu(build_busy_index, (spooled or uploads) + sources, window)
+    finally:
+        for path in spooled:
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+
+def json_response(model, headers: Optional[dict] = None) -> Response:
+    """Encode a response model once (pydantic's Rust serializer) and send it as-is."""
+    return Response(content=model.model_dump_json(exclude_none=True), media_type="application/json", headers=headers)
 
-@app.post("/generate-agenda")
+def normalize_agenda_content(content: str) -> str:
+    """Re-encode valid agenda JSON; free text (e.g. edited plain agendas) is stored unchanged."""
+    agenda = parse_agenda(content)
+    return agenda.to_json() if agenda is not None else content
+
+@app.post("/generate-agenda", response_model=GenerateAgendaResponse, response_model_exclude_none=True)
 async def generate_agenda(
+    request: Request,
     topic: str = Form(...),
     start_time: str = Form(...),
     end_time: str = Form(...),
     language: str = Form("DE"),
     email_content: Optional[str] = Form(None),
-    files: List[UploadFile] = File(None)
+    files: List[UploadFile] = File(None),
+    attachment_hashes: Optional[str] = Form(None),
+    calendars: List[UploadFile] = File(None),
+    attendees: Optional[str] = Form(None),
+    recurrence: Optional[str] = Form(None),
+    variations: bool = Form(False),
+    location: Optional[str] = Form(None),
+    if_none_match: Optional[str] = Header(None),
+    x_request_timeout: Optional[str] = Header(None)
 ):
     try:
+        busy = await load_busy_index(start_time, end_time, calendars, attendees)
+
+        # A series is generated once from its first occurrence
+        occurrences = None
+        if recurrence:
+            try:
+                occurrences = series_occurrences(recurrence, start_time)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
         file_contents = []
         if files:
-            for file in files:
-                content = await file.read()
-                try:
-                    file_contents.append(content.decode("utf-8"))
-                except UnicodeDecodeError:
-                    file_contents.append(f"[Binary file: {file.filename}]")
-
-        agenda = await generate_agenda_content(topic, start_time, end_time, language, email_content, file_contents)
-        return {"agenda": agenda}
+            uploads = [(file.filename, await file.read()) for file in files]
+            file_contents = await extract_attachments(uploads)
+        if attachment_hashes:
+            # Attachments uploaded earlier via POST /attachments, referenced by content hash
+            hashes = [value.strip().lower() for value in attachment_hashes.split(",") if value.strip()]
+            try:
+                file_contents += await extract_stored_attachments(hashes, attachment_store)
+            except AttachmentNotFound as e:
+                raise HTTPException(status_code=404, detail=str(e))
+
+        # Quoted history, signatures, footers and repeated passages only cost prompt time
+        compaction = None
+        if COMPACTION_ENABLED and (email_content or file_contents):
+            with span("context.compact") as compact_span:
+                email_content, file_contents, compaction = await run_cpu(compact_context, email_content, file_contents)
+                compact_span.set(**compaction)
+
+        # A client that already holds the latest result for these exact inputs
+        # (e.g. a polling view) gets a 304 instead of a fresh LLM run.
+        busy_key = repr(busy.intervals()) if busy else ""
+        request_key = content_etag(
+            topic, start_time, end_time, language, email_content, busy_key, recurrence, str(variations), *file_contents
+        )
+        cached_etag = generate_etags.get(request_key)
+        if cached_etag and etag_matches(if_none_match, cached_etag):
+            return not_modified(cached_etag)
+
+        # language=BOTH: generate once, then translate only the text fields
+        bilingual = language.upper() == "BOTH"
+        primary_language = BILINGUAL_LANGUAGES[0] if bilingual else language
+        async def generate_variants():
+            agenda = await generate_agenda_content(
+                topic, start_time, end_time, primary_language, email_content, file_contents, busy, recurrence
+            )
+            translations = {}
+            if bilingual:
+                for target in BILINGUAL_LANGUAGES[1:]:
+                    translations[target] = await translate_agenda(agenda, target)
+            return agenda, translations
+
+        # LLM work stops when the client goes away or the deadline passes
+        with deadline_scope(parse_timeout(x_request_timeout)):
+            agenda, translations = await run_cancellable(request, generate_variants())
+
+        # Persist so later exports can reference the agenda by ID, and with the
+        # context it was written from so a rescheduled agenda can be regenerated
+        context = None
+        if email_content or file_contents:
+            context = {"email_content": email_content, "file_contents": file_contents}
+        record = await asyncio.to_thread(
+            agenda_store.create, agenda, topic, start_time, end_time, location or "TBD", primary_language, recurrence,
+            context,
+        )
+        result = GenerateAgendaResponse(
+            agenda=agenda, agenda_id=record["id"], version=record["version"], language=primary_language,
+            context_compaction=ContextCompaction(**compaction) if compaction else None,
+        )
+        if bilingual:
+            result.translations = []
+            for target, translated in translations.items():
+                if translated is None:
+                    result.untranslated = (result.untranslated or []) + [target]
+                    continue
+                translated_record = await asyncio.to_thread(
+                    agenda_store.create,
+                    translated, topic, start_time, end_time, location or "TBD", target, recurrence, context
+                )
+                result.translations.append(AgendaTranslation(
+                    language=target, agenda=translated,
+                    agenda_id=translated_record["id"], version=translated_record["version"],
+                ))
+        if occurrences is not None:
+            result.series = Series(
+                recurrence=recurrence,
+                occurrences=occurrences,
+                variations=series_variations(agenda, occurrences) if variations else None,
+            )
+
+        response = json_response(result)
+        etag = content_etag(response.body)
+        response.headers["ETag"] = etag
+        generate_etags.put(request_key, etag)
+        return response
+    except HTTPException:
+        raise
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except DeadlineExceeded as e:
+        # Partial JSON is not a usable agenda, but lets the client show progress
+        raise HTTPException(status_code=504, detail={"error": str(e), "partial": e.partial})
+    except OutputTruncated as e:
+        # An agenda cut off mid-JSON is incomplete; the partial text is only for display
+        raise HTTPException(status_code=502, detail={"error": str(e), "partial": e.partial})
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/refine-text")
+@app.post("/refine-text", response_model=RefineTextResponse, response_model_exclude_none=True)
 async def refine_text(
+    request: Request,
     text: str = Form(...),
-    instruction: Optional[str] = Form(None)
+    instruction: Optional[str] = Form(None),
+    x_request_timeout: Optional[str] = Header(None)
 ):
     try:
         from services.agenda_generator import refine_agenda_text
-        refined_text = await refine_agenda_text(text, instruction)
-        return {"refined_text": refined_text}
+        with deadline_scope(parse_timeout(x_request_timeout)):
+            refined_text = await run_cancellable(request, refine_agenda_text(text, instruction))
+        return RefineTextResponse(refined_text=refined_text)
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except DeadlineExceeded as e:
+        if e.partial.strip():
+            return RefineTextResponse(refined_text=e.partial.strip(), partial=True)
+        raise HTTPException(status_code=504, detail=str(e))
+    except OutputTruncated as e:
+        if e.partial.strip():
+            return RefineTextResponse(refined_text=e.partial.strip(), partial=True)
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/schedule-preview", response_model=Schedule, response_model_exclude_none=True)
+async def get_schedule_preview(
+    start_time: str,
+    end_time: str,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Deterministic slot layout for a time range, without calling the LLM."""
+    try:
+        body, etag = schedule_preview(start_time, end_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@app.post("/bulk-schedule")
+async def bulk_schedule(request: BulkScheduleRequest):
+    """Slot layouts for many meetings in one call (no attendee calendars, no LLM)."""
+    if len(request.start_times) > MAX_MEETINGS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_MEETINGS} meetings per request")
+    try:
+        columns = await run_cpu(bulk_time_slots, request.start_times, request.end_times)
+        if request.format == "meetings":
+            result = {"schedules": schedules_from_columns(columns)}
+        else:
+            result = {"count": len(request.start_times), **columns}
+        return Response(content=to_json(result), media_type="application/json")
+    except TooManyMeetingDays as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -63,10 +322,12 @@ async def create_ics_get(
     start_time: str,
     end_time: str,
     location: str,
-    agenda_content: str
+    agenda_content: str,
+    recurrence: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
     # Call the POST version with the same logic
-    return await create_ics(topic, start_time, end_time, location, agenda_content)
+    return await create_ics(topic, start_time, end_time, location, agenda_content, recurrence, if_none_match)
 
 @app.post("/create-ics")
 async def create_ics(
@@ -74,158 +335,260 @@ async def create_ics(
     start_time: str = Form(...),
     end_time: str = Form(...),
     location: str = Form(...),
-    agenda_content: str = Form(...)
+    agenda_content: str = Form(...),
+    recurrence: Optional[str] = Form(None),
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
-        # Parse times to create filename
-        try:
-            start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
-            year = start_dt.year
-            month = str(start_dt.month).zfill(2)
-            day = str(start_dt.day).zfill(2)
-            hours = str(start_dt.hour).zfill(2)
-            minutes = str(start_dt.minute).zfill(2)
-            
-            # Sanitize topic for filename
-            import re
-            sanitized_topic = re.sub(r'[^a-zA-Z0-9\s]', '', topic).strip()
-            sanitized_topic = re.sub(r'\s+', ' ', sanitized_topic)[:50]
-            
-            filename = f"{year}-{month}-{day} {hours}-{minutes} {sanitized_topic}.ics"
-        except:
-            filename = "meeting_agenda.ics"
-        
-        cal = Calendar()
-        cal.add('prodid', '-//Agenda Planner//mxm.dk//')
-        cal.add('version', '2.0')
-
-        event = Event()
-        event.add('summary', topic)
-        
-        # Parse times (assuming local ISO strings from frontend)
-        end_dt = datetime.fromisoformat(end_time.replace('Z', ''))
-        
-        event.add('dtstart', start_dt)
-        event.add('dtend', end_dt)
-        event.add('dtstamp', datetime.now())
-        event.add('location', vText(location))
-        
-        # Format agenda content as plain text with simple formatting
-        try:
-            import json
-            agenda_data = json.loads(agenda_content)
-            
-            # Helper for emojis (duplicate of frontend logic for consistency)
-            def get_icon(title):
-                lower = title.lower()
-                if 'coffee' in lower or 'kaffee' in lower: return '☕'
-                if 'lunch' in lower or 'mittag' in lower: return '🍽️'
-                if 'dinner' in lower or 'social' in lower or 'abendessen' in lower or 'sozial' in lower: return '🍻'
-                if 'break' in lower or 'pause' in lower: return '🧘'
-                if 'intro' in lower: return '👋'
-                if 'conclu' in lower or 'wrap' in lower: return '🏁'
-                return '📅'
-
-            # Build plain text description
-            text_parts = []
-            text_parts.append(agenda_data.get('title', 'Meeting Agenda').upper())
-            text_parts.append("=" * len(text_parts[0]))
-            text_parts.append("")
-            
-            if 'summary' in agenda_data:
-                text_parts.append(agenda_data['summary'])
-                text_parts.append("")
-            
-            # Handle Multi-day
-            if 'days' in agenda_data:
-                for i, day in enumerate(agenda_data['days']):
-                    text_parts.append(f"DAY {i+1} - {day.get('date', '')}")
-                    text_parts.append("-" * 40)
-                    
-                    for item in day.get('items', []):
-                        time_slot = item.get('time_slot', '')
-                        title = item.get('title', '')
-                        duration = item.get('duration', '')
-                        description = item.get('description', '')
-                        
-                        # Format each item
-                        icon = get_icon(title)
-                        formatted_title = f"{icon} {title.upper()}"
-                        
-                        if time_slot:
-                            header = f"{time_slot} - {formatted_title}"
-                            if duration:
-                                # Remove redundant 'mins' if present in duration string
-                                clean_duration = duration.replace(' mins', '').replace(' min', '')
-                                header += f" ({clean_duration} min)"
-                            text_parts.append(header)
-                        else:
-                            text_parts.append(f"* {formatted_title}")
-                            
-                        if description:
-                            # Keep description very short (max 100 chars or first sentence)
-                            short_desc = description.split('.')[0] + "."
-                            if len(short_desc) > 100:
-                                short_desc = short_desc[:97] + "..."
-                            text_parts.append(f"  {short_desc}")
-                        text_parts.append("")
-                    text_parts.append("")
-            
-            # Handle Simple List or Single Day
-            elif 'items' in agenda_data:
-                text_parts.append("AGENDA ITEMS:")
-                text_parts.append("-" * 40)
-                text_parts.append("")
-                for item in agenda_data['items']:
-                    time_slot = item.get('time_slot', '')
-                    title = item.get('title', '')
-                    duration = item.get('duration', '')
-                    description = item.get('description', '')
-                    
-                    # Format each item
-                    icon = get_icon(title)
-                    formatted_title = f"{icon} {title.upper()}"
-                    
-                    if time_slot:
-                        header = f"{time_slot} - {formatted_title}"
-                        if duration:
-                            clean_duration = duration.replace(' mins', '').replace(' min', '')
-                            header += f" ({clean_duration} min)"
-                        text_parts.append(header)
-                    else:
-                        text_parts.append(f"* {formatted_title}")
-                        
-                    if description:
-                        short_desc = description.split('.')[0] + "."
-                        if len(short_desc) > 100:
-                            short_desc = short_desc[:97] + "..."
-                        text_parts.append(f"  {short_desc}")
-                    text_parts.append("")
-            
-            plain_description = "\n".join(text_parts)
-            event.add('description', plain_description)
-        except Exception as e:
-            # Fallback to plain text if JSON parsing fails
-            print(f"Error parsing agenda JSON: {e}")
-            event.add('description', agenda_content)
-        
-        cal.add_component(event)
-
-        # Use both filename and filename* for maximum compatibility
-        from urllib.parse import quote
-        encoded_filename = quote(filename)
-        
+        filename = build_ics_filename(topic, start_time)
+        # The calendar is a pure function of the inputs (DTSTAMP aside), so the
+        # ETag is derived from them and a match skips rendering entirely.
+        etag = content_etag(topic, start_time, end_time, location, agenda_content, recurrence)
+        cache_headers = {"Cache-Control": f"private, max-age={ICS_MAX_AGE_SECONDS}"}
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, cache_headers)
+
+        if recurrence:
+            try:
+                series_occurrences(recurrence, start_time, limit=1)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        with span("ics.render", cached=False):
+            ics_bytes = await run_cpu(build_ics, topic, start_time, end_time, location, agenda_content, recurrence)
+
         return Response(
-            content=cal.to_ical(),
+            content=ics_bytes,
             media_type="text/calendar",
             headers={
                 "Content-Disposition": f'inline; filename="{filename}"',
-                "Cache-Control": "no-cache"
+                "ETag": etag,
+                **cache_headers
             }
         )
+    except HTTPException:
+        raise
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def agenda_payload(record: dict) -> StoredAgenda:
+    return StoredAgenda(
+        agenda=record["content"], **{key: value for key, value in record.items() if key not in ("content", "context")}
+    )
+
+@app.post("/agendas", response_model=StoredAgenda)
+async def create_agenda(
+    topic: str = Form(...),
+    start_time: str = Form(...),
+    end_time: str = Form(...),
+    agenda_content: str = Form(...),
+    location: str = Form("TBD"),
+    language: Optional[str] = Form(None),
+    recurrence: Optional[str] = Form(None)
+):
+    record = await asyncio.to_thread(
+        agenda_store.create,
+        normalize_agenda_content(agenda_content), topic, start_time, end_time, location, language, recurrence
+    )
+    return agenda_payload(record)
+
+@app.get("/agendas/{agenda_id}", response_model=StoredAgenda)
+async def get_agenda(
+    agenda_id: str,
+    version: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        record = await asyncio.to_thread(agenda_store.get, agenda_id, version)
+    except AgendaNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    # Stored versions never change, so (id, version) is a strong validator
+    etag = content_etag(agenda_id, str(record["version"]))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(agenda_payload(record), headers={"ETag": etag})
+
+@app.put("/agendas/{agenda_id}", response_model=StoredAgenda)
+async def update_agenda(
+    agenda_id: str,
+    agenda_content: Optional[str] = Form(None),
+    topic: Optional[str] = Form(None),
+    start_time: Optional[str] = Form(None),
+    end_time: Optional[str] = Form(None),
+    location: Optional[str] = Form(None),
+    language: Optional[str] = Form(None),
+    recurrence: Optional[str] = Form(None),
+    base_version: Optional[int] = Form(None)
+):
+    try:
+        record = await asyncio.to_thread(
+            agenda_store.update,
+            agenda_id,
+            base_version,
+            content=normalize_agenda_content(agenda_content) if agenda_content is not None else None,
+            topic=topic,
+            start_time=start_time,
+            end_time=end_time,
+            location=location,
+            language=language,
+            recurrence=recurrence,
+        )
+    except AgendaNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return agenda_payload(record)
+
+@app.post("/agendas/{agenda_id}/reschedule", response_model=RescheduledAgenda)
+async def reschedule_stored_agenda(
+    request: Request,
+    agenda_id: str,
+    start_time: str = Form(...),
+    end_time: str = Form(...),
+    base_version: Optional[int] = Form(None),
+    x_request_timeout: Optional[str] = Header(None)
+):
+    """Move a stored agenda to new times, regenerating only new or resized work slots."""
+    try:
+        try:
+            calculate_time_slots(start_time, end_time)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        record = await asyncio.to_thread(agenda_store.get, agenda_id)
+        with deadline_scope(parse_timeout(x_request_timeout)):
+            content, stats = await run_cancellable(request, reschedule_agenda(
+                record["content"], record["topic"], record["language"],
+                record["start_time"], record["end_time"], start_time, end_time,
+                record["recurrence"], record["context"],
+            ))
+        updated = await asyncio.to_thread(
+            agenda_store.update,
+            agenda_id,
+            base_version if base_version is not None else record["version"],
+            content=content,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        payload = agenda_payload(updated)
+        return RescheduledAgenda(**payload.model_dump(), reschedule=RescheduleStats(**stats))
+    except AgendaNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OutputTruncated as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # The model returned items that do not fit the slots
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/agendas/{agenda_id}/ics")
+async def get_agenda_ics(
+    agenda_id: str,
+    version: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        record = await asyncio.to_thread(agenda_store.get, agenda_id, version)
+    except AgendaNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    etag = content_etag(agenda_id, str(record["version"]), "ics")
+    cache_headers = {"Cache-Control": f"private, max-age={ICS_MAX_AGE_SECONDS}"}
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_headers)
+
+    try:
+        with span("ics.render") as ics_span:
+            ics_bytes = await asyncio.to_thread(agenda_store.get_rendered_ics, agenda_id, record["version"])
+            ics_span.set(cached=ics_bytes is not None)
+            if ics_bytes is None:
+                ics_bytes = await run_cpu(
+                    build_ics, record["topic"], record["start_time"], record["end_time"],
+                    record["location"], record["content"], record["recurrence"]
+                )
+                await asyncio.to_thread(agenda_store.set_rendered_ics, agenda_id, record["version"], ics_bytes)
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    filename = build_ics_filename(record["topic"], record["start_time"])
+    return Response(
+        content=ics_bytes,
+        media_type="text/calendar",
+        headers={
+            "Content-Disposition": f'inline; filename="{filename}"',
+            "ETag": etag,
+            **cache_headers
+        }
+    )
+
+def require_profiling() -> None:
+    if not profiling.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set AGENDA_PROFILING=1)")
+
+@app.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Folded-stack profile of a request run with X-Profile: 1 (or ?profile=1)."""
+    require_profiling()
+    folded = await asyncio.to_thread(load_profile, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return PlainTextResponse(folded)
+
+@app.get("/profiling/sampling", response_class=PlainTextResponse)
+async def get_sampling_profile():
+    """Folded stacks collected by the process-wide sampler."""
+    require_profiling()
+    return PlainTextResponse(sampling_profile())
+
+@app.post("/profiling/sampling")
+async def toggle_sampling(enabled: bool = Form(...)):
+    require_profiling()
+    # Stopping joins the sampler thread
+    return await asyncio.to_thread(set_sampling, enabled)
+
+@app.post("/attachments", response_model=StoredAttachment)
+async def upload_attachment(file: UploadFile = File(...)):
+    """Store an attachment once by content hash; /generate-agenda can then reference it via attachment_hashes."""
+    try:
+        # Starlette has already spooled the upload to a temporary file; reading it in
+        # chunks stops at the limit instead of loading an oversized file into memory
+        chunks, size = [], 0
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > attachment_store.max_file_bytes:
+                raise AttachmentTooLarge(
+                    f"Attachment exceeds the limit of {attachment_store.max_file_bytes} bytes"
+                )
+            chunks.append(chunk)
+        info, created = await asyncio.to_thread(attachment_store.put, b"".join(chunks), file.filename or "attachment")
+        return StoredAttachment(**info, created=created)
+    except AttachmentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.api_route("/attachments/{content_hash}", methods=["GET", "HEAD"], response_model=StoredAttachment)
+async def get_attachment(content_hash: str):
+    """Metadata of a stored attachment; HEAD lets clients check existence before uploading."""
+    if not is_content_hash(content_hash):
+        raise HTTPException(status_code=400, detail="Expected a lowercase hex SHA-256 hash")
+    try:
+        return StoredAttachment(**await asyncio.to_thread(attachment_store.info, content_hash))
+    except AttachmentNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
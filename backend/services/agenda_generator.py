@@ -1,21 +1,132 @@
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from typing import Optional, List
+from collections import OrderedDict
+import asyncio
 import json
+import logging
+import os
 import re
+import time
+
+from services.deadlines import DeadlineExceeded, remaining
+from services.model_router import estimate_tokens, record_call, route
+from services.output_budget import (
+    JsonEndDetector,
+    OutputTruncated,
+    agenda_budget,
+    items_budget,
+    record_output,
+    retry_budget,
+    rewrite_budget,
+)
+from services.models import Agenda, AgendaItem, parse_agenda
+from services.tracing import span
+
+logger = logging.getLogger(__name__)
 
 # Point to the local LM Studio instance
-client = OpenAI(base_url="http://host.docker.internal:1234/v1", api_key="lm-studio")
+client = AsyncOpenAI(base_url="http://host.docker.internal:1234/v1", api_key="lm-studio")
 
-from datetime import datetime
+# language=BOTH generates in the first language and translates into the second
+BILINGUAL_LANGUAGES = ("DE", "EN")
+LANGUAGE_NAMES = {"DE": "German", "EN": "English"}
+# Translated texts kept in memory, keyed by (target language, source text)
+TRANSLATION_CACHE_SIZE = int(os.environ.get("AGENDA_TRANSLATION_CACHE_SIZE", "2048"))
 
-async def generate_agenda_content(topic: str, start_time: str, end_time: str, language: str, email_content: str = None, file_contents: list = None) -> str:
-    """Generate agenda content for pre-calculated time slots."""
-    from services.time_slot_calculator import calculate_time_slots
-    
-    # Calculate deterministic time slots
-    schedule = calculate_time_slots(start_time, end_time)
-    
+_translation_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+async def _complete(messages: list, temperature: float, task: str, schedule_type: Optional[str] = None,
+                    max_tokens: Optional[int] = None, json_output: bool = True) -> str:
+    """Stream a chat completion from the routed model and return its text.
+
+    ``max_tokens`` bounds the answer; with ``json_output`` the stream is
+    closed as soon as the top-level JSON value is complete. An answer cut
+    off by ``max_tokens`` is retried once with a larger budget and raises
+    OutputTruncated if that is cut off too; the request deadline raises
+    DeadlineExceeded. Both carry the text received so far. Cancelling the
+    caller closes the stream, so the model server stops generating for
+    abandoned requests.
+    """
+    try:
+        return await _complete_once(messages, temperature, task, schedule_type, max_tokens, json_output)
+    except OutputTruncated:
+        larger = retry_budget(max_tokens)
+        if larger is None:
+            raise
+        return await _complete_once(messages, temperature, task, schedule_type, larger, json_output, retried=True)
+
+
+def _token_counts(usage, text: str) -> dict:
+    """Span attributes with the server's token usage, or an estimate from ``text`` if it sent none.
+
+    A stream closed at the end of the JSON or by the deadline ends before the usage chunk.
+    """
+    if usage is not None and getattr(usage, "completion_tokens", None) is not None:
+        return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens,
+                "token_counts": "usage"}
+    return {"completion_tokens": estimate_tokens(text), "token_counts": "estimate"}
+
+
+async def _complete_once(messages: list, temperature: float, task: str, schedule_type: Optional[str],
+                         max_tokens: Optional[int], json_output: bool, retried: bool = False) -> str:
+    prompt_tokens = estimate_tokens("".join(message["content"] for message in messages))
+    model = route(task, prompt_tokens, schedule_type)
+    parts = []
+    finish_reason = None
+    usage = None
+    json_end = JsonEndDetector() if json_output else None
+    started = time.monotonic()
+    with span("llm.complete", task=task, model=model, prompt_tokens=prompt_tokens, max_tokens=max_tokens,
+              retry=retried) as llm_span:
+        try:
+            async with asyncio.timeout(remaining()):
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    # The server's token counts arrive in a final chunk without choices
+                    stream_options={"include_usage": True},
+                )
+                async with stream:
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        text = choice.delta.content
+                        if text:
+                            if not parts:
+                                llm_span.set(first_token_ms=round((time.monotonic() - started) * 1000, 1))
+                            end = json_end.feed(text) if json_end is not None else None
+                            if end is not None:
+                                # Anything after the JSON is discarded; leaving the block closes the stream
+                                parts.append(text[:end])
+                                finish_reason = "json_end"
+                                break
+                            parts.append(text)
+                        finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+        except TimeoutError:
+            record_call(model, time.monotonic() - started, failed=True)
+            llm_span.set(deadline_exceeded=True, **_token_counts(usage, "".join(parts)))
+            raise DeadlineExceeded(partial="".join(parts))
+        except BaseException:
+            record_call(model, time.monotonic() - started, failed=True)
+            raise
+        record_call(model, time.monotonic() - started)
+        record_output(task, budget_hit=finish_reason == "length", stopped_early=finish_reason == "json_end",
+                      retried=retried)
+        text = "".join(parts)
+        llm_span.set(chunks=len(parts), finish_reason=finish_reason, **_token_counts(usage, text))
+        if finish_reason == "length":
+            raise OutputTruncated(max_tokens, partial=text)
+    return text
+
+def _build_agenda_prompt(topic: str, schedule: dict, language: str, email_content: Optional[str] = None,
+                         file_contents: Optional[list] = None, recurrence: Optional[str] = None) -> str:
+    """Prompt asking the model to fill the pre-calculated ``schedule`` with content."""
     # Determine language instruction
     lang_instruction = "in German" if language == "DE" else "in English"
     
@@ -52,6 +163,10 @@ The time slots have been pre-calculated. Your job is to fill in appropriate cont
                     prompt += f"- {slot['start']} - {slot['end']}: [FILL CONTENT] ({slot['duration_minutes']} mins)\n"
             prompt += "\n"
     
+    if recurrence:
+        from services.recurrence import describe_rule
+        prompt += f"\nThis is a recurring meeting ({describe_rule(recurrence)}). The same agenda is used for every occurrence, so avoid date-specific content.\n"
+
     if email_content:
         prompt += f"\nEmail Context:\n{email_content}\n"
     
@@ -105,16 +220,36 @@ Return a JSON object with this structure:
 All text must be {lang_instruction}. Keep the exact time slots provided above.
 """
 
+    return prompt
+
+async def generate_agenda_content(topic: str, start_time: str, end_time: str, language: str, email_content: str = None, file_contents: list = None, busy=None, recurrence: str = None) -> str:
+    """Generate agenda content for pre-calculated time slots.
+
+    ``busy`` is an optional BusyIndex of attendee commitments to schedule around.
+    ``recurrence`` marks a meeting series: one agenda is generated for all occurrences.
+    """
+    from services.time_slot_calculator import calculate_time_slots
+    
+    # Calculate deterministic time slots
+    with span("schedule.calculate") as schedule_span:
+        schedule = calculate_time_slots(start_time, end_time, busy)
+        schedule_span.set(schedule_type=schedule["type"], days=len(schedule["days"]))
+
+    with span("prompt.build") as prompt_span:
+        prompt = _build_agenda_prompt(topic, schedule, language, email_content, file_contents, recurrence)
+        prompt_span.set(prompt_chars=len(prompt), attachments=len(file_contents or []))
+
     try:
-        completion = client.chat.completions.create(
-            model="local-model",
-            messages=[
+        content = (await _complete(
+            [
                 {"role": "system", "content": "You are a helpful professional assistant that outputs strict JSON."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-        )
-        content = completion.choices[0].message.content.strip()
+            task="agenda",
+            schedule_type=schedule["type"],
+            max_tokens=agenda_budget(schedule),
+        )).strip()
         
         # Clean up potential markdown code blocks if the model ignores instructions
         if content.startswith("```json"):
@@ -123,14 +258,71 @@ All text must be {lang_instruction}. Keep the exact time slots provided above.
             content = content[3:]
         if content.endswith("```"):
             content = content[:-3]
-            
-        return content.strip()
+        content = content.strip()
+
+        # Validate once here; everything downstream gets normalized JSON.
+        # Output that is not agenda JSON is passed through for the raw-text fallback.
+        with span("agenda.parse") as parse_span:
+            agenda = parse_agenda(content)
+            parse_span.set(valid=agenda is not None)
+        return agenda.to_json() if agenda is not None else content
+    except (DeadlineExceeded, OutputTruncated):
+        raise
     except Exception as e:
-        return json.dumps({
-            "title": "Error Generating Agenda",
-            "summary": f"Could not generate structured agenda. Error: {str(e)}",
-            "items": []
-        })
+        return Agenda(
+            title="Error Generating Agenda",
+            summary=f"Could not generate structured agenda. Error: {str(e)}",
+            items=[]
+        ).to_json()
+
+async def generate_slot_items(topic: str, language: str, slots: List[dict], kept_titles: List[str],
+                              schedule_type: str) -> List[AgendaItem]:
+    """Generate content for the given work slots only (used when a meeting is rescheduled).
+
+    ``slots`` are schedule slots with an optional ``day`` number and
+    ``previous_title`` of the item the slot replaces; ``kept_titles`` are the
+    items that stay, so the model does not repeat them. Raises ValueError if
+    the model does not return one item per slot.
+    """
+    lang_instruction = "in German" if language == "DE" else "in English"
+    prompt = f"""The meeting "{topic}" was rescheduled. Most agenda items stay as they are:
+{chr(10).join(f"- {title}" for title in kept_titles) or "- (none)"}
+
+Write agenda items {lang_instruction} for these new or resized time slots only:
+"""
+    for slot in slots:
+        line = f"- {slot['start']} - {slot['end']} ({slot['duration_minutes']} mins)" if slot.get("start") else "- agenda point"
+        if slot.get("day"):
+            line = f"- Day {slot['day']}, " + line[2:]
+        if slot.get("previous_title"):
+            line += f", previously: {slot['previous_title']}"
+        prompt += line + "\n"
+    prompt += f"""
+Do not repeat the items that stay. Return a JSON object {lang_instruction} with exactly {len(slots)} items in this order:
+{{
+    "items": [
+        {{
+            "title": "Item title {lang_instruction}",
+            "description": "Very short description (max 1 sentence) {lang_instruction}"
+        }}
+    ]
+}}
+"""
+    content = (await _complete(
+        [
+            {"role": "system", "content": "You are a helpful professional assistant that outputs strict JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        task="agenda",
+        schedule_type=schedule_type,
+        max_tokens=items_budget(len(slots)),
+    )).strip()
+    content = content.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    agenda = parse_agenda(content)
+    if agenda is None or agenda.items is None or len(agenda.items) != len(slots):
+        raise ValueError(f"Expected {len(slots)} agenda items for the rescheduled slots")
+    return agenda.items
 
 async def refine_agenda_text(text: str, instruction: Optional[str] = None) -> str:
     """Refine agenda text using LLM."""
@@ -151,14 +343,100 @@ async def refine_agenda_text(text: str, instruction: Optional[str] = None) -> st
     """
 
     try:
-        completion = client.chat.completions.create(
-            model="local-model",
-            messages=[
+        return (await _complete(
+            [
                 {"role": "system", "content": "You are a helpful professional assistant."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-        )
-        return completion.choices[0].message.content.strip()
+            task="refine",
+            max_tokens=rewrite_budget(estimate_tokens(text)),
+            json_output=False,
+        )).strip()
+    except (DeadlineExceeded, OutputTruncated):
+        raise
     except Exception as e:
         return f"Error refining text: {str(e)}"
+
+
+def _translation_cache_get(key: tuple) -> Optional[str]:
+    text = _translation_cache.get(key)
+    if text is not None:
+        _translation_cache.move_to_end(key)
+    return text
+
+
+def _translation_cache_put(key: tuple, text: str) -> None:
+    if TRANSLATION_CACHE_SIZE <= 0:
+        return
+    _translation_cache[key] = text
+    _translation_cache.move_to_end(key)
+    while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+        _translation_cache.popitem(last=False)
+
+
+def _text_fields(agenda: Agenda) -> list:
+    """(object, field) pairs of every translatable text in the agenda."""
+    fields = [(agenda, "title"), (agenda, "summary")]
+    items = list(agenda.items or []) + [item for day in agenda.days or [] for item in day.items]
+    for item in items:
+        fields += [(item, "title"), (item, "description")]
+    return [(obj, name) for obj, name in fields if getattr(obj, name)]
+
+
+async def translate_agenda(agenda_content: str, language: str) -> Optional[str]:
+    """Translate the text fields of an agenda into ``language``.
+
+    Times, dates and item types are kept; only titles, summary and
+    descriptions go to the LLM, in a single call for all texts that are not
+    cached yet. Returns None for content that is not agenda JSON and when the
+    call fails, so an untranslated agenda is never passed off as ``language``;
+    DeadlineExceeded propagates to the caller.
+    """
+    agenda = parse_agenda(agenda_content)
+    if agenda is None:
+        return None
+    translated = agenda.model_copy(deep=True)
+    fields = _text_fields(translated)
+
+    missing = list(dict.fromkeys(
+        getattr(obj, name) for obj, name in fields
+        if _translation_cache_get((language, getattr(obj, name))) is None
+    ))
+    if missing:
+        prompt = f"""Translate each string in this JSON array into {LANGUAGE_NAMES.get(language, language)}.
+Keep emojis, names and numbers unchanged.
+
+{json.dumps(missing, ensure_ascii=False)}
+
+Return ONLY a JSON array with the {len(missing)} translated strings in the same order.
+"""
+        try:
+            content = (await _complete(
+                [
+                    {"role": "system", "content": "You are a professional translator that outputs strict JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,
+                task="translate",
+                max_tokens=rewrite_budget(estimate_tokens(json.dumps(missing, ensure_ascii=False))),
+            )).strip()
+            content = content.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+            texts = json.loads(content)
+            if isinstance(texts, list) and len(texts) == len(missing) and all(isinstance(t, str) for t in texts):
+                for source, text in zip(missing, texts):
+                    _translation_cache_put((language, source), text)
+            else:
+                logger.warning("Translation into %s returned %s texts for %d", language,
+                               len(texts) if isinstance(texts, list) else "no", len(missing))
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning("Error translating agenda into %s: %s", language, e)
+
+    for obj, name in fields:
+        text = _translation_cache_get((language, getattr(obj, name)))
+        if text is None:
+            return None
+        setattr(obj, name, text)
+    return translated.to_json()
@@ -0,0 +1,182 @@
+"""
+Persistent agenda store (SQLite).
+
+Every generated or edited agenda is kept under a stable ID. Each change
+creates a new version holding a full snapshot of the agenda content and the
+meeting fields needed for ICS export; the rendered ICS of a version is
+cached next to it so repeated downloads skip rendering. The email and
+attachment text an agenda was generated from is kept as its ``context`` so a
+later full regeneration works from the same input.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+DB_PATH = os.environ.get("AGENDA_DB_PATH", "agendas.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agendas (
+    id TEXT PRIMARY KEY,
+    current_version INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agenda_versions (
+    agenda_id TEXT NOT NULL REFERENCES agendas(id),
+    version INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    location TEXT NOT NULL,
+    language TEXT,
+    recurrence TEXT,
+    context TEXT,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    ics BLOB,
+    PRIMARY KEY (agenda_id, version)
+);
+"""
+
+_FIELDS = ("topic", "start_time", "end_time", "location", "language", "recurrence", "context")
+
+
+def _encode_context(context: Optional[Dict[str, Any]]) -> Optional[str]:
+    return json.dumps(context, ensure_ascii=False) if context else None
+
+
+class AgendaNotFound(Exception):
+    pass
+
+
+class VersionConflict(Exception):
+    """Raised when an update is based on an outdated version."""
+
+
+class AgendaStore:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(agenda_versions)")}
+            if "context" not in columns:
+                # Databases created before generation context was stored
+                self._conn.execute("ALTER TABLE agenda_versions ADD COLUMN context TEXT")
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def create(self, content: str, topic: str, start_time: str, end_time: str,
+               location: str = "TBD", language: Optional[str] = None,
+               recurrence: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Store a new agenda as version 1 and return its record."""
+        agenda_id = uuid.uuid4().hex
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO agendas (id, current_version, created_at, updated_at) VALUES (?, 1, ?, ?)",
+                    (agenda_id, now, now),
+                )
+                conn.execute(
+                    "INSERT INTO agenda_versions (agenda_id, version, topic, start_time, end_time, location, "
+                    "language, recurrence, context, content, created_at) VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (agenda_id, topic, start_time, end_time, location or "TBD", language, recurrence,
+                     _encode_context(context), content, now),
+                )
+        return self.get(agenda_id)
+
+    def update(self, agenda_id: str, base_version: Optional[int] = None, **changes: Any) -> Dict[str, Any]:
+        """
+        Store a new version with ``changes`` applied to the current one.
+
+        ``changes`` may contain ``content`` and any of the meeting fields;
+        None values keep the previous value. With ``base_version`` the update
+        is rejected if someone else saved a newer version in the meantime.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                current = self._fetch(conn, agenda_id, None)
+                if base_version is not None and base_version != current["version"]:
+                    raise VersionConflict(
+                        f"Agenda {agenda_id} is at version {current['version']}, not {base_version}"
+                    )
+                merged = {key: current[key] for key in _FIELDS + ("content",)}
+                merged.update({key: value for key, value in changes.items() if value is not None})
+                version = current["version"] + 1
+                conn.execute(
+                    "INSERT INTO agenda_versions (agenda_id, version, topic, start_time, end_time, location, "
+                    "language, recurrence, context, content, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (agenda_id, version, merged["topic"], merged["start_time"], merged["end_time"],
+                     merged["location"], merged["language"], merged["recurrence"],
+                     _encode_context(merged["context"]), merged["content"], now),
+                )
+                conn.execute(
+                    "UPDATE agendas SET current_version = ?, updated_at = ? WHERE id = ?",
+                    (version, now, agenda_id),
+                )
+        return self.get(agenda_id)
+
+    def get(self, agenda_id: str, version: Optional[int] = None) -> Dict[str, Any]:
+        """Return the current (or given) version of an agenda; raises AgendaNotFound."""
+        with self._lock:
+            return self._fetch(self._connection(), agenda_id, version)
+
+    def _fetch(self, conn: sqlite3.Connection, agenda_id: str, version: Optional[int]) -> Dict[str, Any]:
+        if version is None:
+            row = conn.execute(
+                "SELECT v.* FROM agenda_versions v JOIN agendas a "
+                "ON a.id = v.agenda_id AND a.current_version = v.version WHERE a.id = ?",
+                (agenda_id,),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT * FROM agenda_versions WHERE agenda_id = ? AND version = ?",
+                (agenda_id, version),
+            ).fetchone()
+        if row is None:
+            raise AgendaNotFound(f"Agenda {agenda_id} (version {version or 'current'}) not found")
+        record = {key: row[key] for key in row.keys() if key not in ("agenda_id", "ics")}
+        record["context"] = json.loads(record["context"]) if record["context"] else None
+        record["id"] = agenda_id
+        return record
+
+    def get_rendered_ics(self, agenda_id: str, version: int) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT ics FROM agenda_versions WHERE agenda_id = ? AND version = ?",
+                (agenda_id, version),
+            ).fetchone()
+        return row["ics"] if row is not None else None
+
+    def set_rendered_ics(self, agenda_id: str, version: int, ics: bytes) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "UPDATE agenda_versions SET ics = ? WHERE agenda_id = ? AND version = ?",
+                    (ics, agenda_id, version),
+                )
+
+
+# Process-wide store used by the API
+agenda_store = AgendaStore()
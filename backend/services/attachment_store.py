@@ -0,0 +1,188 @@
+"""
+Content-addressed attachment store.
+
+Uploaded attachments are stored once under the SHA-256 of their bytes, so the
+same slide deck uploaded again (or by another client) takes no extra space
+and ``/generate-agenda`` can reference it by hash instead of receiving it on
+every attempt. The hash is also the key of the extracted-text cache in
+``services.attachments``, so a referenced attachment is usually not even read
+from disk. When the quota is exceeded the least recently used attachments
+are evicted; storing, existence checks and reads all count as a use.
+
+Configured through environment variables:
+- AGENDA_ATTACHMENT_DIR: storage directory (default: attachments)
+- AGENDA_ATTACHMENT_QUOTA_MB: total size kept on disk (default: 512)
+- AGENDA_ATTACHMENT_MAX_MB: largest single attachment accepted (default: 50)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+ATTACHMENT_DIR = os.environ.get("AGENDA_ATTACHMENT_DIR", "attachments")
+QUOTA_BYTES = int(float(os.environ.get("AGENDA_ATTACHMENT_QUOTA_MB", "512")) * 1024 * 1024)
+MAX_FILE_BYTES = int(float(os.environ.get("AGENDA_ATTACHMENT_MAX_MB", "50")) * 1024 * 1024)
+
+_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+class AttachmentNotFound(Exception):
+    pass
+
+
+class AttachmentTooLarge(Exception):
+    pass
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def is_content_hash(value: str) -> bool:
+    return bool(_HASH.fullmatch(value))
+
+
+class AttachmentStore:
+    """
+    Attachments on disk as ``<dir>/<hash[:2]>/<hash>`` with a ``.json`` sidecar
+    holding the original filename.
+
+    The recency order lives in memory and is rebuilt from file modification
+    times, so eviction survives restarts. The API builds it with
+    ``load_index`` at startup, off the event loop; otherwise the first use
+    walks the directory.
+    """
+
+    def __init__(self, directory: str = ATTACHMENT_DIR, quota_bytes: int = QUOTA_BYTES,
+                 max_file_bytes: int = MAX_FILE_BYTES):
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.max_file_bytes = min(max_file_bytes, quota_bytes)
+        self._lock = threading.Lock()
+        # hash -> size in bytes, least recently used first
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total = 0
+        self._evicted = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            found = []
+            if os.path.isdir(self.directory):
+                for root, _, names in os.walk(self.directory):
+                    for name in names:
+                        if is_content_hash(name):
+                            stat = os.stat(os.path.join(root, name))
+                            found.append((stat.st_mtime, name, stat.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(found))
+            self._total = sum(self._index.values())
+        return self._index
+
+    def load_index(self) -> int:
+        """Build the recency index from disk now; returns the number of stored attachments."""
+        with self._lock:
+            return len(self._load_index())
+
+    def _touch(self, digest: str) -> None:
+        self._index.move_to_end(digest)
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+
+    def _remove(self, digest: str) -> None:
+        self._total -= self._index.pop(digest)
+        for path in (self._path(digest), self._path(digest) + ".json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def put(self, content: bytes, filename: str) -> Tuple[Dict[str, Any], bool]:
+        """Store ``content``; returns (info, created) where created is False for a duplicate."""
+        if len(content) > self.max_file_bytes:
+            raise AttachmentTooLarge(
+                f"Attachment of {len(content)} bytes exceeds the limit of {self.max_file_bytes} bytes"
+            )
+        digest = content_hash(content)
+        with self._lock:
+            index = self._load_index()
+            if digest in index:
+                self._touch(digest)
+                return self._info(digest), False
+            while index and self._total + len(content) > self.quota_bytes:
+                self._remove(next(iter(index)))
+                self._evicted += 1
+            path = self._path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and rename, so readers never see partial files
+            for target, data in ((path + ".json", json.dumps({"filename": filename}).encode("utf-8")), (path, content)):
+                tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.part"
+                with open(tmp, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp, target)
+            index[digest] = len(content)
+            self._total += len(content)
+            return self._info(digest), True
+
+    def _info(self, digest: str) -> Dict[str, Any]:
+        filename = digest
+        try:
+            with open(self._path(digest) + ".json", encoding="utf-8") as handle:
+                filename = json.load(handle).get("filename") or digest
+        except (OSError, ValueError):
+            pass
+        return {"hash": digest, "filename": filename, "size": self._index[digest]}
+
+    def info(self, digest: str) -> Dict[str, Any]:
+        """Hash, filename and size of a stored attachment; raises AttachmentNotFound."""
+        with self._lock:
+            index = self._load_index()
+            if digest not in index:
+                raise AttachmentNotFound(f"Attachment {digest} not found")
+            self._touch(digest)
+            return self._info(digest)
+
+    def read(self, digest: str) -> bytes:
+        return self.fetch(digest)[1]
+
+    def fetch(self, digest: str, content: bool = True) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        (info, bytes) of a stored attachment in one step, so it cannot be
+        evicted in between; bytes is None without ``content``. Raises
+        AttachmentNotFound.
+        """
+        with self._lock:
+            index = self._load_index()
+            if digest not in index:
+                raise AttachmentNotFound(f"Attachment {digest} not found")
+            self._touch(digest)
+            if not content:
+                return self._info(digest), None
+            try:
+                with open(self._path(digest), "rb") as handle:
+                    data = handle.read()
+            except FileNotFoundError:
+                # Removed behind the store's back
+                self._total -= index.pop(digest)
+                raise AttachmentNotFound(f"Attachment {digest} not found")
+            return self._info(digest), data
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "attachments": len(index),
+                "bytes": self._total,
+                "quota_bytes": self.quota_bytes,
+                "evicted": self._evicted,
+            }
+
+
+# Process-wide store used by the API
+attachment_store = AttachmentStore()
@@ -0,0 +1,255 @@
+"""
+Text extraction for meeting attachments.
+
+Office documents are read part by part (PDF pages, DOCX paragraphs, XLSX
+rows, PPTX slides) and extraction stops as soon as the page, character or
+time budget is exhausted, so large files are never turned into text as a
+whole. Results are cached by content hash.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import re
+import time
+import zipfile
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from services.tracing import span
+from services.worker_pool import run_cpu
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; PDFs are then passed as binary markers
+    PdfReader = None
+
+# Pages/slides/sheets read per file
+MAX_PAGES = int(os.environ.get("AGENDA_EXTRACT_MAX_PAGES", "200"))
+# Characters of extracted text kept per file
+MAX_CHARS = int(os.environ.get("AGENDA_EXTRACT_MAX_CHARS", "20000"))
+# Seconds spent extracting a single file
+TIME_BUDGET_SECONDS = float(os.environ.get("AGENDA_EXTRACT_TIME_BUDGET", "5"))
+# Extracted texts kept in memory, keyed by content hash
+CACHE_SIZE = int(os.environ.get("AGENDA_EXTRACT_CACHE_SIZE", "128"))
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
+
+def _numbered(names: List[str], pattern: str) -> List[str]:
+    regex = re.compile(pattern)
+    matches = [(int(m.group(1)), name) for name in names for m in [regex.fullmatch(name)] if m]
+    return [name for _, name in sorted(matches)]
+
+
+def _pdf_pages(content: bytes) -> Iterator[str]:
+    reader = PdfReader(io.BytesIO(content))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _docx_paragraphs(archive: zipfile.ZipFile) -> Iterator[str]:
+    with archive.open("word/document.xml") as handle:
+        texts = []
+        for _, elem in iterparse(handle, events=("end",)):
+            if elem.tag == _W + "t" and elem.text:
+                texts.append(elem.text)
+            elif elem.tag == _W + "p":
+                if texts:
+                    yield "".join(texts)
+                texts = []
+                elem.clear()
+
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as handle:
+        for _, elem in iterparse(handle, events=("end",)):
+            if elem.tag == _S + "si":
+                strings.append("".join(t.text or "" for t in elem.iter(_S + "t")))
+                elem.clear()
+    return strings
+
+
+def _xlsx_sheets(archive: zipfile.ZipFile) -> Iterator[Iterator[str]]:
+    shared = _xlsx_shared_strings(archive)
+    for index, name in enumerate(_numbered(archive.namelist(), r"xl/worksheets/sheet(\d+)\.xml"), start=1):
+        yield _xlsx_rows(archive, name, shared, index)
+
+
+def _xlsx_rows(archive: zipfile.ZipFile, name: str, shared: List[str], index: int) -> Iterator[str]:
+    yield f"## Sheet {index}"
+    with archive.open(name) as handle:
+        for _, elem in iterparse(handle, events=("end",)):
+            if elem.tag != _S + "row":
+                continue
+            cells = []
+            for cell in elem.iter(_S + "c"):
+                cell_type = cell.get("t")
+                if cell_type == "inlineStr":
+                    value = "".join(t.text or "" for t in cell.iter(_S + "t"))
+                else:
+                    raw = cell.find(_S + "v")
+                    value = raw.text if raw is not None and raw.text else ""
+                    if cell_type == "s" and value:
+                        value = shared[int(value)] if int(value) < len(shared) else ""
+                if value:
+                    cells.append(value)
+            if cells:
+                yield "\t".join(cells)
+            elem.clear()
+
+
+def _pptx_slides(archive: zipfile.ZipFile) -> Iterator[str]:
+    for index, name in enumerate(_numbered(archive.namelist(), r"ppt/slides/slide(\d+)\.xml"), start=1):
+        paragraphs = []
+        with archive.open(name) as handle:
+            texts = []
+            for _, elem in iterparse(handle, events=("end",)):
+                if elem.tag == _A + "t" and elem.text:
+                    texts.append(elem.text)
+                elif elem.tag == _A + "p":
+                    if texts:
+                        paragraphs.append("".join(texts))
+                    texts = []
+                    elem.clear()
+        yield f"## Slide {index}\n" + "\n".join(paragraphs)
+
+
+def _collect(parts: Iterator[str], deadline: float, max_chars: int) -> Tuple[str, Optional[str]]:
+    """Join parts until a budget runs out; returns (text, reason it was cut short)."""
+    collected = []
+    length = 0
+    for part in parts:
+        if not part:
+            continue
+        if length + len(part) > max_chars:
+            collected.append(part[:max(0, max_chars - length)])
+            return "\n".join(collected), "character limit"
+        collected.append(part)
+        length += len(part) + 1
+        if time.monotonic() > deadline:
+            return "\n".join(collected), "time budget"
+    return "\n".join(collected), None
+
+
+def _limited(parts: Iterator, max_parts: int, state: dict) -> Iterator:
+    for index, part in enumerate(parts):
+        if index >= max_parts:
+            state["cut"] = "page limit"
+            return
+        yield part
+
+
+def extract_document(content: bytes, filename: str = "") -> Tuple[str, str]:
+    """
+    Extract text from attachment bytes; returns (kind, text).
+
+    UTF-8 text is returned as-is with kind "TEXT". PDF, DOCX, XLSX and PPTX
+    files are read page by page / sheet by sheet within MAX_PAGES, MAX_CHARS
+    and TIME_BUDGET_SECONDS. Anything else has kind "BINARY" and no text.
+    """
+    deadline = time.monotonic() + TIME_BUDGET_SECONDS
+    parts = None
+    kind = "BINARY"
+    state = {}
+    try:
+        # Sniff document formats first: a PDF can be plain ASCII
+        if content.startswith(b"%PDF") and PdfReader is not None:
+            kind = "PDF"
+            parts = _limited(_pdf_pages(content), MAX_PAGES, state)
+        elif content.startswith(b"PK") and zipfile.is_zipfile(io.BytesIO(content)):
+            archive = zipfile.ZipFile(io.BytesIO(content))
+            names = set(archive.namelist())
+            if "word/document.xml" in names:
+                kind = "DOCX"
+                parts = _docx_paragraphs(archive)
+            elif "xl/workbook.xml" in names:
+                kind = "XLSX"
+                parts = (row for sheet in _limited(_xlsx_sheets(archive), MAX_PAGES, state) for row in sheet)
+            elif "ppt/presentation.xml" in names:
+                kind = "PPTX"
+                parts = _limited(_pptx_slides(archive), MAX_PAGES, state)
+
+        if parts is None:
+            try:
+                return "TEXT", content.decode("utf-8")
+            except UnicodeDecodeError:
+                return "BINARY", ""
+        text, cut_reason = _collect(parts, deadline, MAX_CHARS)
+    except Exception as e:
+        print(f"Error extracting text from {filename or kind}: {e}")
+        return "BINARY", ""
+
+    cut_reason = cut_reason or state.get("cut")
+    if cut_reason:
+        text += f"\n[... truncated ({cut_reason})]"
+    return kind, text
+
+
+def format_attachment(filename: str, kind: str, text: str) -> str:
+    """Prompt representation of an extracted attachment."""
+    if kind == "TEXT":
+        return text
+    if kind == "BINARY":
+        return f"[Binary file: {filename}]"
+    return f"[{kind} file: {filename}]\n{text}"
+
+
+def extract_text(filename: str, content: bytes) -> str:
+    """Extract and format a single attachment for the prompt."""
+    return format_attachment(filename, *extract_document(content, filename))
+
+
+def _cache_get(key: str) -> Optional[Tuple[str, str]]:
+    entry = _cache.get(key)
+    if entry is not None:
+        _cache.move_to_end(key)
+    return entry
+
+
+def _cache_put(key: str, entry: Tuple[str, str]) -> None:
+    if CACHE_SIZE <= 0:
+        return
+    _cache[key] = entry
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def extract_attachments(uploads: List[Tuple[str, bytes]]) -> List[str]:
+    """Extract text for (filename, bytes) uploads on the worker pool, reusing cached results."""
+
+    async def extract(filename: str, content: bytes) -> str:
+        key = hashlib.sha256(content).hexdigest()
+        entry = _cache_get(key)
+        if entry is None:
+            entry = await run_cpu(extract_document, content, filename)
+            _cache_put(key, entry)
+        return format_attachment(filename, *entry)
+
+    with span("attachments.extract", files=len(uploads)):
+        return list(await asyncio.gather(*(extract(name, content) for name, content in uploads)))
+
+
+async def extract_stored_attachments(hashes: List[str], store) -> List[str]:
+    """Extract text for attachments referenced by content hash; cached texts skip the disk read."""
+
+    async def extract(digest: str) -> str:
+        entry = _cache_get(digest)
+        # Metadata and bytes come from one locked call, so an eviction cannot slip in between
+        info, content = await asyncio.to_thread(store.fetch, digest, entry is None)
+        if entry is None:
+            entry = await run_cpu(extract_document, content, info["filename"])
+            _cache_put(digest, entry)
+        return format_attachment(info["filename"], *entry)
+
+    with span("attachments.extract", references=len(hashes)):
+        return list(await asyncio.gather(*(extract(digest) for digest in hashes)))
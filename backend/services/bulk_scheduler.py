@@ -0,0 +1,234 @@
+"""
+Bulk slot layouts for many meetings at once.
+
+``bulk_time_slots`` computes the same schedules as ``calculate_time_slots``
+(without attendee calendars) for whole arrays of start/end timestamps. With
+NumPy installed, times are handled as integer minutes and every meeting-day is
+intersected with the standard day template in one vectorized step; without it
+each meeting goes through ``calculate_time_slots``.
+
+Work and memory grow with the number of meeting-days, so besides the
+number of meetings the total number of days they span is capped.
+
+The result is columnar: three tables (meetings, days, slots) linked by index
+columns, which is cheap to build and to encode for large batches.
+``schedules_from_columns`` turns it back into per-meeting schedules.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from services.time_slot_calculator import STANDARD_SLOTS, calculate_time_slots
+from services.working_days import working_calendar
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; meetings are then scheduled one by one
+    np = None
+
+# Meetings accepted per /bulk-schedule request
+MAX_MEETINGS = int(os.environ.get("AGENDA_BULK_MAX_MEETINGS", "200000"))
+# Calendar days spanned by all meetings of a request together
+MAX_MEETING_DAYS = int(os.environ.get("AGENDA_BULK_MAX_MEETING_DAYS", "400000"))
+
+DINNER_TITLE = "Dinner / Social event"
+SLOT_TYPES = [slot["type"] for slot in STANDARD_SLOTS] + ["social"]
+# Multi-day meetings use the standard working day on all but their first/last day
+DAY_START_MINUTE = 8 * 60 + 30
+DAY_END_MINUTE = 17 * 60 + 30
+DINNER_MINUTE = 19 * 60
+
+_TEMPLATE_STARTS = [int(slot["start"][:2]) * 60 + int(slot["start"][3:]) for slot in STANDARD_SLOTS]
+_TEMPLATE_ENDS = [int(slot["end"][:2]) * 60 + int(slot["end"][3:]) for slot in STANDARD_SLOTS]
+# date.toordinal() of 1970-01-01, which was a Thursday
+EPOCH_ORDINAL = 719163
+_HHMM = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+
+
+class TooManyMeetingDays(Exception):
+    pass
+
+
+def _check_meeting_days(total: int) -> None:
+    if total > MAX_MEETING_DAYS:
+        raise TooManyMeetingDays(
+            f"The meetings span {total} days together; at most {MAX_MEETING_DAYS} are accepted per request"
+        )
+
+
+def _empty_columns() -> Dict[str, Dict[str, List[Any]]]:
+    return {
+        "meetings": {"type": [], "duration_minutes": [], "num_items": [], "first_day": [], "num_days": []},
+        "days": {"meeting": [], "date": [], "start_time": [], "end_time": [], "first_slot": [], "num_slots": []},
+        "slots": {"day": [], "start": [], "end": [], "duration_minutes": [], "type": []},
+    }
+
+
+def _columns_from_schedules(schedules: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[Any]]]:
+    columns = _empty_columns()
+    meetings, days, slots = columns["meetings"], columns["days"], columns["slots"]
+    for index, schedule in enumerate(schedules):
+        meetings["type"].append(schedule["type"])
+        meetings["duration_minutes"].append(schedule["duration_minutes"])
+        meetings["num_items"].append(schedule.get("num_items"))
+        meetings["first_day"].append(len(days["meeting"]))
+        meetings["num_days"].append(len(schedule["days"]))
+        for day in schedule["days"]:
+            days["meeting"].append(index)
+            days["date"].append(day["date"])
+            days["start_time"].append(day["start_time"])
+            days["end_time"].append(day["end_time"])
+            days["first_slot"].append(len(slots["day"]))
+            days["num_slots"].append(len(day["slots"]))
+            for slot in day["slots"]:
+                slots["day"].append(len(days["meeting"]) - 1)
+                slots["start"].append(slot["start"])
+                slots["end"].append(slot["end"])
+                slots["duration_minutes"].append(slot["duration_minutes"])
+                slots["type"].append(slot["type"])
+    return columns
+
+
+def _parse_minutes(timestamps: Sequence[str]):
+    """ISO timestamps -> int64 minutes since the epoch, rounded down to the 15-minute grid."""
+    parsed = np.array([value.replace('Z', '') for value in timestamps], dtype="datetime64[s]")
+    return parsed.astype("int64") // 900 * 15
+
+
+def _vectorized_columns(start_times: Sequence[str], end_times: Sequence[str]) -> Dict[str, Dict[str, List[Any]]]:
+    start = _parse_minutes(start_times)
+    end = _parse_minutes(end_times)
+    total = end - start
+    start_day = start // 1440
+    end_day = end // 1440
+    multi = start_day != end_day
+    simple = ~multi & (total < 60)
+
+    # One row per meeting-day; reversed multi-day ranges have no days at all
+    num_days = np.where(multi, np.maximum(end_day - start_day + 1, 0), 1)
+    _check_meeting_days(int(num_days.sum()))
+    first_day = np.cumsum(num_days) - num_days
+    meeting = np.repeat(np.arange(len(start)), num_days)
+    day = start_day[meeting] + np.arange(len(meeting)) - first_day[meeting]
+
+    # Multi-day meetings skip non-working days unless they have no working day at all
+    holidays = np.array([holiday.toordinal() - EPOCH_ORDINAL for holiday in working_calendar.holidays], dtype="int64")
+    working = np.array(working_calendar.weekdays)[(day + 3) % 7] & ~np.isin(day, holidays)
+    has_working_day = np.bincount(meeting, weights=working, minlength=len(start)) > 0
+    keep_day = working | ~has_working_day[meeting] | ~multi[meeting]
+    meeting, day = meeting[keep_day], day[keep_day]
+    num_days = np.bincount(meeting, minlength=len(start))
+    first_day = np.cumsum(num_days) - num_days
+    is_first = day == start_day[meeting]
+    is_last = day == end_day[meeting]
+    day_start = np.where(is_first, start[meeting], day * 1440 + DAY_START_MINUTE)
+    day_end = np.where(is_last, end[meeting], day * 1440 + DAY_END_MINUTE)
+
+    # Intersect every meeting-day with the template: shape (days, slots)
+    template_start = day[:, None] * 1440 + np.array(_TEMPLATE_STARTS)
+    template_end = day[:, None] * 1440 + np.array(_TEMPLATE_ENDS)
+    slot_start = np.maximum(day_start[:, None], template_start)
+    slot_end = np.minimum(day_end[:, None], template_end)
+    keep = (slot_end > slot_start) & ~simple[meeting][:, None]
+
+    end_minute = end[meeting] % 1440
+    dinner = np.where(
+        multi[meeting],
+        ~is_last | (end_minute > 18 * 60),
+        ~simple[meeting] & (end_minute // 60 >= 17) & (end_minute % 60 >= 30),
+    )
+    keep = np.hstack([keep, dinner[:, None]])
+    slot_start = np.hstack([slot_start - (day * 1440)[:, None], np.full((len(day), 1), DINNER_MINUTE)])
+    slot_end = np.hstack([slot_end - (day * 1440)[:, None], np.full((len(day), 1), -1)])
+    durations = np.where(keep, slot_end - slot_start, 0)
+    durations[:, -1] = 0
+
+    num_slots = keep.sum(axis=1)
+    slot_day, slot_column = np.nonzero(keep)
+    multi_minutes = np.bincount(meeting, weights=durations.sum(axis=1), minlength=len(start)).astype("int64")
+    hhmm = np.array(_HHMM + [""])
+    types = np.array(SLOT_TYPES)
+
+    return {
+        "meetings": {
+            "type": np.where(multi, "multi_day", np.where(simple, "simple", "scheduled")).tolist(),
+            "duration_minutes": np.where(multi, multi_minutes, total).tolist(),
+            "num_items": [None if not is_simple else items
+                          for is_simple, items in zip(simple.tolist(), np.maximum(3, total // 15).tolist())],
+            "first_day": first_day.tolist(),
+            "num_days": num_days.tolist(),
+        },
+        "days": {
+            "meeting": meeting.tolist(),
+            "date": day.astype("datetime64[D]").astype(str).tolist(),
+            "start_time": hhmm[day_start - day * 1440].tolist(),
+            "end_time": hhmm[day_end - day * 1440].tolist(),
+            "first_slot": (np.cumsum(num_slots) - num_slots).tolist(),
+            "num_slots": num_slots.tolist(),
+        },
+        "slots": {
+            "day": slot_day.tolist(),
+            "start": hhmm[slot_start[keep]].tolist(),
+            "end": hhmm[slot_end[keep]].tolist(),
+            "duration_minutes": durations[keep].tolist(),
+            "type": types[slot_column].tolist(),
+        },
+    }
+
+
+def bulk_time_slots(start_times: Sequence[str], end_times: Sequence[str]) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Schedule many meetings at once and return the columnar tables.
+
+    ``meetings`` rows point at their days via ``first_day``/``num_days`` and
+    ``days`` rows at their slots via ``first_slot``/``num_slots``. Raises
+    ValueError for mismatched inputs or unparsable timestamps and
+    TooManyMeetingDays if the meetings span more than MAX_MEETING_DAYS days.
+    """
+    if len(start_times) != len(end_times):
+        raise ValueError("start_times and end_times must have the same length")
+    if not start_times:
+        return _empty_columns()
+    if np is None:
+        _check_meeting_days(sum(
+            max((datetime.fromisoformat(end.replace('Z', '')).date()
+                 - datetime.fromisoformat(start.replace('Z', '')).date()).days + 1, 1)
+            for start, end in zip(start_times, end_times)
+        ))
+        return _columns_from_schedules([
+            calculate_time_slots(start, end) for start, end in zip(start_times, end_times)
+        ])
+    return _vectorized_columns(start_times, end_times)
+
+
+def schedules_from_columns(columns: Dict[str, Dict[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """Expand the columnar tables into one ``calculate_time_slots``-style dict per meeting."""
+    meetings, days, slots = columns["meetings"], columns["days"], columns["slots"]
+    schedules = []
+    for index, meeting_type in enumerate(meetings["type"]):
+        schedule = {"type": meeting_type, "duration_minutes": meetings["duration_minutes"][index]}
+        if meetings["num_items"][index] is not None:
+            schedule["num_items"] = meetings["num_items"][index]
+        schedule["days"] = []
+        first_day = meetings["first_day"][index]
+        for day in range(first_day, first_day + meetings["num_days"][index]):
+            day_slots = []
+            first_slot = days["first_slot"][day]
+            for slot in range(first_slot, first_slot + days["num_slots"][day]):
+                entry = {
+                    "start": slots["start"][slot],
+                    "end": slots["end"][slot],
+                    "duration_minutes": slots["duration_minutes"][slot],
+                    "type": slots["type"][slot],
+                }
+                if entry["type"] == "social":
+                    entry["title"] = DINNER_TITLE
+                day_slots.append(entry)
+            schedule["days"].append({
+                "date": days["date"][day],
+                "start_time": days["start_time"][day],
+                "end_time": days["end_time"][day],
+                "slots": day_slots,
+            })
+        schedules.append(schedule)
+    return schedules
@@ -0,0 +1,283 @@
+"""
+Attendee free/busy support.
+
+Attendee calendars (.ics) are read line by line and only the busy intervals
+overlapping the meeting window are kept, so calendars with tens of thousands
+of events never have to be loaded as a whole. The intervals are merged into a
+sorted index that answers overlap queries with a binary search.
+"""
+import io
+import os
+import re
+import shutil
+import tempfile
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from dateutil.rrule import rrulestr
+from icalendar.prop import vDuration
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - Python < 3.9
+    ZoneInfo = None
+
+# Directory holding "<attendee>.ics" files that requests may reference by name
+CALENDAR_DIR = os.environ.get("AGENDA_CALENDAR_DIR")
+# Zone that aware event times are converted into (naive meeting times are local)
+LOCAL_TIMEZONE = os.environ.get("AGENDA_TIMEZONE")
+
+Interval = Tuple[datetime, datetime]
+
+_ATTENDEE_NAME = re.compile(r"^[A-Za-z0-9_.@-]+$")
+# Only these VEVENT properties matter for busy time; everything else is skipped unparsed
+_BUSY_PROPERTIES = ("DTSTART", "DTEND", "DURATION", "RRULE", "EXDATE", "TRANSP", "STATUS")
+
+
+class BusyIndex:
+    """Sorted, merged busy intervals with logarithmic overlap lookups."""
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in sorted(i for i in intervals if i[0] < i[1]):
+            if self._ends and start <= self._ends[-1]:
+                # Overlapping or touching: extend the previous interval
+                if end > self._ends[-1]:
+                    self._ends[-1] = end
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def intervals(self) -> List[Interval]:
+        return list(zip(self._starts, self._ends))
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        """Busy intervals intersecting [start, end), clipped to that range."""
+        result = []
+        # Merged intervals are sorted by end as well, so the first candidate
+        # is the first interval ending after ``start``.
+        i = bisect_right(self._ends, start)
+        while i < len(self._starts) and self._starts[i] < end:
+            result.append((max(self._starts[i], start), min(self._ends[i], end)))
+            i += 1
+        return result
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        i = bisect_right(self._ends, start)
+        return i == len(self._starts) or self._starts[i] >= end
+
+
+def _unfold(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Join RFC 5545 folded continuation lines."""
+    current = None
+    for raw in lines:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", "replace")
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split_property(line: str) -> Tuple[str, dict, str]:
+    head, _, value = line.partition(":")
+    name, *param_parts = head.split(";")
+    params = {}
+    for part in param_parts:
+        key, _, param_value = part.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _to_local_naive(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt
+    if LOCAL_TIMEZONE and ZoneInfo is not None:
+        return dt.astimezone(ZoneInfo(LOCAL_TIMEZONE)).replace(tzinfo=None)
+    if dt.tzinfo is timezone.utc:
+        return dt.astimezone().replace(tzinfo=None)
+    # TZID times keep their wall clock when no target zone is configured
+    return dt.replace(tzinfo=None)
+
+
+def _parse_datetime(value: str, params: dict) -> Union[datetime, date, None]:
+    value = value.strip()
+    # Sliced by hand: strptime dominates parsing time on large calendars
+    try:
+        if len(value) == 8 or params.get("VALUE") == "DATE":
+            return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+        if value[8:9] != "T":
+            return None
+        dt = datetime(
+            int(value[0:4]), int(value[4:6]), int(value[6:8]),
+            int(value[9:11]), int(value[11:13]), int(value[13:15]),
+        )
+    except ValueError:
+        return None
+    if value.endswith("Z"):
+        dt = dt.replace(tzinfo=timezone.utc)
+    elif "TZID" in params and ZoneInfo is not None:
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(params["TZID"]))
+        except Exception:
+            pass
+    return _to_local_naive(dt)
+
+
+def _event_intervals(event: dict, window: Optional[Interval]) -> Iterator[Interval]:
+    start = event.get("start")
+    # All-day (DATE) entries are informational (holidays, OOO markers) and
+    # transparent/cancelled events do not block time.
+    if not isinstance(start, datetime):
+        return
+    if event.get("transp") == "TRANSPARENT" or event.get("status") == "CANCELLED":
+        return
+
+    end = event.get("end")
+    if isinstance(end, datetime):
+        duration = end - start
+    else:
+        duration = event.get("duration") or timedelta(0)
+    if duration <= timedelta(0):
+        return
+
+    rule = event.get("rrule")
+    if not rule or window is None:
+        occurrences = [start]
+    else:
+        # dateutil refuses a UTC UNTIL with a naive DTSTART
+        rule = re.sub(r"(UNTIL=\d{8}T\d{6})Z", r"\1", rule)
+        try:
+            recurrence = rrulestr(f"RRULE:{rule}", dtstart=start)
+            occurrences = recurrence.between(window[0] - duration, window[1], inc=True)
+        except (ValueError, TypeError):
+            occurrences = [start]
+    excluded = event.get("exdates", set())
+
+    for occurrence in occurrences:
+        if occurrence in excluded:
+            continue
+        occurrence_end = occurrence + duration
+        if window is None or (occurrence < window[1] and occurrence_end > window[0]):
+            yield occurrence, occurrence_end
+
+
+def iter_busy_intervals(lines: Iterable[Union[str, bytes]], window: Optional[Interval] = None) -> Iterator[Interval]:
+    """
+    Stream busy intervals out of an ICS calendar.
+
+    Only one VEVENT is held in memory at a time. With a ``window`` only
+    intervals overlapping it are yielded and recurring events are expanded
+    inside it; without one, recurring events contribute their first occurrence.
+    """
+    event = None
+    for line in _unfold(lines):
+        if line == "BEGIN:VEVENT":
+            event = {}
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            yield from _event_intervals(event, window)
+            event = None
+            continue
+        if not line.upper().startswith(_BUSY_PROPERTIES):
+            continue
+
+        name, params, value = _split_property(line)
+        if name == "DTSTART":
+            event["start"] = _parse_datetime(value, params)
+        elif name == "DTEND":
+            event["end"] = _parse_datetime(value, params)
+        elif name == "DURATION":
+            try:
+                event["duration"] = vDuration.from_ical(value.strip())
+            except Exception:
+                pass
+        elif name == "RRULE":
+            event["rrule"] = value.strip()
+        elif name == "EXDATE":
+            for part in value.split(","):
+                excluded = _parse_datetime(part, params)
+                if isinstance(excluded, datetime):
+                    event.setdefault("exdates", set()).add(excluded)
+        elif name == "TRANSP":
+            event["transp"] = value.strip().upper()
+        elif name == "STATUS":
+            event["status"] = value.strip().upper()
+
+
+CalendarSource = Union[str, Path, bytes, IO]
+
+
+def _source_lines(source: CalendarSource) -> Iterator[Iterable]:
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, Path)):
+        path = Path(source)
+        paths = sorted(path.glob("*.ics")) if path.is_dir() else [path]
+        for calendar_path in paths:
+            with calendar_path.open("rb") as handle:
+                yield handle
+    else:
+        yield source
+
+
+def build_busy_index(sources: Iterable[CalendarSource], window: Optional[Interval] = None) -> BusyIndex:
+    """Merge the busy time of several calendars (paths, directories, bytes or binary files)."""
+    intervals: List[Interval] = []
+    for source in sources:
+        for lines in _source_lines(source):
+            intervals.extend(iter_busy_intervals(lines, window))
+    return BusyIndex(intervals)
+
+
+def spool_to_paths(files: Iterable[IO]) -> List[Path]:
+    """
+    Copy binary file objects (e.g. spooled uploads) to named temporary files.
+
+    Used when calendars are parsed in a worker process, which cannot receive
+    open file objects; the copy runs in chunks so no calendar is held in
+    memory. The caller deletes the returned paths.
+    """
+    paths = []
+    try:
+        for handle in files:
+            handle.seek(0)
+            with tempfile.NamedTemporaryFile(suffix=".ics", delete=False) as spooled:
+                paths.append(Path(spooled.name))
+                shutil.copyfileobj(handle, spooled)
+    except Exception:
+        for path in paths:
+            path.unlink(missing_ok=True)
+        raise
+    return paths
+
+
+def attendee_calendar_paths(names: Iterable[str]) -> List[Path]:
+    """Resolve attendee names to "<name>.ics" files inside AGENDA_CALENDAR_DIR."""
+    if not CALENDAR_DIR:
+        raise ValueError("Attendee calendars are not configured (set AGENDA_CALENDAR_DIR).")
+    paths = []
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        if not _ATTENDEE_NAME.match(name):
+            raise ValueError(f"Invalid attendee calendar name: {name}")
+        path = Path(CALENDAR_DIR) / f"{name}.ics"
+        if not path.is_file():
+            raise ValueError(f"No calendar found for attendee: {name}")
+        paths.append(path)
+    return paths
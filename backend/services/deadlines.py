@@ -0,0 +1,103 @@
+"""
+Per-request deadlines and cancellation on client disconnect.
+
+Every LLM-backed request gets a deadline: AGENDA_REQUEST_DEADLINE seconds by
+default, or less if the client sends ``X-Request-Timeout: <seconds>`` (capped
+at AGENDA_MAX_REQUEST_DEADLINE). The deadline lives in a context variable, so
+it reaches the LLM call without being passed through every function.
+``run_cancellable`` runs the work as a task and cancels it as soon as the
+client disconnects or the deadline has passed; cancelling closes the
+streamed completion, which makes the model server stop generating.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+DEFAULT_DEADLINE_SECONDS = float(os.environ.get("AGENDA_REQUEST_DEADLINE", "120"))
+MAX_DEADLINE_SECONDS = float(os.environ.get("AGENDA_MAX_REQUEST_DEADLINE", "600"))
+# How often a running request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = float(os.environ.get("AGENDA_DISCONNECT_POLL", "0.5"))
+# Time past the deadline before work that did not stop on its own is cancelled
+DEADLINE_GRACE_SECONDS = 1.0
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic()) of the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("agenda_request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request deadline passed; ``partial`` holds any text streamed so far."""
+
+    def __init__(self, message: str = "Request deadline exceeded", partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def parse_timeout(header_value: Optional[str]) -> float:
+    """Seconds allowed for a request: the client's X-Request-Timeout within the configured bounds."""
+    if header_value:
+        try:
+            requested = float(header_value)
+        except ValueError:
+            requested = None
+        if requested is not None and requested > 0:
+            return min(requested, MAX_DEADLINE_SECONDS)
+    return min(DEFAULT_DEADLINE_SECONDS, MAX_DEADLINE_SECONDS)
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[float]:
+    """Set the deadline for everything awaited inside the block (nested scopes can only shorten it)."""
+    deadline = time.monotonic() + timeout
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline (never negative), or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+async def run_cancellable(request, work: Awaitable[T]) -> T:
+    """
+    Await ``work`` while watching the client connection and the deadline.
+
+    Raises ClientDisconnected or DeadlineExceeded after cancelling the work.
+    Work that handles the deadline itself (e.g. to return partial output) gets
+    DEADLINE_GRACE_SECONDS before it is cancelled.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected("Client disconnected")
+            deadline = _deadline.get()
+            if deadline is not None and time.monotonic() > deadline + DEADLINE_GRACE_SECONDS:
+                raise DeadlineExceeded()
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
@@ -0,0 +1,189 @@
+"""
+Compaction of pasted email threads and attachment texts before prompting.
+
+A pasted thread usually carries every earlier message again: as ``>`` quotes,
+below Outlook-style "From:/Sent:" headers, and with each sender's signature
+and legal footer. Removed are quoted lines and reply attributions ("On ...
+wrote:", "Am ... schrieb ...:"), Outlook header blocks, signatures (after the
+RFC 3676 "-- " line, or a closing such as "Best regards" / "Viele Grüße"
+followed by a name or contact block), mobile
+signatures and legal footers in German and English. Finally, passages that
+occur more than once across the email and the attachments are kept only the
+first time. A thread that consists of quotes only keeps the quoted text.
+
+Configured through environment variables:
+- AGENDA_EMAIL_COMPACTION: "0" disables compaction (default: enabled)
+- AGENDA_DEDUP_MIN_CHARS: shortest passage that is de-duplicated (default: 40),
+  so short repeated headings such as "Agenda:" stay
+"""
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+COMPACTION_ENABLED = os.environ.get("AGENDA_EMAIL_COMPACTION", "1").lower() not in ("0", "false", "no")
+DEDUP_MIN_CHARS = int(os.environ.get("AGENDA_DEDUP_MIN_CHARS", "40"))
+
+# A closing phrase ("Best regards") starts a signature only if at most this
+# many short lines follow it before the next message, the first being a name
+MAX_SIGNATURE_LINES = 10
+SIGNATURE_LINE_CHARS = 80
+NAME_LINE_CHARS = 40
+
+_REPLY_ATTRIBUTION = re.compile(r"(on\s.{1,200}\swrote|am\s.{1,200}\sschrieb\s.{1,200}):", re.IGNORECASE)
+_SEPARATOR = re.compile(
+    r"-{2,}\s*(original message|ursprüngliche nachricht|forwarded message|weitergeleitete nachricht)\s*-{2,}",
+    re.IGNORECASE,
+)
+_HEADER_FIELD = re.compile(
+    r"\*?(from|von|sent|gesendet|date|datum|to|an|cc|bcc|subject|betreff)\*?:\s.*", re.IGNORECASE
+)
+_HEADER_START = re.compile(r"\*?(from|von):\*?\s.*", re.IGNORECASE)
+# Exactly "-- " (RFC 3676); a bare "--" is just as often a separator inside the content
+SIGNATURE_DELIMITER = "-- "
+# Unambiguous closings only: "Thanks!" or "LG" also open lists and requests
+_CLOSING = re.compile(
+    r"((best|kind|warm|many)\s+)?(regards|wishes)|cheers|"
+    r"(mit\s+)?(freundlichen|besten|herzlichen|vielen|viele|beste|liebe|schöne)\s+grü(ß|ss)en?|"
+    r"grüße|gruß|mfg",
+    re.IGNORECASE,
+)
+_LIST_ITEM = re.compile(r"([-*•–]|\d+[.)])\s")
+_MOBILE_SIGNATURE = re.compile(
+    r"(sent from my|(gesendet )?von meinem)\s+(\S+\s+)?(iphone|ipad|android|smartphone|handy|mobiltelefon|"
+    r"mobile|phone|tablet|samsung|galaxy)\S*(\s+gesendet)?|get outlook for \S+",
+    re.IGNORECASE,
+)
+_LEGAL_FOOTER = re.compile(
+    r"this (e-?mail|message)( and any attachments?)? (is|are|may be) (confidential|privileged|intended)|"
+    r"if you (are not|have received this).{0,40}(intended recipient|in error)|"
+    r"diese (e-?mail|nachricht).{0,80}(vertraulich|rechtlich geschützte)|"
+    r"wenn sie nicht der (richtige|beabsichtigte) (adressat|empfänger)|"
+    r"sitz der gesellschaft|registergericht|amtsgericht .{1,40}hrb|geschäftsführer(in)?:|"
+    r"ust-?id(nr)?\.?|vat (id|reg)|please consider the environment|bitte denken sie an die umwelt",
+    re.IGNORECASE,
+)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _is_boundary(lines: List[str], index: int) -> bool:
+    """True where an earlier message starts: a separator, a reply attribution or an Outlook header block."""
+    line = lines[index].strip()
+    if _SEPARATOR.fullmatch(line) or _REPLY_ATTRIBUTION.fullmatch(line):
+        return True
+    if _HEADER_START.fullmatch(line):
+        following = [candidate.strip() for candidate in lines[index + 1:index + 5]]
+        return sum(1 for candidate in following if _HEADER_FIELD.fullmatch(candidate)) >= 2
+    return False
+
+
+def _ends_message(lines: List[str], index: int) -> bool:
+    """True if a name or contact block, and nothing else, follows line ``index`` before the next message."""
+    following = []
+    for position in range(index + 1, len(lines)):
+        if _is_boundary(lines, position):
+            break
+        following.append(lines[position].strip())
+    following = [line for line in following if line and not _LEGAL_FOOTER.search(line)]
+    if not following or len(following) > MAX_SIGNATURE_LINES:
+        return False
+    name = following[0]
+    if len(name) > NAME_LINE_CHARS or name.endswith((":", ".", "?", "!")):
+        return False
+    return all(len(line) <= SIGNATURE_LINE_CHARS and not _LIST_ITEM.match(line) for line in following)
+
+
+def _strip_thread(text: str, stats: Dict[str, int]) -> str:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    kept = []
+    quoted = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        if stripped.startswith(">"):
+            quoted.append(stripped.lstrip("> "))
+            stats["quoted_lines"] += 1
+            index += 1
+        elif _is_boundary(lines, index):
+            # Drop the separator/attribution line and any header fields below it
+            index += 1
+            while index < len(lines) and (_HEADER_FIELD.fullmatch(lines[index].strip()) or not lines[index].strip()):
+                index += 1
+            kept.append("")
+        elif line.rstrip("\n") == SIGNATURE_DELIMITER or (
+            _CLOSING.fullmatch(stripped.rstrip(",.!")) and _ends_message(lines, index)
+        ):
+            # The signature runs until the next message starts
+            index += 1
+            while index < len(lines) and not _is_boundary(lines, index):
+                index += 1
+            stats["signatures"] += 1
+            kept.append("")
+        elif _MOBILE_SIGNATURE.fullmatch(stripped):
+            stats["signatures"] += 1
+            index += 1
+        else:
+            kept.append(line)
+            index += 1
+    if not any(line.strip() for line in kept) and quoted:
+        # Nothing but quotes was pasted: the quotes are the content
+        stats["quoted_lines"] = 0
+        kept = quoted
+    return "\n".join(kept)
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [paragraph.strip("\n") for paragraph in _PARAGRAPH_BREAK.split(text) if paragraph.strip()]
+
+
+def _passage_key(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _compact_paragraphs(paragraphs: List[str], seen: Set[str], stats: Dict[str, int],
+                        drop_footers: bool) -> str:
+    kept = []
+    for paragraph in paragraphs:
+        if drop_footers and _LEGAL_FOOTER.search(paragraph):
+            stats["footers"] += 1
+            continue
+        key = _passage_key(paragraph)
+        if len(key) >= DEDUP_MIN_CHARS:
+            if key in seen:
+                stats["duplicate_passages"] += 1
+                continue
+            seen.add(key)
+        # Long lines are also compared on their own, e.g. a sentence repeated below an attachment heading
+        lines = []
+        for line in paragraph.split("\n"):
+            line_key = _passage_key(line)
+            if len(line_key) >= DEDUP_MIN_CHARS and line_key != key:
+                if line_key in seen:
+                    stats["duplicate_passages"] += 1
+                    continue
+                seen.add(line_key)
+            lines.append(line)
+        if any(line.strip() for line in lines):
+            kept.append("\n".join(lines))
+    return "\n\n".join(kept)
+
+
+def compact_context(email_content: Optional[str], file_contents: List[str]) -> Tuple[Optional[str], List[str], Dict[str, int]]:
+    """
+    Compact the email and attachment texts of a request.
+
+    Returns (email, attachment texts, stats); stats count the removed quoted
+    lines, signatures, footers and duplicate passages and the UTF-8 bytes
+    before and after.
+    """
+    stats = {"quoted_lines": 0, "signatures": 0, "footers": 0, "duplicate_passages": 0}
+    original_bytes = len((email_content or "").encode("utf-8")) + sum(len(text.encode("utf-8")) for text in file_contents)
+    seen: Set[str] = set()
+    if email_content:
+        email_content = _compact_paragraphs(_paragraphs(_strip_thread(email_content, stats)), seen, stats, True)
+    # Attachments are only de-duplicated (against the email and each other)
+    file_contents = [_compact_paragraphs(_paragraphs(text), seen, stats, False) for text in file_contents]
+    compacted_bytes = len((email_content or "").encode("utf-8")) + sum(len(text.encode("utf-8")) for text in file_contents)
+    stats.update(original_bytes=original_bytes, compacted_bytes=compacted_bytes,
+                 saved_bytes=original_bytes - compacted_bytes)
+    return email_content, file_contents, stats
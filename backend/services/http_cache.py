@@ -0,0 +1,116 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi.responses import Response
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.environ.get("AGENDA_COMPRESSION_MIN_BYTES", "1024"))
+# How long clients may reuse a rendered ICS before revalidating with If-None-Match
+ICS_MAX_AGE_SECONDS = int(os.environ.get("AGENDA_ICS_MAX_AGE", "3600"))
+# Number of generate results remembered for conditional requests (0 disables)
+GENERATE_ETAG_CACHE_SIZE = int(os.environ.get("AGENDA_GENERATE_ETAG_CACHE_SIZE", "256"))
+
+
+def content_etag(*parts) -> str:
+    """Deterministic strong ETag over the given str/bytes parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b""
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        # Length-prefix every part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against our ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Empty 304 response carrying the validator headers."""
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+
+
+class EtagCache:
+    """Small LRU mapping a request key to the ETag of its latest result."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        etag = self._entries.get(key)
+        if etag is not None:
+            self._entries.move_to_end(key)
+        return etag
+
+    def put(self, key: str, etag: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = etag
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 5):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for token in accept_encoding.split(","):
+        name, _, params = token.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip middleware that prefers brotli when the client and server support it."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif "gzip" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
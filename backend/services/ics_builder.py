@@ -0,0 +1,141 @@
+import logging
+import re
+from datetime import datetime
+
+from icalendar import Calendar, Event, vRecur, vText
+
+from services.models import Agenda, AgendaItem, parse_agenda
+from services.recurrence import floating_until, normalize_rule
+
+logger = logging.getLogger(__name__)
+
+
+def build_ics_filename(topic: str, start_time: str) -> str:
+    """Build a "YYYY-MM-DD HH-MM Topic.ics" filename for the download."""
+    try:
+        start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
+        year = start_dt.year
+        month = str(start_dt.month).zfill(2)
+        day = str(start_dt.day).zfill(2)
+        hours = str(start_dt.hour).zfill(2)
+        minutes = str(start_dt.minute).zfill(2)
+
+        # Sanitize topic for filename
+        sanitized_topic = re.sub(r'[^a-zA-Z0-9\s]', '', topic).strip()
+        sanitized_topic = re.sub(r'\s+', ' ', sanitized_topic)[:50]
+
+        return f"{year}-{month}-{day} {hours}-{minutes} {sanitized_topic}.ics"
+    except Exception:
+        return "meeting_agenda.ics"
+
+
+def get_icon(title: str) -> str:
+    """Helper for emojis (duplicate of frontend logic for consistency)."""
+    lower = title.lower()
+    if 'coffee' in lower or 'kaffee' in lower: return '☕'
+    if 'lunch' in lower or 'mittag' in lower: return '🍽️'
+    if 'dinner' in lower or 'social' in lower or 'abendessen' in lower or 'sozial' in lower: return '🍻'
+    if 'break' in lower or 'pause' in lower: return '🧘'
+    if 'intro' in lower: return '👋'
+    if 'conclu' in lower or 'wrap' in lower: return '🏁'
+    return '📅'
+
+
+def _format_item(item: AgendaItem, text_parts: list) -> None:
+    time_slot = item.time_slot
+    title = item.title
+    duration = item.duration
+    description = item.description
+
+    # Format each item
+    icon = get_icon(title)
+    formatted_title = f"{icon} {title.upper()}"
+
+    if time_slot:
+        header = f"{time_slot} - {formatted_title}"
+        if duration:
+            # Remove redundant 'mins' if present in duration string
+            clean_duration = duration.replace(' mins', '').replace(' min', '')
+            header += f" ({clean_duration} min)"
+        text_parts.append(header)
+    else:
+        text_parts.append(f"* {formatted_title}")
+
+    if description:
+        # Keep description very short (max 100 chars or first sentence)
+        short_desc = description.split('.')[0] + "."
+        if len(short_desc) > 100:
+            short_desc = short_desc[:97] + "..."
+        text_parts.append(f"  {short_desc}")
+    text_parts.append("")
+
+
+def format_agenda_description(agenda: Agenda) -> str:
+    """Render a validated agenda as the plain-text event description."""
+    text_parts = []
+    text_parts.append(agenda.title.upper())
+    text_parts.append("=" * len(text_parts[0]))
+    text_parts.append("")
+
+    if agenda.summary is not None:
+        text_parts.append(agenda.summary)
+        text_parts.append("")
+
+    # Handle Multi-day
+    if agenda.days is not None:
+        for i, day in enumerate(agenda.days):
+            text_parts.append(f"DAY {i+1} - {day.date}")
+            text_parts.append("-" * 40)
+
+            for item in day.items:
+                _format_item(item, text_parts)
+            text_parts.append("")
+
+    # Handle Simple List or Single Day
+    elif agenda.items is not None:
+        text_parts.append("AGENDA ITEMS:")
+        text_parts.append("-" * 40)
+        text_parts.append("")
+        for item in agenda.items:
+            _format_item(item, text_parts)
+
+    return "\n".join(text_parts)
+
+
+def build_ics(topic: str, start_time: str, end_time: str, location: str, agenda_content: str,
+              recurrence: str = None) -> bytes:
+    """Render a single-event calendar for the agenda and return the ICS bytes.
+
+    With ``recurrence`` (an RRULE such as "FREQ=WEEKLY;COUNT=52") the event
+    becomes a series: one VEVENT whose first occurrence is start/end.
+    """
+    cal = Calendar()
+    cal.add('prodid', '-//Agenda Planner//mxm.dk//')
+    cal.add('version', '2.0')
+
+    event = Event()
+    event.add('summary', topic)
+
+    # Parse times (assuming local ISO strings from frontend)
+    start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
+    end_dt = datetime.fromisoformat(end_time.replace('Z', ''))
+
+    event.add('dtstart', start_dt)
+    event.add('dtend', end_dt)
+    event.add('dtstamp', datetime.now())
+    event.add('location', vText(location))
+    if recurrence:
+        # DTSTART is floating, so UNTIL must be floating as well
+        event.add('rrule', vRecur.from_ical(floating_until(normalize_rule(recurrence))))
+
+    # Format agenda content as plain text with simple formatting
+    agenda = parse_agenda(agenda_content)
+    if agenda is not None:
+        event.add('description', format_agenda_description(agenda))
+    else:
+        # Fallback to plain text if the content is not agenda JSON
+        logger.debug("Agenda content is not valid agenda JSON, using plain text")
+        event.add('description', agenda_content)
+
+    cal.add_component(event)
+    return cal.to_ical()
@@ -0,0 +1,108 @@
+"""
+Model routing for LLM calls.
+
+Each call is routed by task ("agenda", "refine", "translate"), schedule type
+and estimated prompt size to one of the configured models. Rules are checked
+in order and the first match wins; a rule matches when all of its keys do:
+
+- ``task``: the kind of call
+- ``schedule``: schedule type of an agenda ("simple", "scheduled", "multi_day")
+- ``max_prompt_tokens`` / ``min_prompt_tokens``: bounds on the estimated prompt size
+
+Configured through environment variables:
+- AGENDA_MODEL_SMALL / AGENDA_MODEL_LARGE / AGENDA_MODEL_DEFAULT: model names
+  used by the default table (all "local-model" unless set)
+- AGENDA_MODEL_ROUTES: JSON list of rules replacing the default table, e.g.
+  ``[{"task": "refine", "model": "qwen2.5-3b"}, {"model": "qwen2.5-32b"}]``
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+SMALL_MODEL = os.environ.get("AGENDA_MODEL_SMALL", "local-model")
+LARGE_MODEL = os.environ.get("AGENDA_MODEL_LARGE", "local-model")
+DEFAULT_MODEL = os.environ.get("AGENDA_MODEL_DEFAULT", "local-model")
+
+DEFAULT_ROUTES: List[Dict[str, Any]] = [
+    {"task": "refine", "model": SMALL_MODEL},
+    {"task": "translate", "model": SMALL_MODEL},
+    {"task": "agenda", "schedule": "simple", "model": SMALL_MODEL},
+    {"task": "agenda", "schedule": "multi_day", "model": LARGE_MODEL},
+    # Single-day agendas with little context fit the small model
+    {"task": "agenda", "max_prompt_tokens": 1500, "model": SMALL_MODEL},
+    {"model": DEFAULT_MODEL},
+]
+
+ROUTES: List[Dict[str, Any]] = (
+    json.loads(os.environ["AGENDA_MODEL_ROUTES"]) if os.environ.get("AGENDA_MODEL_ROUTES") else DEFAULT_ROUTES
+)
+
+# Recent latencies kept per model for the percentiles on /health
+LATENCY_WINDOW = 200
+
+_lock = threading.Lock()
+_latencies: Dict[str, deque] = {}
+_counters: Dict[str, Dict[str, int]] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); good enough for routing."""
+    return len(text) // 4 + 1
+
+
+def _matches(rule: Dict[str, Any], task: str, schedule: Optional[str], tokens: int) -> bool:
+    if "task" in rule and rule["task"] != task:
+        return False
+    if "schedule" in rule and rule["schedule"] != schedule:
+        return False
+    if "max_prompt_tokens" in rule and tokens > rule["max_prompt_tokens"]:
+        return False
+    if "min_prompt_tokens" in rule and tokens < rule["min_prompt_tokens"]:
+        return False
+    return True
+
+
+def route(task: str, prompt_tokens: int, schedule: Optional[str] = None) -> str:
+    """Model for a call; falls back to DEFAULT_MODEL if no rule matches."""
+    for rule in ROUTES:
+        if _matches(rule, task, schedule, prompt_tokens):
+            return rule["model"]
+    return DEFAULT_MODEL
+
+
+def record_call(model: str, seconds: float, failed: bool = False) -> None:
+    with _lock:
+        counters = _counters.setdefault(model, {"calls": 0, "failed": 0})
+        counters["calls"] += 1
+        if failed:
+            counters["failed"] += 1
+        else:
+            _latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def model_stats() -> Dict[str, Any]:
+    """Call counts and recent latency (seconds) per model, exposed on /health."""
+    with _lock:
+        stats = {}
+        for model, counters in _counters.items():
+            recent = sorted(_latencies.get(model, ()))
+            stats[model] = dict(counters)
+            if recent:
+                stats[model].update(
+                    p50_seconds=round(_percentile(recent, 0.5), 3),
+                    p95_seconds=round(_percentile(recent, 0.95), 3),
+                    max_seconds=round(recent[-1], 3),
+                )
+        return stats
+
+
+def reset_stats() -> None:
+    with _lock:
+        _latencies.clear()
+        _counters.clear()
@@ -0,0 +1,163 @@
+"""
+Typed agenda, schedule and API response models.
+
+LLM output is validated once into ``Agenda`` (pydantic's Rust core parses
+JSON directly into the models) and re-encoded with ``model_dump_json``;
+everything downstream works on the typed objects. Unknown fields the model
+adds are kept so nothing it returns is silently dropped.
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class AgendaItem(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    title: str = ""
+    description: Optional[str] = None
+    time_slot: Optional[str] = None
+    duration: Optional[str] = None
+    type: Optional[str] = None
+
+
+class AgendaDay(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    date: str = ""
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    items: List[AgendaItem] = []
+
+
+class Agenda(BaseModel):
+    """Agenda JSON: "simple" agendas use ``items``, scheduled ones ``days``."""
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    title: str = "Meeting Agenda"
+    summary: Optional[str] = None
+    items: Optional[List[AgendaItem]] = None
+    days: Optional[List[AgendaDay]] = None
+
+    def to_json(self) -> str:
+        return self.model_dump_json(exclude_none=True)
+
+
+def parse_agenda(content: str) -> Optional[Agenda]:
+    """Validate agenda JSON; returns None if it is not a JSON object of the agenda shape."""
+    try:
+        return Agenda.model_validate_json(content)
+    except (ValidationError, ValueError):
+        return None
+
+
+class Slot(BaseModel):
+    start: str
+    end: str
+    duration_minutes: int
+    type: str
+    title: Optional[str] = None
+
+
+class ScheduleDay(BaseModel):
+    date: str
+    start_time: str
+    end_time: str
+    slots: List[Slot]
+
+
+class Schedule(BaseModel):
+    """Output of ``calculate_time_slots``."""
+    type: str
+    duration_minutes: int
+    num_items: Optional[int] = None
+    days: List[ScheduleDay]
+
+
+class BulkScheduleRequest(BaseModel):
+    """Parallel arrays of local ISO start/end timestamps."""
+    start_times: List[str]
+    end_times: List[str]
+    # "columnar": meetings/days/slots tables; "meetings": one Schedule per meeting
+    format: Literal["columnar", "meetings"] = "columnar"
+
+
+class SeriesVariation(BaseModel):
+    start: str
+    focus: Optional[str] = None
+
+
+class Series(BaseModel):
+    recurrence: str
+    occurrences: List[str]
+    variations: Optional[List[SeriesVariation]] = None
+
+
+class AgendaTranslation(BaseModel):
+    language: str
+    agenda: str
+    agenda_id: str
+    version: int
+
+
+class ContextCompaction(BaseModel):
+    """What was removed from the email and attachment texts before prompting."""
+    original_bytes: int
+    compacted_bytes: int
+    saved_bytes: int
+    quoted_lines: int
+    signatures: int
+    footers: int
+    duplicate_passages: int
+
+
+class GenerateAgendaResponse(BaseModel):
+    # Kept as a JSON string: clients parse it and fall back to raw text
+    agenda: str
+    agenda_id: str
+    version: int
+    language: Optional[str] = None
+    series: Optional[Series] = None
+    # language=BOTH: the other language variant(s), each stored as its own agenda
+    translations: Optional[List[AgendaTranslation]] = None
+    # language=BOTH: languages whose translation failed; nothing is stored for them
+    untranslated: Optional[List[str]] = None
+    context_compaction: Optional[ContextCompaction] = None
+
+
+class RefineTextResponse(BaseModel):
+    refined_text: str
+    # True when the request deadline or the output budget cut the streamed text short
+    partial: Optional[bool] = None
+
+
+class StoredAttachment(BaseModel):
+    hash: str
+    filename: str
+    size: int
+    # False when identical content was already stored
+    created: Optional[bool] = None
+
+
+class StoredAgenda(BaseModel):
+    id: str
+    version: int
+    topic: str
+    start_time: str
+    end_time: str
+    location: str
+    language: Optional[str] = None
+    recurrence: Optional[str] = None
+    created_at: str
+    agenda: str
+
+
+class RescheduleStats(BaseModel):
+    kept: int
+    generated: int
+    removed: int
+    full_regeneration: bool
+
+
+class RescheduledAgenda(StoredAgenda):
+    reschedule: RescheduleStats
@@ -0,0 +1,140 @@
+"""
+Output-length limits for LLM calls.
+
+Every call gets a ``max_tokens`` budget derived from what the answer has to
+contain: for agendas the days and slots from ``calculate_time_slots`` (or
+the number of bullet points of a "simple" agenda), for translations and
+refinements the size of the input text. JSON answers are also cut off as
+soon as their top-level object or array is closed, so a model that keeps
+talking after the JSON costs nothing extra. The budget bounds tail latency
+rather than rejecting verbose answers: an answer that runs into it is
+retried once with a larger budget, and only raises OutputTruncated if that
+is cut off as well. How often each task runs into its budget, is retried or
+stops early is reported on ``/health``.
+
+Configured through environment variables:
+- AGENDA_OUTPUT_TOKENS_PER_ITEM: tokens allowed per agenda item (default: 120)
+- AGENDA_OUTPUT_BUDGET_MARGIN: factor applied on top of the estimate (default: 1.5)
+- AGENDA_OUTPUT_RETRY_FACTOR: budget of the one retry after a cut-off answer,
+  relative to the first budget (default: 3; 1 disables the retry)
+- AGENDA_MAX_OUTPUT_TOKENS: upper bound for translations and refinements
+  (default: 8192); agenda budgets follow the schedule, however long it is
+"""
+import math
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# A work item with a full-sentence description is ~60-90 tokens of JSON; German runs longer
+TOKENS_PER_ITEM = int(os.environ.get("AGENDA_OUTPUT_TOKENS_PER_ITEM", "120"))
+BUDGET_MARGIN = float(os.environ.get("AGENDA_OUTPUT_BUDGET_MARGIN", "1.5"))
+RETRY_FACTOR = float(os.environ.get("AGENDA_OUTPUT_RETRY_FACTOR", "3"))
+MAX_OUTPUT_TOKENS = int(os.environ.get("AGENDA_MAX_OUTPUT_TOKENS", "8192"))
+
+# Agenda title and summary, and the date/time header of each day
+BASE_TOKENS = 100
+DAY_TOKENS = 40
+# Lower bound, so tiny inputs still leave room for the JSON around them
+MIN_OUTPUT_TOKENS = 128
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class OutputTruncated(Exception):
+    """The model ran into its ``max_tokens`` budget; ``partial`` holds the text it produced."""
+
+    def __init__(self, max_tokens: Optional[int], partial: str = ""):
+        super().__init__(f"Model output was cut off at the budget of {max_tokens} tokens")
+        self.max_tokens = max_tokens
+        self.partial = partial
+
+
+def _bounded(estimate: float, cap: Optional[int] = None) -> int:
+    budget = max(MIN_OUTPUT_TOKENS, math.ceil(estimate * BUDGET_MARGIN))
+    return budget if cap is None else min(cap, budget)
+
+
+def agenda_budget(schedule: Dict[str, Any]) -> int:
+    """Output tokens for an agenda covering ``schedule``."""
+    if schedule["type"] == "simple":
+        items = schedule["num_items"]
+    else:
+        items = sum(len(day["slots"]) for day in schedule["days"])
+    return _bounded(BASE_TOKENS + DAY_TOKENS * len(schedule["days"]) + TOKENS_PER_ITEM * items)
+
+
+def items_budget(count: int) -> int:
+    """Output tokens for a list of ``count`` agenda items."""
+    return _bounded(TOKENS_PER_ITEM * count)
+
+
+def rewrite_budget(input_tokens: int) -> int:
+    """Output tokens for a translation or refinement of ``input_tokens`` tokens of text."""
+    # Translations into German and refined wording can be noticeably longer
+    return _bounded(2 * input_tokens + DAY_TOKENS, MAX_OUTPUT_TOKENS)
+
+
+def retry_budget(max_tokens: Optional[int]) -> Optional[int]:
+    """Budget for the one retry of an answer cut off at ``max_tokens``, or None if there is no retry."""
+    if max_tokens is None or RETRY_FACTOR <= 1:
+        return None
+    return math.ceil(max_tokens * RETRY_FACTOR)
+
+
+class JsonEndDetector:
+    """
+    Finds the end of the first top-level JSON object or array in streamed text.
+
+    Text before the opening bracket (e.g. a Markdown code fence) is skipped;
+    brackets inside strings are ignored.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Position in ``chunk`` just after the closing bracket, or None if still open."""
+        for index, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char in "{[":
+                self.started = True
+                self.depth += 1
+            elif not self.started:
+                continue
+            elif char == '"':
+                self.in_string = True
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return index + 1
+        return None
+
+
+def record_output(task: str, budget_hit: bool, stopped_early: bool, retried: bool = False) -> None:
+    with _lock:
+        stats = _stats.setdefault(task, {"calls": 0, "budget_hit": 0, "retried": 0, "stopped_early": 0})
+        stats["calls"] += 1
+        stats["budget_hit"] += budget_hit
+        stats["retried"] += retried
+        stats["stopped_early"] += stopped_early
+
+
+def budget_stats() -> Dict[str, Dict[str, int]]:
+    """Calls per task, how many ran into their max_tokens budget, were retried and stopped at the JSON end."""
+    with _lock:
+        return {task: dict(stats) for task, stats in _stats.items()}
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,183 @@
+"""
+Opt-in sampling profiler.
+
+A background thread samples the stacks of all other threads at a fixed
+interval and counts them in the "folded" format (``frame;frame;frame count``
+per line) understood by flamegraph.pl, speedscope and inferno. The event
+loop and worker pool threads are sampled alike, so a profile shows prompt
+building, JSON handling, ICS rendering and time spent waiting on the LLM
+side by side. Process-pool workers are not visible to the sampler.
+
+Profiles always cover the whole process: the event loop and the worker
+threads are shared by all requests, so a per-request profile also contains
+whatever concurrent requests did while it ran. Profile a request on an
+otherwise idle server to see it on its own.
+
+Configured through environment variables:
+- AGENDA_PROFILING: "1" enables per-request profiles and the sampling toggle
+- AGENDA_PROFILE_DIR: where per-request profiles are stored (default: profiles)
+- AGENDA_PROFILE_INTERVAL_MS: sampling interval (default: 5)
+"""
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+from starlette.datastructures import Headers, QueryParams
+
+PROFILING_ENABLED = os.environ.get("AGENDA_PROFILING", "0").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("AGENDA_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("AGENDA_PROFILE_INTERVAL_MS", "5")) / 1000
+
+# Endpoints that can be profiled per request
+PROFILED_PATHS = ("/generate-agenda", "/refine-text", "/create-ics")
+
+PROFILER_THREAD_NAME = "agenda-profiler"
+
+_PROFILE_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class SamplingProfiler:
+    """Counts folded stacks of every other thread until stopped."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=PROFILER_THREAD_NAME, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; blocks until the sampler thread has exited, so call it off the event loop."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                # Skip this and any concurrently running sampler
+                if name != PROFILER_THREAD_NAME:
+                    self.samples[_fold(name, frame)] += 1
+
+    def folded(self) -> str:
+        """Profile in folded-stack format, heaviest stacks first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _fold(thread_name: str, frame) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    frames.append(thread_name)
+    return ";".join(reversed(frames))
+
+
+def save_profile(profile_id: str, folded: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(folded)
+    return path
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    """Stored profile by ID, or None if unknown."""
+    if not _PROFILE_ID.fullmatch(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+# Process-wide sampler switched on and off at runtime
+_global_sampler: Optional[SamplingProfiler] = None
+
+
+def set_sampling(enabled: bool) -> dict:
+    """Start or stop process-wide sampling; stopping keeps the collected samples."""
+    global _global_sampler
+    if enabled and (_global_sampler is None or not _global_sampler.running):
+        _global_sampler = SamplingProfiler()
+        _global_sampler.start()
+    elif not enabled and _global_sampler is not None:
+        _global_sampler.stop()
+    return sampling_status()
+
+
+def sampling_status() -> dict:
+    if _global_sampler is None:
+        return {"enabled": False, "samples": 0}
+    return {
+        "enabled": _global_sampler.running,
+        "samples": sum(_global_sampler.samples.values()),
+        "since": _global_sampler.started_at,
+    }
+
+
+def sampling_profile() -> str:
+    return _global_sampler.folded() if _global_sampler is not None else ""
+
+
+def profile_requested(scope) -> bool:
+    """True for profiled endpoints asked for via ``X-Profile: 1`` or ``?profile=1``."""
+    if not PROFILING_ENABLED or scope["type"] != "http" or scope["path"] not in PROFILED_PATHS:
+        return False
+    flag = Headers(scope=scope).get("x-profile") or QueryParams(scope.get("query_string", b"")).get("profile")
+    return flag in ("1", "true")
+
+
+class ProfilingMiddleware:
+    """
+    Runs requests that ask for it under a SamplingProfiler.
+
+    The profile is stored as ``<AGENDA_PROFILE_DIR>/<id>.folded`` and its ID
+    returned in the ``X-Profile-Id`` response header. It covers every thread
+    of the process while the request ran, including concurrent requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # Joining the sampler and writing the file would block the event loop
+            await asyncio.to_thread(profiler.stop)
+            await asyncio.to_thread(save_profile, profile_id, profiler.folded())
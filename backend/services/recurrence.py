@@ -0,0 +1,91 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List
+
+from dateutil.rrule import rrulestr
+
+from services.models import Agenda, parse_agenda
+
+# Occurrence dates listed in API responses are capped; the RRULE itself is unbounded
+MAX_LISTED_OCCURRENCES = 366
+
+_FREQUENCY_LABELS = {
+    "DAILY": "daily",
+    "WEEKLY": "weekly",
+    "MONTHLY": "monthly",
+    "YEARLY": "yearly",
+}
+
+
+def normalize_rule(rule: str) -> str:
+    """Strip an optional "RRULE:" prefix and surrounding whitespace."""
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[6:]
+    return rule.upper()
+
+
+def floating_until(rule: str) -> str:
+    """Drop the "Z" of a UTC UNTIL, so it matches a floating DTSTART as RFC 5545 requires."""
+    return re.sub(r"(UNTIL=\d{8}T\d{6})Z", r"\1", rule)
+
+
+def series_occurrences(rule: str, start_time: str, limit: int = MAX_LISTED_OCCURRENCES) -> List[str]:
+    """
+    Expand a recurrence rule from the first meeting start.
+
+    Raises ValueError for rules dateutil cannot parse. Returns ISO start
+    times, at most ``limit`` of them.
+    """
+    start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
+    rule = normalize_rule(rule)
+    if "FREQ=" not in rule:
+        raise ValueError("Recurrence rule must contain FREQ, e.g. FREQ=WEEKLY;COUNT=12")
+    # Meeting times are naive local times, so a UTC UNTIL is read as local too
+    rule = floating_until(rule)
+    try:
+        recurrence = rrulestr(f"RRULE:{rule}", dtstart=start_dt)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid recurrence rule: {e}")
+
+    occurrences = []
+    for occurrence in recurrence:
+        occurrences.append(occurrence.isoformat())
+        if len(occurrences) >= limit:
+            break
+    return occurrences
+
+
+def describe_rule(rule: str) -> str:
+    """Short human description used in the prompt, e.g. "every 2 weeks"."""
+    parts = dict(part.split("=", 1) for part in normalize_rule(rule).split(";") if "=" in part)
+    frequency = _FREQUENCY_LABELS.get(parts.get("FREQ", ""), "recurring")
+    interval = parts.get("INTERVAL", "1")
+    if interval != "1" and frequency != "recurring":
+        unit = {"daily": "days", "weekly": "weeks", "monthly": "months", "yearly": "years"}[frequency]
+        return f"every {interval} {unit}"
+    return frequency
+
+
+def series_variations(agenda_content: str, occurrences: List[str]) -> List[Dict[str, Any]]:
+    """
+    Cheap per-occurrence variations without further LLM calls.
+
+    Each occurrence gets one of the base agenda's content items as its focus
+    topic, rotating through them so consecutive meetings emphasise
+    different points.
+    """
+    agenda = parse_agenda(agenda_content) or Agenda()
+
+    items = list(agenda.items or [])
+    for day in agenda.days or []:
+        items.extend(day.items)
+    topics = [item.title for item in items if item.title and (item.type or "work") == "work"]
+
+    variations = []
+    for index, occurrence in enumerate(occurrences):
+        variations.append({
+            "start": occurrence,
+            "focus": topics[index % len(topics)] if topics else None,
+        })
+    return variations
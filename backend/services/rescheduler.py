@@ -0,0 +1,179 @@
+"""
+Incremental regeneration of agendas whose meeting times changed.
+
+The old and new schedules from ``calculate_time_slots`` are diffed day by day
+(days are matched by position, so moving a meeting to another date keeps its
+content). Slots that still exist with the same bounds keep their agenda item,
+breaks reuse the old break items or a standard title, and only new or resized
+work slots are sent to the LLM. If the schedule type changes between a short
+bullet-point meeting and a scheduled one, the agenda is generated from scratch
+with the stored recurrence and email/attachment context, so it still describes
+the same meeting series.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.agenda_generator import generate_agenda_content, generate_slot_items
+from services.models import AgendaDay, AgendaItem, parse_agenda
+from services.time_slot_calculator import calculate_time_slots
+
+BREAK_TITLES = {
+    "DE": {"coffee_break": "Kaffeepause", "lunch_break": "Mittagspause", "social": "Abendessen / Networking"},
+    "EN": {"coffee_break": "Coffee Break", "lunch_break": "Lunch Break", "social": "Dinner / Social event"},
+}
+
+
+def _overlap(a: Dict[str, Any], b: Dict[str, Any]) -> int:
+    if not (a["end"] and b["end"]):
+        return 0
+    start = max(a["start"], b["start"])
+    end = min(a["end"], b["end"])
+    return (int(end[:2]) * 60 + int(end[3:])) - (int(start[:2]) * 60 + int(start[3:])) if start < end else 0
+
+
+def diff_schedules(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[List[List[Tuple[str, Optional[dict]]]], int]:
+    """
+    Classify every slot of ``new`` against ``old``.
+
+    Returns, per new day, a list of (status, old slot) for its slots, where
+    status is "unchanged" (same bounds and type), "resized" (overlaps an old
+    slot of the same type) or "new"; plus the number of old slots that have
+    no counterpart any more.
+    """
+    result = []
+    matched = set()
+    for day_index, day in enumerate(new["days"]):
+        old_slots = old["days"][day_index]["slots"] if day_index < len(old["days"]) else []
+        statuses = []
+        for slot in day["slots"]:
+            same_type = [(index, old_slot) for index, old_slot in enumerate(old_slots) if old_slot["type"] == slot["type"]]
+            exact = [(index, old_slot) for index, old_slot in same_type
+                     if old_slot["start"] == slot["start"] and old_slot["end"] == slot["end"]]
+            if exact:
+                matched.add((day_index, exact[0][0]))
+                statuses.append(("unchanged", exact[0][1]))
+                continue
+            overlapping = [(index, old_slot) for index, old_slot in same_type if _overlap(old_slot, slot) > 0]
+            if overlapping:
+                index, old_slot = max(overlapping, key=lambda pair: _overlap(pair[1], slot))
+                matched.add((day_index, index))
+                statuses.append(("resized", old_slot))
+            else:
+                statuses.append(("new", None))
+        result.append(statuses)
+    removed = sum(len(day["slots"]) for day in old["days"]) - len(matched)
+    return result, removed
+
+
+def _time_slot(slot: Dict[str, Any]) -> str:
+    return f"{slot['start']} - {slot['end']}" if slot["end"] else slot["start"]
+
+
+def _find_item(items: List[AgendaItem], slot: Dict[str, Any]) -> Optional[AgendaItem]:
+    """The old agenda item written for ``slot`` (matched on its time slot, breaks on their type)."""
+    label = _time_slot(slot).replace(" ", "")
+    for item in items:
+        if (item.time_slot or "").replace(" ", "") == label:
+            return item
+    for item in items:
+        if (item.time_slot or "").startswith(slot["start"]) and (item.type in (None, slot["type"])):
+            return item
+    if slot["type"] != "work":
+        return next((item for item in items if item.type == slot["type"]), None)
+    return None
+
+
+def _content_slots(schedule: Dict[str, Any]) -> int:
+    """Number of items the LLM writes content for: agenda points or work slots."""
+    if schedule["type"] == "simple":
+        return schedule["num_items"]
+    return sum(1 for day in schedule["days"] for slot in day["slots"] if slot["type"] == "work")
+
+
+def _slot_item(slot: Dict[str, Any], title: str, description: Optional[str]) -> AgendaItem:
+    return AgendaItem(
+        time_slot=_time_slot(slot),
+        title=title,
+        description=description,
+        duration=f"{slot['duration_minutes']} mins",
+        type=slot["type"],
+    )
+
+
+async def reschedule_agenda(content: str, topic: str, language: Optional[str], old_start: str, old_end: str,
+                            new_start: str, new_end: str, recurrence: Optional[str] = None,
+                            context: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Move an agenda to new start/end times; returns (agenda JSON, stats).
+
+    ``recurrence`` and ``context`` (the stored email and attachment text) are
+    only needed when the agenda has to be regenerated from scratch.
+    """
+    language = language or "DE"
+    old_schedule = calculate_time_slots(old_start, old_end)
+    new_schedule = calculate_time_slots(new_start, new_end)
+    agenda = parse_agenda(content)
+
+    old_simple = old_schedule["type"] == "simple"
+    new_simple = new_schedule["type"] == "simple"
+    usable = agenda is not None and (agenda.items is not None if old_simple else agenda.days is not None)
+    if not usable or old_simple != new_simple:
+        context = context or {}
+        regenerated = await generate_agenda_content(
+            topic, new_start, new_end, language, context.get("email_content"), context.get("file_contents"),
+            recurrence=recurrence,
+        )
+        stats = {"kept": 0, "generated": _content_slots(new_schedule), "removed": _content_slots(old_schedule),
+                 "full_regeneration": True}
+        return regenerated, stats
+
+    if new_simple:
+        kept = list(agenda.items[:new_schedule["num_items"]])
+        missing = new_schedule["num_items"] - len(kept)
+        if missing > 0:
+            kept += await generate_slot_items(
+                topic, language, [{} for _ in range(missing)], [item.title for item in kept], "simple"
+            )
+        result = agenda.model_copy(update={"items": kept})
+        stats = {"kept": min(len(agenda.items), new_schedule["num_items"]), "generated": max(missing, 0),
+                 "removed": max(len(agenda.items) - new_schedule["num_items"], 0), "full_regeneration": False}
+        return result.to_json(), stats
+
+    diff, removed = diff_schedules(old_schedule, new_schedule)
+    break_titles = BREAK_TITLES.get(language, BREAK_TITLES["EN"])
+    days: List[List[Optional[AgendaItem]]] = []
+    to_generate = []
+    kept_titles = []
+    for day_index, (day, statuses) in enumerate(zip(new_schedule["days"], diff)):
+        old_items = agenda.days[day_index].items if day_index < len(agenda.days) else []
+        day_items = []
+        for slot, (status, old_slot) in zip(day["slots"], statuses):
+            old_item = _find_item(old_items, old_slot) if old_slot is not None else None
+            if slot["type"] != "work":
+                title = old_item.title if old_item is not None else break_titles.get(slot["type"], slot["type"])
+                day_items.append(_slot_item(slot, title, old_item.description if old_item else None))
+            elif status == "unchanged" and old_item is not None:
+                day_items.append(old_item.model_copy(update={"time_slot": _time_slot(slot)}))
+                kept_titles.append(old_item.title)
+            else:
+                day_items.append(None)
+                to_generate.append((day_index, len(day_items) - 1, {
+                    **slot,
+                    "day": day_index + 1 if new_schedule["type"] == "multi_day" else None,
+                    "previous_title": old_item.title if old_item is not None else None,
+                }))
+        days.append(day_items)
+
+    if to_generate:
+        generated = await generate_slot_items(
+            topic, language, [slot for _, _, slot in to_generate], kept_titles, new_schedule["type"]
+        )
+        for (day_index, item_index, slot), item in zip(to_generate, generated):
+            days[day_index][item_index] = _slot_item(slot, item.title, item.description)
+
+    result = agenda.model_copy(update={"days": [
+        AgendaDay(date=day["date"], start_time=day["start_time"], end_time=day["end_time"], items=items)
+        for day, items in zip(new_schedule["days"], days)
+    ]})
+    stats = {"kept": _content_slots(new_schedule) - len(to_generate), "generated": len(to_generate),
+             "removed": removed, "full_regeneration": False}
+    return result.to_json(), stats
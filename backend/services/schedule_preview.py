@@ -0,0 +1,71 @@
+"""
+Memoized schedule previews.
+
+``calculate_time_slots`` is deterministic once start and end are rounded to
+the 15-minute grid, so the encoded schedule for a rounded (start, end) pair is
+computed once and served from an in-memory LRU afterwards. This keeps
+``/schedule-preview`` cheap enough to call on every form change.
+"""
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from services.http_cache import content_etag
+from services.models import Schedule
+from services.time_slot_calculator import calculate_time_slots, round_to_15_minutes
+
+# Rounded (start, end) pairs kept in memory (0 disables the cache)
+CACHE_SIZE = int(os.environ.get("AGENDA_SCHEDULE_PREVIEW_CACHE_SIZE", "1024"))
+
+_cache: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def preview_key(start_time: str, end_time: str) -> Tuple[str, str]:
+    """Round both times onto the 15-minute grid; raises ValueError for invalid ranges."""
+    start_dt = round_to_15_minutes(datetime.fromisoformat(start_time.replace('Z', '')))
+    end_dt = round_to_15_minutes(datetime.fromisoformat(end_time.replace('Z', '')))
+    if end_dt <= start_dt:
+        raise ValueError("end_time must be at least 15 minutes after start_time")
+    return start_dt.isoformat(), end_dt.isoformat()
+
+
+def _cache_get(key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+    entry = _cache.get(key)
+    if entry is not None:
+        _cache.move_to_end(key)
+    return entry
+
+
+def _cache_put(key: Tuple[str, str], entry: Tuple[str, str]) -> None:
+    if CACHE_SIZE <= 0:
+        return
+    _cache[key] = entry
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def schedule_preview(start_time: str, end_time: str) -> Tuple[str, str]:
+    """Return (schedule JSON, ETag) for the time range, computing it at most once per rounded range."""
+    key = preview_key(start_time, end_time)
+    entry = _cache_get(key)
+    if entry is not None:
+        _stats["hits"] += 1
+        return entry
+
+    _stats["misses"] += 1
+    body = Schedule.model_validate(calculate_time_slots(*key)).model_dump_json(exclude_none=True)
+    entry = (body, content_etag(body))
+    _cache_put(key, entry)
+    return entry
+
+
+def preview_stats() -> dict:
+    return {"size": CACHE_SIZE, "entries": len(_cache), **_stats}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    _stats.update(hits=0, misses=0)
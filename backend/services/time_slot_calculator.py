@@ -1,12 +1,35 @@
 from datetime import datetime, timedelta, time
 from typing import List, Dict, Any
 
+from services.working_days import working_calendar
+
+# Standard day template used for every scheduled day
+STANDARD_SLOTS = [
+    {"start": "08:30", "end": "10:15", "type": "work"},
+    {"start": "10:15", "end": "10:45", "type": "coffee_break"},
+    {"start": "10:45", "end": "12:30", "type": "work"},
+    {"start": "12:30", "end": "13:30", "type": "lunch_break"},
+    {"start": "13:30", "end": "15:15", "type": "work"},
+    {"start": "15:15", "end": "15:45", "type": "coffee_break"},
+    {"start": "15:45", "end": "17:30", "type": "work"}
+]
+
+# Offsets (minutes) tried when a break collides with an attendee's busy time
+BREAK_SHIFTS = [0, 15, -15, 30, -30, 45, -45, 60, -60]
+
 def round_to_15_minutes(dt: datetime) -> datetime:
     """Round datetime to nearest 15-minute interval."""
     minutes = (dt.minute // 15) * 15
     return dt.replace(minute=minutes, second=0, microsecond=0)
 
-def calculate_time_slots(start_time: str, end_time: str) -> Dict[str, Any]:
+def round_up_to_15_minutes(dt: datetime) -> datetime:
+    """Round datetime up to the next 15-minute interval (unchanged if on the grid)."""
+    rounded = round_to_15_minutes(dt)
+    if rounded < dt:
+        rounded += timedelta(minutes=15)
+    return rounded
+
+def calculate_time_slots(start_time: str, end_time: str, busy=None) -> Dict[str, Any]:
     """
     Calculate deterministic time slots based on meeting duration.
     
@@ -16,6 +39,8 @@ def calculate_time_slots(start_time: str, end_time: str) -> Dict[str, Any]:
     3. Meetings > 120 min: Breaks every 90-120 min, intelligently placed
     4. Multi-day: 08:30 start, 17:30 end, automatic lunch break 12:00-13:00
     5. Multi-day: Separate agenda per day
+    6. Optional ``busy`` (a BusyIndex of attendee commitments): work blocks
+       and breaks are placed around the busy intervals
     """
     start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
     end_dt = datetime.fromisoformat(end_time.replace('Z', ''))
@@ -30,11 +55,11 @@ def calculate_time_slots(start_time: str, end_time: str) -> Dict[str, Any]:
     is_multi_day = start_dt.date() != end_dt.date()
     
     if is_multi_day:
-        return calculate_multi_day_slots(start_dt, end_dt)
+        return calculate_multi_day_slots(start_dt, end_dt, busy)
     else:
-        return calculate_single_day_slots(start_dt, end_dt, total_minutes)
+        return calculate_single_day_slots(start_dt, end_dt, total_minutes, busy)
 
-def calculate_single_day_slots(start_dt: datetime, end_dt: datetime, total_minutes: int) -> Dict[str, Any]:
+def calculate_single_day_slots(start_dt: datetime, end_dt: datetime, total_minutes: int, busy=None) -> Dict[str, Any]:
     """Calculate slots for single-day meeting using standard schedule."""
     
     # Meetings < 60 minutes: no time slots
@@ -51,7 +76,7 @@ def calculate_single_day_slots(start_dt: datetime, end_dt: datetime, total_minut
             }]
         }
     
-    slots = apply_standard_schedule(start_dt, end_dt)
+    slots = apply_standard_schedule(start_dt, end_dt, busy)
     
     # Add Dinner / Social event if the meeting goes until at least 17:30
     # User request: "generell nirgendwo" (interpreted as generally everywhere appropriate)
@@ -75,13 +100,19 @@ def calculate_single_day_slots(start_dt: datetime, end_dt: datetime, total_minut
         }]
     }
 
-def calculate_multi_day_slots(start_dt: datetime, end_dt: datetime) -> Dict[str, Any]:
-    """Calculate slots for multi-day meeting."""
+def calculate_multi_day_slots(start_dt: datetime, end_dt: datetime, busy=None) -> Dict[str, Any]:
+    """Calculate slots for multi-day meeting.
+
+    Only working days (see services.working_days) are scheduled; a meeting
+    that lies entirely on non-working days keeps all of its days.
+    """
     days = []
-    current_date = start_dt.date()
     end_date = end_dt.date()
-    
-    while current_date <= end_date:
+    dates = working_calendar.working_days(start_dt.date(), end_date)
+    if not dates:
+        dates = [start_dt.date() + timedelta(days=offset) for offset in range((end_date - start_dt.date()).days + 1)]
+
+    for current_date in dates:
         # Determine start and end times for this day
         if current_date == start_dt.date():
             day_start = start_dt
@@ -94,7 +125,7 @@ def calculate_multi_day_slots(start_dt: datetime, end_dt: datetime) -> Dict[str,
             day_end = datetime.combine(current_date, time(17, 30))
         
         # Apply standard schedule
-        day_slots = apply_standard_schedule(day_start, day_end)
+        day_slots = apply_standard_schedule(day_start, day_end, busy)
 
         include_dinner = True
         if current_date == end_date:
@@ -118,8 +149,6 @@ def calculate_multi_day_slots(start_dt: datetime, end_dt: datetime) -> Dict[str,
             "end_time": day_end.strftime("%H:%M"),
             "slots": day_slots
         })
-        
-        current_date += timedelta(days=1)
     
     total_minutes = sum(
         sum(slot["duration_minutes"] for slot in day["slots"])
@@ -132,7 +161,7 @@ def calculate_multi_day_slots(start_dt: datetime, end_dt: datetime) -> Dict[str,
         "days": days
     }
 
-def apply_standard_schedule(start_dt: datetime, end_dt: datetime) -> List[Dict[str, Any]]:
+def apply_standard_schedule(start_dt: datetime, end_dt: datetime, busy=None) -> List[Dict[str, Any]]:
     """
     Apply standard day schedule to a given time range.
     Standard Day:
@@ -143,22 +172,17 @@ def apply_standard_schedule(start_dt: datetime, end_dt: datetime) -> List[Dict[s
     13:30 - 15:15 Work
     15:15 - 15:45 Coffee Break
     15:45 - 17:30 Work
+
+    If ``busy`` has commitments inside the range, the busy-aware placement
+    is used instead.
     """
+    if busy is not None and not busy.is_free(start_dt, end_dt):
+        return apply_busy_aware_schedule(start_dt, end_dt, busy)
+
     slots = []
     current_date = start_dt.date()
     
-    # Define standard slots for the day
-    standard_slots = [
-        {"start": "08:30", "end": "10:15", "type": "work"},
-        {"start": "10:15", "end": "10:45", "type": "coffee_break"},
-        {"start": "10:45", "end": "12:30", "type": "work"},
-        {"start": "12:30", "end": "13:30", "type": "lunch_break"},
-        {"start": "13:30", "end": "15:15", "type": "work"},
-        {"start": "15:15", "end": "15:45", "type": "coffee_break"},
-        {"start": "15:45", "end": "17:30", "type": "work"}
-    ]
-    
-    for slot in standard_slots:
+    for slot in STANDARD_SLOTS:
         slot_start = datetime.combine(current_date, datetime.strptime(slot["start"], "%H:%M").time())
         slot_end = datetime.combine(current_date, datetime.strptime(slot["end"], "%H:%M").time())
         
@@ -180,3 +204,69 @@ def apply_standard_schedule(start_dt: datetime, end_dt: datetime) -> List[Dict[s
                 })
                 
     return slots
+
+
+def apply_busy_aware_schedule(start_dt: datetime, end_dt: datetime, busy) -> List[Dict[str, Any]]:
+    """
+    Apply the standard day around attendees' busy intervals.
+
+    Breaks keep their standard position when it is free, otherwise they are
+    shifted by up to an hour (in 15-minute steps) into free time, or dropped
+    if no free position exists. Work blocks fill the remaining free time and
+    are snapped inwards to the 15-minute grid.
+    """
+    current_date = start_dt.date()
+    day_start = max(start_dt, datetime.combine(current_date, time(8, 30)))
+    day_end = min(end_dt, datetime.combine(current_date, time(17, 30)))
+    if day_start >= day_end:
+        return []
+
+    breaks = []
+    for slot in STANDARD_SLOTS:
+        if slot["type"] == "work":
+            continue
+        slot_start = datetime.combine(current_date, datetime.strptime(slot["start"], "%H:%M").time())
+        slot_end = datetime.combine(current_date, datetime.strptime(slot["end"], "%H:%M").time())
+        break_start = max(day_start, slot_start)
+        break_end = min(day_end, slot_end)
+        if break_start >= break_end:
+            continue
+
+        length = break_end - break_start
+        for shift in BREAK_SHIFTS:
+            candidate_start = break_start + timedelta(minutes=shift)
+            candidate_end = candidate_start + length
+            if candidate_start < day_start or candidate_end > day_end:
+                continue
+            if any(candidate_start < b_end and b_start < candidate_end for b_start, b_end, _ in breaks):
+                continue
+            if busy.is_free(candidate_start, candidate_end):
+                breaks.append((candidate_start, candidate_end, slot["type"]))
+                break
+
+    slots = []
+    for b_start, b_end, b_type in breaks:
+        slots.append({
+            "start": b_start.strftime("%H:%M"),
+            "end": b_end.strftime("%H:%M"),
+            "duration_minutes": int((b_end - b_start).total_seconds() / 60),
+            "type": b_type
+        })
+
+    # Work fills whatever is neither a break nor busy
+    blockers = sorted([(b_start, b_end) for b_start, b_end, _ in breaks] + busy.overlapping(day_start, day_end))
+    cursor = day_start
+    for block_start, block_end in blockers + [(day_end, day_end)]:
+        work_start = round_up_to_15_minutes(cursor)
+        work_end = round_to_15_minutes(block_start)
+        if work_end > work_start:
+            slots.append({
+                "start": work_start.strftime("%H:%M"),
+                "end": work_end.strftime("%H:%M"),
+                "duration_minutes": int((work_end - work_start).total_seconds() / 60),
+                "type": "work"
+            })
+        cursor = max(cursor, block_end)
+
+    slots.sort(key=lambda slot: slot["start"])
+    return slots
@@ -0,0 +1,263 @@
+"""
+Lightweight request tracing.
+
+Every HTTP request gets a trace ID: the client's ``X-Trace-Id`` (or the
+trace ID of a W3C ``traceparent`` header) if it sent one, a fresh ID
+otherwise, returned in the ``X-Trace-Id`` response header. Inside a request,
+``span(name, **attributes)`` times a stage as a child of the current span;
+the current span lives in a context variable, so stages nest across awaits
+and tasks without passing anything around. Finished spans are exported one
+at a time, which makes the timeline of a single slow request easy to read
+back: ``grep <trace id> traces/spans.jsonl``. Exporters never write or send
+on the calling thread; spans are queued and handled by a background thread.
+
+Configured through environment variables:
+- AGENDA_TRACE_EXPORTER: "none" (default), "jsonl" or "otlp"
+- AGENDA_TRACE_FILE: JSONL file (default: traces/spans.jsonl), rotated at
+  AGENDA_TRACE_MAX_MB (default: 10) keeping AGENDA_TRACE_BACKUPS old files (default: 5)
+- AGENDA_OTLP_ENDPOINT: OTLP/HTTP JSON endpoint of a local collector
+  (default: http://localhost:4318/v1/traces); spans are sent in batches
+  from a background thread and dropped if the collector is unreachable
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
+
+from starlette.datastructures import Headers
+
+TRACE_EXPORTER = os.environ.get("AGENDA_TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.environ.get("AGENDA_TRACE_FILE", os.path.join("traces", "spans.jsonl"))
+TRACE_MAX_BYTES = int(float(os.environ.get("AGENDA_TRACE_MAX_MB", "10")) * 1024 * 1024)
+TRACE_BACKUPS = int(os.environ.get("AGENDA_TRACE_BACKUPS", "5"))
+OTLP_ENDPOINT = os.environ.get("AGENDA_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+
+SERVICE_NAME = "agenda-planner"
+
+logger = logging.getLogger(__name__)
+
+_TRACE_ID = re.compile(r"[0-9a-f]{32}")
+_TRACEPARENT = re.compile(r"[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}")
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(((self.end_ns or time.time_ns()) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+        }
+        if self.error is not None:
+            record["error"] = self.error
+        return record
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("agenda_current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+         **attributes: Any) -> Iterator[Span]:
+    """Time the block as a child of the current span (or as a new trace root)."""
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    current = Span(name, trace_id or uuid.uuid4().hex, parent_id, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        if exporter is not None:
+            exporter.export(current)
+
+
+def incoming_trace(headers: Headers) -> tuple:
+    """(trace ID, parent span ID) sent by the client, each None if absent or malformed."""
+    value = (headers.get("x-trace-id") or "").strip().lower().replace("-", "")
+    if _TRACE_ID.fullmatch(value):
+        return value, None
+    match = _TRACEPARENT.fullmatch((headers.get("traceparent") or "").strip().lower())
+    if match:
+        return match.group(1), match.group(2)
+    return None, None
+
+
+class JsonlExporter:
+    """
+    Appends one JSON line per span, rotating the file by size.
+
+    Lines are queued and written by a listener thread, so exporting from the
+    event loop never waits on the disk; ``close`` writes what is queued.
+    """
+
+    def __init__(self, path: str = TRACE_FILE, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        lines: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        self._listener = QueueListener(lines, handler)
+        self._listener.start()
+        self._logger = logging.getLogger(f"agenda.traces.{path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.handlers = [QueueHandler(lines)]
+
+    def export(self, finished: Span) -> None:
+        self._logger.info(json.dumps(finished.to_dict(), ensure_ascii=False, default=str))
+
+    def close(self) -> None:
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body for a batch of finished spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": SERVICE_NAME},
+            "spans": [{
+                "traceId": finished.trace_id,
+                "spanId": finished.span_id,
+                "parentSpanId": finished.parent_id or "",
+                "name": finished.name,
+                "kind": 2 if finished.parent_id is None else 1,
+                "startTimeUnixNano": str(finished.start_ns),
+                "endTimeUnixNano": str(finished.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in finished.attributes.items()],
+                "status": {"code": 2, "message": finished.error} if finished.error else {"code": 1},
+            } for finished in spans],
+        }],
+    }]}
+
+
+class OtlpExporter:
+    """Sends spans to an OTLP/HTTP collector in batches from a background thread."""
+
+    BATCH_SIZE = 256
+    FLUSH_SECONDS = 2.0
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT):
+        self.endpoint = endpoint
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="agenda-trace-export", daemon=True)
+        self._thread.start()
+
+    def export(self, finished: Span) -> None:
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_SECONDS
+            while len(batch) < self.BATCH_SIZE and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._send(batch)
+
+    def _send(self, batch: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(otlp_payload(batch), default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning("Could not export %d span(s) to %s: %s", len(batch), self.endpoint, e)
+
+
+def default_exporter():
+    if TRACE_EXPORTER == "jsonl":
+        return JsonlExporter()
+    if TRACE_EXPORTER == "otlp":
+        return OtlpExporter()
+    return None
+
+
+# Process-wide exporter; None keeps the trace IDs but drops the spans
+exporter = default_exporter()
+if isinstance(exporter, JsonlExporter):
+    atexit.register(exporter.close)
+
+
+class TracingMiddleware:
+    """Runs every HTTP request inside a root span and returns its trace ID as ``X-Trace-Id``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = incoming_trace(Headers(scope=scope))
+        with span(f"{scope['method']} {scope['path']}", trace_id=trace_id, parent_id=parent_id,
+                  http_method=scope["method"], http_path=scope["path"]) as root:
+
+            async def send_with_trace(message) -> None:
+                if message["type"] == "http.response.start":
+                    root.set(http_status=message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-trace-id", root.trace_id.encode())
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
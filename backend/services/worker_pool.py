@@ -0,0 +1,109 @@
+"""
+Executor for CPU-bound request stages (ICS rendering, attachment decoding,
+calendar parsing) so they do not stall the event loop.
+
+Configured through environment variables:
+- AGENDA_WORKER_POOL: "thread" (default), "process" or "inline" (run on the loop)
+- AGENDA_WORKER_POOL_SIZE: number of workers (default: min(4, CPU count))
+- AGENDA_WORKER_QUEUE_DEPTH: tasks allowed to wait for a free worker before
+  new ones are rejected (default: 64)
+"""
+import asyncio
+import atexit
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+POOL_KIND = os.environ.get("AGENDA_WORKER_POOL", "thread").lower()
+POOL_SIZE = int(os.environ.get("AGENDA_WORKER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+QUEUE_DEPTH = int(os.environ.get("AGENDA_WORKER_QUEUE_DEPTH", "64"))
+
+
+class WorkerPoolFull(Exception):
+    """Raised when more than QUEUE_DEPTH tasks are already waiting for a worker."""
+
+
+_executor: Optional[Executor] = None
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "in_flight": 0}
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if POOL_KIND == "inline":
+        return None
+    if _executor is None:
+        if POOL_KIND == "process":
+            _executor = ProcessPoolExecutor(max_workers=POOL_SIZE)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="agenda-cpu")
+    return _executor
+
+
+def configure(kind: Optional[str] = None, size: Optional[int] = None, queue_depth: Optional[int] = None) -> None:
+    """Reconfigure the pool (used by benchmarks and tests); the old executor is shut down."""
+    global POOL_KIND, POOL_SIZE, QUEUE_DEPTH
+    shutdown()
+    if kind is not None:
+        POOL_KIND = kind.lower()
+    if size is not None:
+        POOL_SIZE = size
+    if queue_depth is not None:
+        QUEUE_DEPTH = queue_depth
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+atexit.register(shutdown)
+
+
+def uses_processes() -> bool:
+    """True when run_cpu hands work to other processes (arguments must be picklable)."""
+    return POOL_KIND == "process"
+
+
+async def run_cpu(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run ``func(*args, **kwargs)`` on the worker pool and await its result.
+
+    With a process pool ``func`` and its arguments must be picklable
+    (module-level functions, plain data).
+    """
+    executor = _get_executor()
+    if executor is None:
+        return func(*args, **kwargs)
+
+    queued = _stats["in_flight"] - POOL_SIZE
+    if queued >= QUEUE_DEPTH:
+        _stats["rejected"] += 1
+        raise WorkerPoolFull(f"Worker pool queue is full ({QUEUE_DEPTH} tasks waiting)")
+
+    _stats["submitted"] += 1
+    _stats["in_flight"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+        _stats["completed"] += 1
+        return result
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool configuration and counters, exposed on /health."""
+    return {
+        "kind": POOL_KIND,
+        "size": POOL_SIZE,
+        "queue_depth": QUEUE_DEPTH,
+        "running": min(_stats["in_flight"], POOL_SIZE),
+        "queued": max(0, _stats["in_flight"] - POOL_SIZE),
+        **{key: value for key, value in _stats.items() if key != "in_flight"},
+    }
+
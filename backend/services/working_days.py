@@ -0,0 +1,126 @@
+"""
+Working-day calendar for multi-day scheduling.
+
+A day is a working day if its weekday is in the weekday mask and it is not a
+holiday of one of the configured regions. Lookups go through a date index
+(whole years, built on first use and extended as needed) holding prefix
+counts of working days and a jump table to the next working day, so counting
+is O(1) and listing only touches working days, even across multi-year ranges.
+
+Configured through environment variables:
+- AGENDA_WORKING_DAYS: weekdays worked, e.g. "Mon-Fri" (default) or "Mon,Tue,Thu"
+- AGENDA_HOLIDAY_REGIONS: comma-separated regions, e.g. "DE" or "DE,DE-BY" (default: none)
+- AGENDA_HOLIDAY_DIR: directory with one "<region>.txt" per region listing ISO
+  dates, one per line, "#" starts a comment (default: backend/holidays)
+"""
+import os
+import threading
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+WORKING_DAYS = os.environ.get("AGENDA_WORKING_DAYS", "Mon-Fri")
+HOLIDAY_REGIONS = [region.strip() for region in os.environ.get("AGENDA_HOLIDAY_REGIONS", "").split(",") if region.strip()]
+HOLIDAY_DIR = Path(os.environ.get("AGENDA_HOLIDAY_DIR", Path(__file__).resolve().parents[1] / "holidays"))
+
+
+def parse_weekday_mask(spec: str) -> List[bool]:
+    """Parse a spec like "Mon-Fri", "mon,wed,fri" or "Sun-Thu" into seven booleans, Monday first."""
+    mask = [False] * 7
+    for part in spec.lower().replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start = WEEKDAY_NAMES.index(first[:3])
+        end = WEEKDAY_NAMES.index(last[:3]) if last else start
+        for offset in range((end - start) % 7 + 1):
+            mask[(start + offset) % 7] = True
+    return mask
+
+
+def load_holidays(regions: Iterable[str], directory: Path = HOLIDAY_DIR) -> List[date]:
+    """Read the holiday files of ``regions``; missing files are reported and skipped."""
+    holidays = []
+    for region in regions:
+        path = Path(directory) / f"{region}.txt"
+        if not path.exists():
+            print(f"Holiday file for region {region} not found: {path}")
+            continue
+        for line in path.read_text(encoding="utf-8").splitlines():
+            value = line.split("#", 1)[0].strip()
+            if value:
+                holidays.append(date.fromisoformat(value))
+    return holidays
+
+
+class WorkingDayCalendar:
+    def __init__(self, weekdays: Sequence[bool], holidays: Iterable[date] = ()):
+        self.weekdays = tuple(weekdays)
+        self.holidays = frozenset(holidays)
+        self._lock = threading.Lock()
+        # (first ordinal, prefix counts, next working day offsets); replaced as a whole when extended
+        self._index = (0, array("l"), array("l"))
+
+    def _build(self, first_year: int, last_year: int):
+        first = date(first_year, 1, 1).toordinal()
+        last = date(last_year, 12, 31).toordinal()
+        length = last - first + 1
+        holidays = {day.toordinal() for day in self.holidays}
+        working = [
+            self.weekdays[(first + offset - 1) % 7] and (first + offset) not in holidays
+            for offset in range(length)
+        ]
+        counts = array("l", [0]) * (length + 1)
+        for offset, is_working in enumerate(working):
+            counts[offset + 1] = counts[offset] + is_working
+        # Offset of the next working day at or after each day (length if none)
+        following = array("l", [length]) * (length + 1)
+        for offset in range(length - 1, -1, -1):
+            following[offset] = offset if working[offset] else following[offset + 1]
+        return first, counts, following
+
+    def _covering(self, start: date, end: date):
+        first, counts, following = self._index
+        if counts and first <= start.toordinal() and end.toordinal() < first + len(counts) - 1:
+            return self._index
+        with self._lock:
+            first, counts, following = self._index
+            years = [start.year, end.year]
+            if counts:
+                years += [date.fromordinal(first).year, date.fromordinal(first + len(counts) - 2).year]
+            self._index = self._build(min(years), max(years))
+            return self._index
+
+    def is_working_day(self, day: date) -> bool:
+        return self.count_working_days(day, day) == 1
+
+    def count_working_days(self, start: date, end: date) -> int:
+        """Working days from ``start`` to ``end`` inclusive (0 for reversed ranges)."""
+        if end < start:
+            return 0
+        first, counts, _ = self._covering(start, end)
+        return counts[end.toordinal() - first + 1] - counts[start.toordinal() - first]
+
+    def working_days(self, start: date, end: date) -> List[date]:
+        """Working days from ``start`` to ``end`` inclusive, visiting only working days."""
+        if end < start:
+            return []
+        first, _, following = self._covering(start, end)
+        last = end.toordinal() - first
+        days = []
+        offset = following[start.toordinal() - first]
+        while offset <= last:
+            days.append(date.fromordinal(first + offset))
+            offset = following[offset + 1]
+        return days
+
+
+def default_calendar() -> WorkingDayCalendar:
+    return WorkingDayCalendar(parse_weekday_mask(WORKING_DAYS), load_holidays(HOLIDAY_REGIONS))
+
+
+# Process-wide calendar used by the scheduler
+working_calendar = default_calendar()
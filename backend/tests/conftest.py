@@ -0,0 +1,107 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_agenda_store(tmp_path, monkeypatch):
+    """Keep API tests from writing agendas.db into the working directory."""
+    from services.agenda_store import AgendaStore
+    import main
+
+    store = AgendaStore(str(tmp_path / "agendas.db"))
+    monkeypatch.setattr(main, "agenda_store", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_attachment_store(tmp_path, monkeypatch):
+    """Keep uploaded attachments out of the working directory."""
+    from services.attachment_store import AttachmentStore
+    import main
+
+    store = AttachmentStore(str(tmp_path / "attachments"))
+    monkeypatch.setattr(main, "attachment_store", store)
+    return store
+
+
+class FakeCompletionStream:
+    """Async stream of chat completion chunks, like the openai client returns with stream=True."""
+
+    def __init__(self, text, chunk_delay, finish_reason="stop", usage=None):
+        self.chunks = [text[i:i + 8] for i in range(0, len(text), 8)]
+        self.chunk_delay = chunk_delay
+        self.finish_reason = finish_reason
+        self.usage = usage
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    async def __aiter__(self):
+        import asyncio
+        from types import SimpleNamespace
+
+        for index, chunk in enumerate(self.chunks):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            finish_reason = self.finish_reason if index == len(self.chunks) - 1 else None
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk), finish_reason=finish_reason)])
+        if self.usage is not None:
+            yield SimpleNamespace(choices=[], usage=self.usage)
+
+
+class FakeLLM:
+    """Stands in for the LM Studio client; ``reply`` maps the prompt messages to the response text."""
+
+    def __init__(self, reply, chunk_delay=0.0):
+        from types import SimpleNamespace
+
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.models = []
+        self.max_tokens = []
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, temperature, max_tokens=None, stream=False, stream_options=None):
+        from types import SimpleNamespace
+
+        self.requests.append(messages)
+        self.models.append(model)
+        self.max_tokens.append(max_tokens)
+        text = self.reply(messages) if callable(self.reply) else self.reply
+        finish_reason = "stop"
+        # Like a real server, cut the answer at the budget (~4 characters per token)
+        if max_tokens is not None and len(text) > 4 * max_tokens:
+            text, finish_reason = text[:4 * max_tokens], "length"
+        usage = None
+        if (stream_options or {}).get("include_usage"):
+            # Deterministic counts that differ from the 4-characters-per-token estimate
+            usage = SimpleNamespace(prompt_tokens=sum(len(m["content"]) for m in messages) // 3,
+                                    completion_tokens=len(text) // 3 + 1)
+        self.streams.append(FakeCompletionStream(text, self.chunk_delay, finish_reason, usage))
+        return self.streams[-1]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Install a FakeLLM; call the fixture with (reply, chunk_delay) to configure it."""
+    from services import agenda_generator
+
+    def install(reply, chunk_delay=0.0):
+        llm = FakeLLM(reply, chunk_delay)
+        monkeypatch.setattr(agenda_generator, "client", llm)
+        return llm
+
+    return install
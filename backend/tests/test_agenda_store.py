@@ -0,0 +1,96 @@
+from pathlib import Path
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.agenda_store import AgendaNotFound, VersionConflict
+
+client = TestClient(main.app)
+
+AGENDA = json.dumps({"title": "Dev Sync", "items": [{"title": "Intro"}]})
+
+
+def test_store_versions_snapshots(isolated_agenda_store):
+    store = isolated_agenda_store
+    record = store.create(AGENDA, "Dev Sync", "2025-01-15T09:00:00", "2025-01-15T10:00:00", "Room A", "EN")
+    updated = store.update(record["id"], base_version=1, location="Room B")
+
+    assert updated["version"] == 2
+    assert updated["location"] == "Room B"
+    assert updated["content"] == AGENDA
+    assert store.get(record["id"], version=1)["location"] == "Room A"
+
+    with pytest.raises(VersionConflict):
+        store.update(record["id"], base_version=1, content="{}")
+    with pytest.raises(AgendaNotFound):
+        store.get("missing")
+
+
+def test_generate_returns_agenda_id(monkeypatch):
+    async def fake_generate(*args):
+        return AGENDA
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Dev Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T10:00:00",
+        "location": "Room A",
+    })
+
+    body = resp.json()
+    assert body["version"] == 1
+    stored = client.get(f"/agendas/{body['agenda_id']}").json()
+    assert stored["agenda"] == AGENDA
+    assert stored["location"] == "Room A"
+
+
+def test_agenda_ics_renders_once_and_supports_etags(isolated_agenda_store, monkeypatch):
+    record = isolated_agenda_store.create(AGENDA, "Dev Sync", "2025-01-15T09:00:00", "2025-01-15T10:00:00", "Room A")
+    renders = []
+    original = main.build_ics
+
+    def counting_build_ics(*args):
+        renders.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(main, "build_ics", counting_build_ics)
+
+    first = client.get(f"/agendas/{record['id']}/ics")
+    assert first.status_code == 200
+    assert b"LOCATION:Room A" in first.content
+    assert "2025-01-15 09-00 Dev Sync.ics" in first.headers["content-disposition"]
+
+    second = client.get(f"/agendas/{record['id']}/ics")
+    assert second.content == first.content
+    assert len(renders) == 1
+
+    not_modified = client.get(f"/agendas/{record['id']}/ics", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+
+
+def test_put_creates_new_version_and_detects_conflicts(isolated_agenda_store):
+    record = isolated_agenda_store.create(AGENDA, "Dev Sync", "2025-01-15T09:00:00", "2025-01-15T10:00:00")
+    edited = json.dumps({"title": "Dev Sync (edited)"})
+
+    resp = client.put(f"/agendas/{record['id']}", data={"agenda_content": edited, "base_version": "1"})
+    assert resp.status_code == 200
+    assert resp.json()["version"] == 2
+
+    stale = client.put(f"/agendas/{record['id']}", data={"location": "Room C", "base_version": "1"})
+    assert stale.status_code == 409
+
+    ics = client.get(f"/agendas/{record['id']}/ics")
+    assert b"DEV SYNC (EDITED)" in ics.content
+
+
+def test_unknown_agenda_returns_404():
+    assert client.get("/agendas/does-not-exist").status_code == 404
+    assert client.get("/agendas/does-not-exist/ics").status_code == 404
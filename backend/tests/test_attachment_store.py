@@ -0,0 +1,146 @@
+from pathlib import Path
+import hashlib
+import os
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import attachments
+from services.attachment_store import AttachmentNotFound, AttachmentStore, AttachmentTooLarge
+
+client = TestClient(main.app)
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = AttachmentStore(str(tmp_path), quota_bytes=1000)
+
+    first, created = store.put(b"briefing", "briefing.txt")
+    second, created_again = store.put(b"briefing", "copy.txt")
+
+    assert created and not created_again
+    assert first == second == {"hash": hashlib.sha256(b"briefing").hexdigest(), "filename": "briefing.txt", "size": 8}
+    assert store.stats()["bytes"] == 8
+    assert store.read(first["hash"]) == b"briefing"
+
+
+def test_least_recently_used_attachments_are_evicted(tmp_path):
+    store = AttachmentStore(str(tmp_path), quota_bytes=30)
+    a, _ = store.put(b"a" * 10, "a.txt")
+    b, _ = store.put(b"b" * 10, "b.txt")
+    c, _ = store.put(b"c" * 10, "c.txt")
+    store.info(a["hash"])  # a is now more recent than b
+
+    store.put(b"d" * 10, "d.txt")
+
+    with pytest.raises(AttachmentNotFound):
+        store.info(b["hash"])
+    assert store.read(a["hash"]) == b"a" * 10
+    assert store.read(c["hash"]) == b"c" * 10
+    assert store.stats() == {"attachments": 3, "bytes": 30, "quota_bytes": 30, "evicted": 1}
+    assert not os.path.exists(os.path.join(str(tmp_path), b["hash"][:2], b["hash"]))
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    info, _ = AttachmentStore(str(tmp_path)).put(b"slides", "deck.pptx")
+
+    reopened = AttachmentStore(str(tmp_path))
+
+    assert reopened.info(info["hash"])["filename"] == "deck.pptx"
+    assert reopened.stats()["bytes"] == 6
+
+
+def test_oversized_attachments_are_rejected(tmp_path):
+    store = AttachmentStore(str(tmp_path), quota_bytes=100, max_file_bytes=5)
+
+    with pytest.raises(AttachmentTooLarge):
+        store.put(b"too large", "big.bin")
+
+
+def test_upload_then_reference_by_hash(fake_llm, isolated_attachment_store):
+    llm = fake_llm('{"title": "Sync", "items": [{"title": "Punkt"}]}')
+    digest = hashlib.sha256(b"Quarterly numbers").hexdigest()
+
+    assert client.head(f"/attachments/{digest}").status_code == 404
+    uploaded = client.post("/attachments", files={"file": ("numbers.txt", b"Quarterly numbers")})
+    again = client.post("/attachments", files={"file": ("numbers.txt", b"Quarterly numbers")})
+    assert client.head(f"/attachments/{digest}").status_code == 200
+
+    resp = client.post("/generate-agenda", data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+        "attachment_hashes": digest,
+    })
+
+    assert uploaded.json() == {"hash": digest, "filename": "numbers.txt", "size": 17, "created": True}
+    assert again.json()["created"] is False
+    assert resp.status_code == 200
+    assert "Quarterly numbers" in llm.requests[0][-1]["content"]
+
+
+def test_cached_text_skips_the_disk_read(monkeypatch, isolated_attachment_store):
+    import asyncio
+
+    info, _ = isolated_attachment_store.put(b"Agenda notes", "notes.txt")
+    attachments._cache.clear()
+    asyncio.run(attachments.extract_stored_attachments([info["hash"]], isolated_attachment_store))
+    reads = []
+    fetch = isolated_attachment_store.fetch
+    monkeypatch.setattr(isolated_attachment_store, "fetch",
+                        lambda digest, content=True: reads.append(content) or fetch(digest, content))
+
+    texts = asyncio.run(attachments.extract_stored_attachments([info["hash"]], isolated_attachment_store))
+
+    assert texts == ["Agenda notes"]
+    assert reads == [False]
+    attachments._cache.clear()
+
+
+def test_unknown_or_invalid_hashes(fake_llm):
+    fake_llm("{}")
+
+    generate = client.post("/generate-agenda", data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+        "attachment_hashes": "0" * 64,
+    })
+
+    assert generate.status_code == 404
+    assert client.get("/attachments/not-a-hash").status_code == 400
+
+
+def test_oversized_upload_is_rejected_while_reading(monkeypatch, isolated_attachment_store):
+    monkeypatch.setattr(main, "UPLOAD_CHUNK_BYTES", 4)
+    isolated_attachment_store.max_file_bytes = 10
+
+    resp = client.post("/attachments", files={"file": ("big.bin", b"x" * 64)})
+
+    assert resp.status_code == 413
+    assert isolated_attachment_store.stats()["attachments"] == 0
+
+
+def test_index_is_built_at_startup(isolated_attachment_store):
+    AttachmentStore(isolated_attachment_store.directory).put(b"slides", "deck.pptx")
+
+    with TestClient(main.app):
+        assert isolated_attachment_store._index is not None
+        assert client.get("/health").json()["attachments"]["attachments"] == 1
+
+
+def test_fetch_returns_info_and_content_together(tmp_path):
+    store = AttachmentStore(str(tmp_path))
+    info, _ = store.put(b"slides", "deck.pptx")
+
+    assert store.fetch(info["hash"]) == (info, b"slides")
+    assert store.fetch(info["hash"], content=False) == (info, None)
+    os.remove(store._path(info["hash"]))
+    with pytest.raises(AttachmentNotFound):
+        store.fetch(info["hash"])
+    assert store.stats()["attachments"] == 0
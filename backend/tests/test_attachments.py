@@ -0,0 +1,133 @@
+from pathlib import Path
+import asyncio
+import io
+import sys
+import zipfile
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from services import attachments
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+S = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+
+
+def _zip(parts: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _docx(paragraphs) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    return _zip({"word/document.xml": f"<w:document {W}><w:body>{body}</w:body></w:document>"})
+
+
+def _pdf(pages) -> bytes:
+    """Minimal one-font text PDF with one page per entry."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_id = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    body = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(body))
+        body += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return body.encode("latin-1")
+
+
+def test_plain_text_is_returned_unchanged():
+    assert attachments.extract_text("notes.txt", b"Plain notes") == "Plain notes"
+
+
+def test_unknown_binary_keeps_marker():
+    assert attachments.extract_text("image.png", b"\x89PNG\xff\x00") == "[Binary file: image.png]"
+
+
+def test_docx_paragraphs_are_extracted():
+    text = attachments.extract_text("brief.docx", _docx(["Goals for Q1", "Hiring plan"]))
+    assert text == "[DOCX file: brief.docx]\nGoals for Q1\nHiring plan"
+
+
+def test_xlsx_rows_use_shared_strings():
+    content = _zip({
+        "xl/workbook.xml": f"<workbook {S}/>",
+        "xl/sharedStrings.xml": f"<sst {S}><si><t>Owner</t></si><si><t>Budget</t></si></sst>",
+        "xl/worksheets/sheet1.xml": (
+            f'<worksheet {S}><sheetData>'
+            '<row><c t="s"><v>0</v></c><c t="s"><v>1</v></c></row>'
+            '<row><c t="inlineStr"><is><t>Alice</t></is></c><c><v>1200</v></c></row>'
+            '</sheetData></worksheet>'
+        ),
+    })
+    assert attachments.extract_text("plan.xlsx", content) == "[XLSX file: plan.xlsx]\n## Sheet 1\nOwner\tBudget\nAlice\t1200"
+
+
+def test_pptx_slides_are_extracted_in_order():
+    slide = '<p:sld xmlns:p="p" {a}><a:p><a:r><a:t>{text}</a:t></a:r></a:p></p:sld>'
+    content = _zip({
+        "ppt/presentation.xml": "<presentation/>",
+        "ppt/slides/slide10.xml": slide.format(a=A, text="Last"),
+        "ppt/slides/slide2.xml": slide.format(a=A, text="First"),
+    })
+    text = attachments.extract_text("deck.pptx", content)
+    assert text.index("First") < text.index("Last")
+
+
+@pytest.mark.skipif(attachments.PdfReader is None, reason="pypdf not installed")
+def test_pdf_stops_at_page_limit(monkeypatch):
+    monkeypatch.setattr(attachments, "MAX_PAGES", 2)
+    text = attachments.extract_text("report.pdf", _pdf(["Page one", "Page two", "Page three"]))
+
+    assert "Page one" in text and "Page two" in text
+    assert "Page three" not in text
+    assert text.endswith("[... truncated (page limit)]")
+
+
+def test_character_limit_truncates(monkeypatch):
+    monkeypatch.setattr(attachments, "MAX_CHARS", 20)
+    text = attachments.extract_text("long.docx", _docx(["x" * 15, "y" * 15, "z" * 15]))
+
+    assert "z" not in text
+    assert text.endswith("[... truncated (character limit)]")
+
+
+def test_extract_attachments_caches_by_content(monkeypatch):
+    calls = []
+    original = attachments.extract_document
+
+    def counting(content, filename=""):
+        calls.append(filename)
+        return original(content, filename)
+
+    monkeypatch.setattr(attachments, "extract_document", counting)
+    attachments._cache.clear()
+    content = _docx(["Shared deck"])
+
+    first = asyncio.run(attachments.extract_attachments([("a.docx", content)]))
+    second = asyncio.run(attachments.extract_attachments([("b.docx", content)]))
+
+    assert len(calls) == 1
+    assert first == ["[DOCX file: a.docx]\nShared deck"]
+    assert second == ["[DOCX file: b.docx]\nShared deck"]
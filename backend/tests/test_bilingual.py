@@ -0,0 +1,129 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import agenda_generator
+from services.deadlines import DeadlineExceeded
+
+client = TestClient(main.app)
+
+GERMAN = json.dumps({
+    "title": "Teamtreffen",
+    "summary": "Quartalsplanung",
+    "days": [{"date": "2025-01-15", "items": [
+        {"time_slot": "09:00 - 10:15", "title": "Begrüßung", "description": "Kurze Vorstellung", "type": "work"},
+        {"time_slot": "10:15 - 10:45", "title": "Kaffeepause", "type": "coffee_break"},
+    ]}],
+})
+
+
+def upper_case_translation(messages):
+    """Translate by upper-casing every string the prompt asks for."""
+    texts = json.loads(messages[-1]["content"].split("\n\n")[1])
+    return json.dumps([text.upper() for text in texts])
+
+
+@pytest.fixture
+def translator(fake_llm):
+    agenda_generator._translation_cache.clear()
+    yield fake_llm(upper_case_translation)
+    agenda_generator._translation_cache.clear()
+
+
+def test_translation_keeps_structure_and_caches_per_text(translator):
+    english = json.loads(asyncio.run(agenda_generator.translate_agenda(GERMAN, "EN")))
+
+    assert english["title"] == "TEAMTREFFEN"
+    item = english["days"][0]["items"][0]
+    assert (item["title"], item["description"], item["time_slot"]) == ("BEGRÜSSUNG", "KURZE VORSTELLUNG", "09:00 - 10:15")
+    assert len(translator.requests) == 1
+
+    # Only texts that were never translated go to the LLM again
+    edited = GERMAN.replace("Quartalsplanung", "Jahresplanung")
+    asyncio.run(agenda_generator.translate_agenda(edited, "EN"))
+    assert '["Jahresplanung"]' in translator.requests[1][-1]["content"]
+
+
+def test_failed_translation_returns_nothing(monkeypatch, translator):
+    async def broken(**kwargs):
+        raise ConnectionError("LLM offline")
+
+    monkeypatch.setattr(translator.chat.completions, "create", broken)
+    assert asyncio.run(agenda_generator.translate_agenda(GERMAN, "EN")) is None
+    assert asyncio.run(agenda_generator.translate_agenda("Freitext", "EN")) is None
+
+
+def test_generate_both_languages_in_one_generation(monkeypatch, translator):
+    languages = []
+
+    async def fake_generate(topic, start, end, language, *args):
+        languages.append(language)
+        return GERMAN
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Teamtreffen",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T11:00:00",
+        "language": "BOTH",
+    })
+
+    body = resp.json()
+    assert languages == ["DE"]
+    assert body["language"] == "DE"
+    assert body["agenda"] == GERMAN
+    [english] = body["translations"]
+    assert english["language"] == "EN"
+    assert json.loads(english["agenda"])["title"] == "TEAMTREFFEN"
+    assert client.get(f"/agendas/{english['agenda_id']}").json()["language"] == "EN"
+
+
+def test_failed_translation_is_not_stored_as_target_language(monkeypatch, translator):
+    async def fake_generate(*args):
+        return GERMAN
+
+    async def broken(**kwargs):
+        raise ConnectionError("LLM offline")
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    monkeypatch.setattr(translator.chat.completions, "create", broken)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Teamtreffen",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T11:00:00",
+        "language": "BOTH",
+    })
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert body["agenda"] == GERMAN
+    assert body["translations"] == []
+    assert body["untranslated"] == ["EN"]
+
+
+def test_deadline_during_translation_returns_504(monkeypatch, translator):
+    async def fake_generate(*args):
+        return GERMAN
+
+    async def expired(**kwargs):
+        raise DeadlineExceeded(partial='["TEAM')
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    monkeypatch.setattr(translator.chat.completions, "create", expired)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Teamtreffen",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T11:00:00",
+        "language": "BOTH",
+    })
+
+    assert resp.status_code == 504
@@ -0,0 +1,80 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import bulk_scheduler
+from services.bulk_scheduler import bulk_time_slots, schedules_from_columns
+from services.time_slot_calculator import calculate_time_slots
+
+client = TestClient(main.app)
+
+MEETINGS = [
+    ("2025-01-15T09:00:00", "2025-01-15T09:45:00"),   # simple
+    ("2025-01-15T09:07:00", "2025-01-15T17:40:00Z"),  # scheduled, rounded, dinner
+    ("2025-01-15T08:30:00", "2025-01-15T18:15:00"),   # no dinner (minute < 30)
+    ("2025-01-15T14:00:00", "2025-01-17T18:00:00"),   # multi-day, no dinner on last day
+    ("2025-01-15T18:00:00", "2025-01-16T19:30:00"),   # first day after working hours
+    ("2025-01-16T09:00:00", "2025-01-15T10:00:00"),   # reversed multi-day range
+    ("2025-01-15T23:00:00", "2025-01-16T00:00:00"),   # ends at midnight
+    ("2025-01-17T09:00:00", "2025-01-20T15:00:00"),   # Friday to Monday, weekend skipped
+    ("2025-01-18T10:00:00", "2025-01-19T12:00:00"),   # weekend only, days kept
+]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_bulk_matches_single_meeting_calculator(monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(bulk_scheduler, "np", None)
+    elif bulk_scheduler.np is None:
+        pytest.skip("numpy not installed")
+
+    starts, ends = zip(*MEETINGS)
+    columns = bulk_time_slots(starts, ends)
+
+    assert schedules_from_columns(columns) == [calculate_time_slots(start, end) for start, end in MEETINGS]
+    assert len(columns["meetings"]["type"]) == len(MEETINGS)
+
+
+def test_bulk_rejects_mismatched_or_invalid_input():
+    with pytest.raises(ValueError):
+        bulk_time_slots(["2025-01-15T09:00:00"], [])
+    assert bulk_time_slots([], []) == bulk_scheduler._empty_columns()
+
+
+def test_bulk_schedule_endpoint_formats():
+    body = {"start_times": ["2025-01-15T09:00:00", "2025-01-15T09:00:00"],
+            "end_times": ["2025-01-15T12:00:00", "2025-01-16T12:00:00"]}
+
+    columnar = client.post("/bulk-schedule", json=body).json()
+    assert columnar["count"] == 2
+    assert columnar["meetings"]["type"] == ["scheduled", "multi_day"]
+    assert columnar["days"]["meeting"] == [0, 1, 1]
+
+    per_meeting = client.post("/bulk-schedule", json={**body, "format": "meetings"}).json()
+    assert per_meeting["schedules"][1] == calculate_time_slots("2025-01-15T09:00:00", "2025-01-16T12:00:00")
+
+    invalid = client.post("/bulk-schedule", json={"start_times": ["soon"], "end_times": ["later"]})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_bulk_schedule_caps_total_meeting_days(monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(bulk_scheduler, "np", None)
+    elif bulk_scheduler.np is None:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(bulk_scheduler, "MAX_MEETING_DAYS", 1000)
+
+    # Few meetings, but each spans years
+    body = {"start_times": ["2025-01-15T09:00:00"] * 3, "end_times": ["2027-01-15T12:00:00"] * 3}
+    resp = client.post("/bulk-schedule", json=body)
+
+    assert resp.status_code == 413
+    assert "1000" in resp.json()["detail"]
@@ -0,0 +1,109 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.busy_calendar import BusyIndex, build_busy_index, iter_busy_intervals, spool_to_paths
+from services.time_slot_calculator import calculate_time_slots
+
+CALENDAR = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+SUMMARY:Steering committee with a very long title that is folded onto the
+  next line
+DTSTART:20240501T110000
+DTEND:20240501T114000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Weekly 1:1
+DTSTART:20240403T100000
+DURATION:PT30M
+RRULE:FREQ=WEEKLY;BYDAY=WE
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Focus time
+DTSTART:20240501T140000
+DTEND:20240501T150000
+TRANSP:TRANSPARENT
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Public holiday
+DTSTART;VALUE=DATE:20240501
+DTEND;VALUE=DATE:20240502
+END:VEVENT
+END:VCALENDAR
+"""
+
+WINDOW = (datetime(2024, 5, 1, 8, 30), datetime(2024, 5, 1, 17, 30))
+
+
+def test_iter_busy_intervals_expands_recurrence_and_skips_free_time():
+    intervals = sorted(iter_busy_intervals(CALENDAR.splitlines(), WINDOW))
+
+    assert intervals == [
+        (datetime(2024, 5, 1, 10, 0), datetime(2024, 5, 1, 10, 30)),
+        (datetime(2024, 5, 1, 11, 0), datetime(2024, 5, 1, 11, 40)),
+    ]
+
+
+def test_build_busy_index_streams_spooled_uploads():
+    # Rolled over to disk like a large upload; parsed from the file, not a bytes copy
+    upload = tempfile.SpooledTemporaryFile(max_size=16)
+    upload.write(CALENDAR.encode())
+    upload.seek(0)
+
+    index = build_busy_index([upload], WINDOW)
+    assert index.intervals() == build_busy_index([CALENDAR.encode()], WINDOW).intervals()
+
+    paths = spool_to_paths([upload])
+    try:
+        assert paths[0].read_text() == CALENDAR
+        assert build_busy_index(paths, WINDOW).intervals() == index.intervals()
+    finally:
+        for path in paths:
+            path.unlink()
+
+
+def test_busy_index_merges_and_answers_overlap_queries():
+    index = BusyIndex([
+        (datetime(2024, 5, 1, 9, 0), datetime(2024, 5, 1, 10, 0)),
+        (datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 1, 10, 30)),
+        (datetime(2024, 5, 1, 14, 0), datetime(2024, 5, 1, 15, 0)),
+    ])
+
+    assert len(index) == 2
+    assert index.is_free(datetime(2024, 5, 1, 10, 30), datetime(2024, 5, 1, 14, 0))
+    assert not index.is_free(datetime(2024, 5, 1, 13, 0), datetime(2024, 5, 1, 14, 15))
+    assert index.overlapping(datetime(2024, 5, 1, 10, 0), datetime(2024, 5, 1, 14, 30)) == [
+        (datetime(2024, 5, 1, 10, 0), datetime(2024, 5, 1, 10, 30)),
+        (datetime(2024, 5, 1, 14, 0), datetime(2024, 5, 1, 14, 30)),
+    ]
+
+
+def test_schedule_places_work_and_breaks_around_busy_time():
+    busy = build_busy_index([CALENDAR.encode("utf-8")], WINDOW)
+    schedule = calculate_time_slots("2024-05-01T08:30:00", "2024-05-01T17:30:00", busy)
+
+    slots = [(s["start"], s["end"], s["type"]) for s in schedule["days"][0]["slots"] if s["type"] != "social"]
+    assert slots == [
+        ("08:30", "10:00", "work"),
+        # The 10:15 coffee break collides with the 1:1 and moves after it
+        ("10:30", "11:00", "coffee_break"),
+        # 11:40 is snapped up to the 15-minute grid
+        ("11:45", "12:30", "work"),
+        ("12:30", "13:30", "lunch_break"),
+        ("13:30", "15:15", "work"),
+        ("15:15", "15:45", "coffee_break"),
+        ("15:45", "17:30", "work"),
+    ]
+
+
+def test_schedule_without_busy_overlap_matches_standard_template():
+    busy = BusyIndex([(datetime(2024, 5, 2, 9, 0), datetime(2024, 5, 2, 10, 0))])
+
+    assert calculate_time_slots("2024-05-01T08:30:00", "2024-05-01T17:30:00", busy) == \
+        calculate_time_slots("2024-05-01T08:30:00", "2024-05-01T17:30:00")
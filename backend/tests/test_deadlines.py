@@ -0,0 +1,78 @@
+from pathlib import Path
+import asyncio
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import deadlines
+from services.agenda_generator import refine_agenda_text
+from services.deadlines import ClientDisconnected, deadline_scope, parse_timeout, run_cancellable
+
+client = TestClient(main.app)
+
+LONG_TEXT = "Refined agenda text. " * 40
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(deadlines, "DISCONNECT_POLL_SECONDS", 0.02)
+
+
+def test_parse_timeout_bounds(monkeypatch):
+    monkeypatch.setattr(deadlines, "DEFAULT_DEADLINE_SECONDS", 120.0)
+    monkeypatch.setattr(deadlines, "MAX_DEADLINE_SECONDS", 300.0)
+    assert parse_timeout(None) == 120.0
+    assert parse_timeout("15") == 15.0
+    assert parse_timeout("9999") == 300.0
+    assert parse_timeout("soon") == parse_timeout("-1") == 120.0
+
+
+def test_refine_returns_partial_text_at_deadline(fake_llm):
+    llm = fake_llm(LONG_TEXT, chunk_delay=0.01)
+    resp = client.post("/refine-text", data={"text": "Agenda"}, headers={"X-Request-Timeout": "0.2"})
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert body["partial"] is True
+    assert LONG_TEXT.startswith(body["refined_text"])
+    assert len(body["refined_text"]) < len(LONG_TEXT.strip())
+    assert llm.streams[0].closed
+
+
+def test_generate_times_out_with_partial_output(fake_llm):
+    fake_llm('{"title": "Slow agenda", "summary": "' + "lang " * 200 + '", "items": []}', chunk_delay=0.01)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Dev Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    }, headers={"X-Request-Timeout": "0.1"})
+
+    assert resp.status_code == 504
+    assert resp.json()["detail"]["partial"].startswith('{"title": "Slow')
+
+
+def test_disconnect_cancels_streaming_completion(fake_llm):
+    llm = fake_llm(LONG_TEXT, chunk_delay=0.01)
+
+    class DisconnectingRequest:
+        def __init__(self):
+            self.checks = 0
+
+        async def is_disconnected(self):
+            self.checks += 1
+            return self.checks > 2
+
+    async def run():
+        with deadline_scope(30):
+            await run_cancellable(DisconnectingRequest(), refine_agenda_text("Agenda"))
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(run())
+    assert llm.streams[0].closed
+    assert len(llm.streams) == 1
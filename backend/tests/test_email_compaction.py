@@ -0,0 +1,131 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+import main
+from services.email_compaction import compact_context
+
+client = TestClient(main.app)
+
+ROADMAP = "Let's meet to finalize the Q3 roadmap: hiring plan, budget review and the billing migration."
+
+THREAD = f"""Hi all,
+
+thanks!
+
+{ROADMAP}
+
+Viele Grüße
+Anna Schmidt
+ACME GmbH | +49 30 1234567
+
+Diese E-Mail enthält vertrauliche und/oder rechtlich geschützte Informationen.
+Sitz der Gesellschaft: Berlin, Amtsgericht Charlottenburg HRB 12345
+
+Von: Bob Miller <bob@example.com>
+Gesendet: Montag, 13. Januar 2025 10:00
+An: Anna Schmidt <anna@example.com>
+Betreff: Q3 roadmap
+
+Hi Anna,
+
+{ROADMAP}
+
+Can we also cover the on-call rotation?
+
+-- 
+Bob Miller
+Platform Team
+
+Sent from my iPhone
+
+On Fri, Jan 10, 2025 at 9:00 AM Carol <carol@example.com> wrote:
+> Please propose a slot for the roadmap meeting.
+> Thanks
+"""
+
+
+def test_thread_is_reduced_to_the_new_content():
+    email, _, stats = compact_context(THREAD, [])
+
+    assert email == f"Hi all,\n\nthanks!\n\n{ROADMAP}\n\nHi Anna,\n\nCan we also cover the on-call rotation?"
+    assert stats["quoted_lines"] == 2
+    assert stats["signatures"] == 2
+    assert stats["duplicate_passages"] == 1
+    assert stats["saved_bytes"] == stats["original_bytes"] - len(email.encode("utf-8")) > 0
+
+
+def test_english_footer_and_closing():
+    email, _, stats = compact_context(
+        "Please add the security review to the agenda.\n\n"
+        "This email and any attachments are confidential. If you are not the intended recipient, delete it.\n\n"
+        "Kind regards,\nJohn",
+        [],
+    )
+
+    assert email == "Please add the security review to the agenda."
+    assert stats["footers"] == 1 and stats["signatures"] == 1
+
+
+def test_closing_words_inside_the_message_are_kept():
+    text = "Thanks!\n\n" + "\n".join(f"- Topic {n}: a longer description of what we need to discuss here" for n in range(12))
+
+    email, _, stats = compact_context(text, [])
+
+    assert email == text
+    assert stats["signatures"] == 0
+
+
+def test_quotes_only_are_kept_as_content():
+    email, _, stats = compact_context("> Please prepare the budget review.\n> Agenda to follow.", [])
+
+    assert email == "Please prepare the budget review.\nAgenda to follow."
+    assert stats["quoted_lines"] == 0
+
+
+def test_passages_repeated_in_attachments_are_dropped():
+    _, files, stats = compact_context(ROADMAP, [f"[PDF file: plan.pdf]\n{ROADMAP}\n\nSlide 2", f"[DOCX file: notes.docx]\n{ROADMAP}"])
+
+    assert files == ["[PDF file: plan.pdf]\n\nSlide 2", "[DOCX file: notes.docx]"]
+    assert stats["duplicate_passages"] == 2
+
+
+def test_generate_prompts_with_the_compacted_email(fake_llm):
+    llm = fake_llm('{"title": "Roadmap", "items": [{"title": "Punkt"}]}')
+
+    resp = client.post("/generate-agenda", data={
+        "topic": "Roadmap",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+        "email_content": THREAD,
+    })
+
+    prompt = llm.requests[0][-1]["content"]
+    assert resp.status_code == 200
+    assert resp.json()["context_compaction"]["saved_bytes"] > 0
+    assert prompt.count(ROADMAP) == 1
+    assert "HRB" not in prompt and "Sent from my iPhone" not in prompt
+
+
+def test_lists_after_ambiguous_closings_and_dashes_are_kept():
+    thanks = "Hi team,\nThanks!\nFor Thursday please prepare:\n- Budget review\n- Hiring plan"
+    german = "Hallo,\nanbei die Punkte:\n- Budget\n- Roadmap\nLG\nAnna"
+    dashes = "Agenda:\n--\n- Budget review\n- Hiring plan\n--"
+    regards_list = "Best regards\n- Budget review\n- Hiring plan"
+
+    for text in (thanks, german, dashes, regards_list):
+        email, _, stats = compact_context(text, [])
+        assert email == text
+        assert stats["signatures"] == 0
+
+
+def test_closing_followed_by_a_name_is_a_signature():
+    email, _, stats = compact_context("Please prepare the budget review.\n\nBest regards,\nAnna Schmidt\n+49 30 1234567", [])
+
+    assert email == "Please prepare the budget review."
+    assert stats["signatures"] == 1
@@ -0,0 +1,101 @@
+from pathlib import Path
+import gzip
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+import main
+from services.http_cache import EtagCache, content_etag, etag_matches
+
+client = TestClient(main.app)
+
+ICS_FORM = {
+    "topic": "Dev Sync",
+    "start_time": "2024-05-01T09:00:00",
+    "end_time": "2024-05-01T17:30:00",
+    "location": "Room A",
+    "agenda_content": json.dumps({
+        "title": "Dev Sync",
+        "items": [{"title": f"Topic {i}", "description": "Discuss the roadmap in detail."} for i in range(40)],
+    }),
+}
+
+
+def test_content_etag_is_deterministic_and_part_sensitive():
+    assert content_etag("a", "bc") == content_etag("a", "bc")
+    assert content_etag("ab", "c") != content_etag("a", "bc")
+    assert content_etag("x").startswith('"')
+
+
+def test_etag_matches_handles_lists_weak_and_wildcard():
+    etag = content_etag("agenda")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_etag_cache_evicts_least_recently_used():
+    cache = EtagCache(2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+
+def test_create_ics_returns_etag_and_304_on_match():
+    first = client.post("/create-ics", data=ICS_FORM)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+
+    second = client.post("/create-ics", data=ICS_FORM, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    changed = dict(ICS_FORM, location="Room B")
+    third = client.post("/create-ics", data=changed, headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["etag"] != etag
+
+
+def test_large_responses_are_compressed():
+    resp = client.post("/create-ics", data=ICS_FORM, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers.get("content-encoding") == "gzip"
+    assert resp.text.startswith("BEGIN:VCALENDAR")
+
+
+def test_small_responses_are_not_compressed():
+    resp = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+
+
+def test_generate_returns_304_for_latest_result(monkeypatch):
+    calls = []
+
+    async def fake_generate(*args):
+        calls.append(args)
+        return json.dumps({"title": "Agenda", "items": []})
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    form = {"topic": "Sync", "start_time": "2024-05-01T09:00:00", "end_time": "2024-05-01T09:30:00"}
+
+    first = client.post("/generate-agenda", data=form)
+    etag = first.headers["etag"]
+    assert first.json()["agenda"]
+
+    second = client.post("/generate-agenda", data=form, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert len(calls) == 1
+
+    # Without a validator the agenda is generated again as before
+    client.post("/generate-agenda", data=form)
+    assert len(calls) == 2
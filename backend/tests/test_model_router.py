@@ -0,0 +1,67 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from services import model_router
+from services.agenda_generator import generate_agenda_content, refine_agenda_text
+
+ROUTES = [
+    {"task": "refine", "model": "small"},
+    {"task": "agenda", "schedule": "simple", "model": "small"},
+    {"task": "agenda", "schedule": "multi_day", "model": "large"},
+    {"task": "agenda", "max_prompt_tokens": 1500, "model": "small"},
+    {"model": "large"},
+]
+
+
+@pytest.fixture(autouse=True)
+def routes(monkeypatch):
+    monkeypatch.setattr(model_router, "ROUTES", ROUTES)
+    model_router.reset_stats()
+    yield
+    model_router.reset_stats()
+
+
+def test_route_by_task_schedule_and_size():
+    assert model_router.route("refine", 5000) == "small"
+    assert model_router.route("agenda", 200, "simple") == "small"
+    assert model_router.route("agenda", 200, "multi_day") == "large"
+    assert model_router.route("agenda", 1000, "scheduled") == "small"
+    assert model_router.route("agenda", 4000, "scheduled") == "large"
+    assert model_router.route("translate", 10) == "large"
+
+
+def test_calls_use_routed_model_and_record_latency(fake_llm):
+    llm = fake_llm(json.dumps({"title": "Sync", "items": []}))
+
+    asyncio.run(generate_agenda_content("Sync", "2025-01-15T09:00:00", "2025-01-15T09:30:00", "EN"))
+    asyncio.run(generate_agenda_content("Offsite", "2025-01-15T09:00:00", "2025-01-16T17:00:00", "EN"))
+    asyncio.run(generate_agenda_content(
+        "Review", "2025-01-15T09:00:00", "2025-01-15T12:00:00", "EN", email_content="context " * 2000
+    ))
+    asyncio.run(refine_agenda_text("Agenda"))
+
+    assert llm.models == ["small", "large", "large", "small"]
+    stats = model_router.model_stats()
+    assert stats["small"]["calls"] == 2
+    assert stats["large"]["calls"] == 2
+    assert stats["large"]["p95_seconds"] >= 0
+
+
+def test_failed_calls_are_counted(fake_llm, monkeypatch):
+    llm = fake_llm("")
+
+    async def offline(**kwargs):
+        raise ConnectionError("LLM offline")
+
+    monkeypatch.setattr(llm.chat.completions, "create", offline)
+    asyncio.run(refine_agenda_text("Agenda"))
+
+    assert model_router.model_stats()["small"] == {"calls": 1, "failed": 1}
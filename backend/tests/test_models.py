@@ -0,0 +1,54 @@
+from pathlib import Path
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+import main
+from services.models import Schedule, parse_agenda
+from services.time_slot_calculator import calculate_time_slots
+
+client = TestClient(main.app)
+
+
+def test_parse_agenda_coerces_numbers_and_keeps_extra_fields():
+    agenda = parse_agenda(json.dumps({
+        "title": "Dev Sync",
+        "items": [{"title": "Intro", "duration": 15, "owner": "Alice"}],
+        "notes": "bring laptops",
+    }))
+
+    assert agenda.items[0].duration == "15"
+    encoded = json.loads(agenda.to_json())
+    assert encoded["notes"] == "bring laptops"
+    assert encoded["items"][0]["owner"] == "Alice"
+    assert "days" not in encoded
+
+
+def test_parse_agenda_rejects_non_agenda_content():
+    assert parse_agenda("Plain text agenda") is None
+    assert parse_agenda("[1, 2]") is None
+    assert parse_agenda(json.dumps({"items": [{"title": ["not", "text"]}]})) is None
+
+
+def test_calculator_output_matches_schedule_model():
+    slots = calculate_time_slots("2025-01-15T09:00:00", "2025-01-16T17:00:00")
+    schedule = Schedule.model_validate(slots)
+    assert len(schedule.days) == 2
+    assert schedule.days[0].slots[0].start == "09:00"
+
+
+def test_stored_agenda_content_is_normalized(isolated_agenda_store):
+    resp = client.post("/agendas", data={
+        "topic": "Dev Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T10:00:00",
+        "agenda_content": '{ "title": "Dev Sync", "summary": null, "items": [ {"title": "Intro", "duration": 10} ] }',
+    })
+
+    assert resp.status_code == 200
+    assert resp.json()["agenda"] == '{"title":"Dev Sync","items":[{"title":"Intro","duration":"10"}]}'
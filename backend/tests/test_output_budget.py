@@ -0,0 +1,159 @@
+from pathlib import Path
+import json
+import math
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import agenda_generator, output_budget
+from services.output_budget import JsonEndDetector, agenda_budget
+from services.time_slot_calculator import calculate_time_slots
+
+client = TestClient(main.app)
+
+AGENDA = '{"title": "Sync {intern}", "items": [{"title": "Punkt \\"A\\" }"}]}'
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    output_budget.reset_stats()
+    yield
+    output_budget.reset_stats()
+
+
+def test_agenda_budget_follows_the_schedule():
+    short = agenda_budget(calculate_time_slots("2025-01-15T09:00", "2025-01-15T09:30"))
+    day = agenda_budget(calculate_time_slots("2025-01-15T09:00", "2025-01-15T17:00"))
+    week = agenda_budget(calculate_time_slots("2025-01-13T09:00", "2025-01-17T17:00"))
+
+    assert short < day < week
+    # 7 slots on one day
+    assert day == math.ceil(
+        (output_budget.BASE_TOKENS + output_budget.DAY_TOKENS + 7 * output_budget.TOKENS_PER_ITEM) * output_budget.BUDGET_MARGIN
+    )
+
+
+def test_multi_week_agendas_are_not_capped():
+    month = calculate_time_slots("2025-01-06T09:00", "2025-01-31T17:00")
+
+    assert agenda_budget(month) > output_budget.MAX_OUTPUT_TOKENS
+    assert output_budget.rewrite_budget(10 ** 6) == output_budget.MAX_OUTPUT_TOKENS
+
+
+def test_json_end_is_found_across_chunks_and_ignores_strings():
+    detector = JsonEndDetector()
+    text = "```json\n" + AGENDA + "\n```\nI hope this helps!"
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+
+    received = ""
+    for chunk in chunks:
+        end = detector.feed(chunk)
+        if end is not None:
+            received += chunk[:end]
+            break
+        received += chunk
+
+    assert received == "```json\n" + AGENDA
+    assert JsonEndDetector().feed('["a]", "b"] trailing') == len('["a]", "b"]')
+
+
+def test_generation_stops_once_the_json_is_complete(fake_llm):
+    llm = fake_llm(AGENDA + "\n\nExplanation: " + "bla " * 200)
+
+    resp = client.post("/generate-agenda", data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    })
+
+    assert resp.status_code == 200
+    assert json.loads(resp.json()["agenda"])["title"] == "Sync {intern}"
+    assert llm.streams[0].closed
+    assert llm.max_tokens == [agenda_budget(calculate_time_slots("2025-01-15T09:00:00", "2025-01-15T09:30:00"))]
+    assert output_budget.budget_stats() == {"agenda": {"calls": 1, "budget_hit": 0, "retried": 0, "stopped_early": 1}}
+
+
+def test_long_valid_bilingual_agenda_fits_the_budget(fake_llm):
+    schedule = calculate_time_slots("2025-01-15T09:00:00", "2025-01-15T17:00:00")
+    sentence = "Ausführliche Besprechung der Ergebnisse, offenen Punkte und Verantwortlichkeiten im Team "
+    items = [{
+        "time_slot": f"{slot['start']} - {slot['end']}",
+        "title": f"Arbeitsblock mit ausführlichem Titel zur Quartalsplanung {index}",
+        "description": (sentence * 2).strip() + ".",
+        "duration": f"{slot['duration_minutes']} mins",
+        "type": slot["type"],
+    } for index, slot in enumerate(schedule["days"][0]["slots"])]
+    german = json.dumps({
+        "title": "Quartalsplanung und Priorisierung der Roadmap für das kommende Geschäftsjahr",
+        "summary": (sentence * 3).strip() + ".",
+        "days": [{"date": "2025-01-15", "start_time": "09:00", "end_time": "17:00", "items": items}],
+    }, ensure_ascii=False, indent=4)
+
+    def reply(messages):
+        if "translator" not in messages[0]["content"]:
+            return german
+        # English output about as long as the German input, plus some
+        texts = json.loads(messages[-1]["content"].split("\n\n")[1])
+        return json.dumps([text + " (translated)" for text in texts], ensure_ascii=False, indent=4)
+
+    agenda_generator._translation_cache.clear()
+    llm = fake_llm(reply)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Quartalsplanung",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T17:00:00",
+        "language": "BOTH",
+    })
+    agenda_generator._translation_cache.clear()
+
+    assert resp.status_code == 200
+    assert resp.json()["translations"][0]["language"] == "EN"
+    assert len(llm.requests) == 2
+    stats = output_budget.budget_stats()
+    assert stats["agenda"]["budget_hit"] == stats["translate"]["budget_hit"] == 0
+
+
+def test_cut_off_answers_are_retried_with_a_larger_budget(fake_llm):
+    budget = agenda_budget(calculate_time_slots("2025-01-15T09:00:00", "2025-01-15T09:30:00"))
+    llm = fake_llm('{"title": "Sync", "summary": "' + "x" * (5 * budget) + '"}')
+
+    resp = client.post("/generate-agenda", data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    })
+
+    assert resp.status_code == 200
+    assert llm.max_tokens == [budget, output_budget.retry_budget(budget)]
+    assert output_budget.budget_stats()["agenda"] == {"calls": 2, "budget_hit": 1, "retried": 1, "stopped_early": 1}
+
+
+def test_agendas_cut_off_after_the_retry_are_errors(fake_llm):
+    llm = fake_llm('{"title": "Sync", "summary": "' + "bla " * 20000 + '"}')
+
+    resp = client.post("/generate-agenda", data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    })
+
+    assert resp.status_code == 502
+    assert resp.json()["detail"]["partial"].startswith('{"title": "Sync"')
+    assert len(llm.requests) == 2
+    assert output_budget.budget_stats()["agenda"]["budget_hit"] == 2
+    assert client.get("/health").json()["output_budget"]["agenda"]["budget_hit"] == 2
+
+
+def test_refined_text_is_not_cut_at_braces(fake_llm):
+    llm = fake_llm("{Begrüßung} und danach Ausblick")
+
+    resp = client.post("/refine-text", data={"text": "Begrüßung, Ausblick"})
+
+    assert resp.json()["refined_text"] == "{Begrüßung} und danach Ausblick"
+    assert llm.max_tokens[0] >= output_budget.MIN_OUTPUT_TOKENS
@@ -0,0 +1,70 @@
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import profiling
+
+client = TestClient(main.app)
+
+ICS_FORM = {
+    "topic": "Dev Sync",
+    "start_time": "2025-01-15T09:00:00",
+    "end_time": "2025-01-15T10:00:00",
+    "location": "Room A",
+    "agenda_content": "Plain agenda",
+}
+
+
+def slow_render_for_profile(*args):
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        pass
+    return b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+
+@pytest.fixture
+def profiling_enabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    yield tmp_path
+    profiling.set_sampling(False)
+
+
+def test_profiled_request_stores_folded_stacks(profiling_enabled, monkeypatch):
+    monkeypatch.setattr(main, "build_ics", slow_render_for_profile)
+
+    resp = client.post("/create-ics", data=ICS_FORM, headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["x-profile-id"]
+
+    folded = client.get(f"/profiles/{profile_id}").text
+    lines = folded.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "slow_render_for_profile (test_profiling.py)" in folded
+    assert client.get("/profiles/../../etc/passwd").status_code == 404
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.setattr(main, "build_ics", slow_render_for_profile)
+    resp = client.post("/create-ics", data=ICS_FORM, headers={"X-Profile": "1"})
+
+    assert "x-profile-id" not in resp.headers
+    assert client.post("/profiling/sampling", data={"enabled": "true"}).status_code == 403
+
+
+def test_process_wide_sampling_toggle(profiling_enabled):
+    assert client.post("/profiling/sampling", data={"enabled": "true"}).json()["enabled"] is True
+    time.sleep(0.05)
+    status = client.post("/profiling/sampling", data={"enabled": "false"}).json()
+
+    assert status["enabled"] is False
+    assert status["samples"] > 0
+    assert client.get("/profiling/sampling").text.strip()
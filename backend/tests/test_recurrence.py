@@ -0,0 +1,106 @@
+from pathlib import Path
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.ics_builder import build_ics
+from services.recurrence import describe_rule, series_occurrences, series_variations
+
+client = TestClient(main.app)
+
+
+def test_series_occurrences_expands_biweekly_rule():
+    occurrences = series_occurrences("RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=3", "2025-01-06T10:00:00")
+
+    assert occurrences == ["2025-01-06T10:00:00", "2025-01-20T10:00:00", "2025-02-03T10:00:00"]
+
+
+def test_series_occurrences_caps_unbounded_rules():
+    assert len(series_occurrences("FREQ=WEEKLY", "2025-01-06T10:00:00", limit=52)) == 52
+
+
+def test_series_occurrences_rejects_invalid_rules():
+    with pytest.raises(ValueError):
+        series_occurrences("WEEKLY", "2025-01-06T10:00:00")
+    with pytest.raises(ValueError):
+        series_occurrences("FREQ=SOMETIMES", "2025-01-06T10:00:00")
+
+
+def test_describe_rule():
+    assert describe_rule("FREQ=WEEKLY;COUNT=52") == "weekly"
+    assert describe_rule("FREQ=WEEKLY;INTERVAL=2") == "every 2 weeks"
+
+
+def test_series_variations_rotate_focus_over_work_items():
+    agenda = json.dumps({"days": [{"items": [
+        {"title": "Roadmap", "type": "work"},
+        {"title": "Coffee Break", "type": "coffee_break"},
+        {"title": "Hiring", "type": "work"},
+    ]}]})
+    occurrences = ["2025-01-06T10:00:00", "2025-01-13T10:00:00", "2025-01-20T10:00:00"]
+
+    focus = [v["focus"] for v in series_variations(agenda, occurrences)]
+    assert focus == ["Roadmap", "Hiring", "Roadmap"]
+
+
+def test_build_ics_exports_single_recurring_event():
+    ics = build_ics(
+        "Weekly Sync", "2025-01-06T10:00:00", "2025-01-06T11:00:00", "Room A",
+        json.dumps({"title": "Weekly Sync", "items": []}), "FREQ=WEEKLY;COUNT=52",
+    )
+
+    assert ics.count(b"BEGIN:VEVENT") == 1
+    assert b"RRULE:FREQ=WEEKLY;COUNT=52" in ics
+
+
+def test_build_ics_makes_utc_until_floating_like_dtstart():
+    ics = build_ics(
+        "Weekly Sync", "2025-01-06T10:00:00", "2025-01-06T11:00:00", "Room A",
+        json.dumps({"title": "Weekly Sync", "items": []}), "FREQ=WEEKLY;UNTIL=20250331T100000Z",
+    )
+
+    assert b"DTSTART:20250106T100000\r\n" in ics
+    assert b"RRULE:FREQ=WEEKLY;UNTIL=20250331T100000\r\n" in ics
+
+
+def test_generate_series_uses_one_completion(monkeypatch):
+    calls = []
+
+    async def fake_generate(*args):
+        calls.append(args)
+        return json.dumps({"title": "Weekly", "items": [{"title": "Status"}]})
+
+    monkeypatch.setattr(main, "generate_agenda_content", fake_generate)
+    resp = client.post("/generate-agenda", data={
+        "topic": "Weekly Sync",
+        "start_time": "2025-01-06T10:00:00",
+        "end_time": "2025-01-06T10:30:00",
+        "recurrence": "FREQ=WEEKLY;COUNT=52",
+        "variations": "true",
+    })
+
+    assert resp.status_code == 200
+    series = resp.json()["series"]
+    assert len(series["occurrences"]) == 52
+    assert series["variations"][1]["focus"] == "Status"
+    assert len(calls) == 1
+
+
+def test_create_ics_rejects_invalid_recurrence():
+    resp = client.post("/create-ics", data={
+        "topic": "Sync",
+        "start_time": "2025-01-06T10:00:00",
+        "end_time": "2025-01-06T11:00:00",
+        "location": "Room A",
+        "agenda_content": "{}",
+        "recurrence": "FREQ=NEVER",
+    })
+
+    assert resp.status_code == 400
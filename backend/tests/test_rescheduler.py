@@ -0,0 +1,183 @@
+from pathlib import Path
+import asyncio
+import json
+import re
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+import main
+from services.rescheduler import diff_schedules, reschedule_agenda
+from services.time_slot_calculator import calculate_time_slots
+
+client = TestClient(main.app)
+
+DAY = [
+    ("09:00 - 10:15", "Begrüßung", "work"),
+    ("10:15 - 10:45", "Kaffeepause", "coffee_break"),
+    ("10:45 - 12:30", "Roadmap", "work"),
+    ("12:30 - 13:30", "Mittagspause", "lunch_break"),
+    ("13:30 - 15:15", "Workshop", "work"),
+    ("15:15 - 15:45", "Kaffeepause", "coffee_break"),
+    ("15:45 - 17:00", "Abschluss", "work"),
+]
+AGENDA = json.dumps({
+    "title": "Planung",
+    "summary": "Quartalsplanung",
+    "days": [{"date": "2025-01-15", "start_time": "09:00", "end_time": "17:00", "items": [
+        {"time_slot": slot, "title": title, "description": f"{title} im Detail", "type": kind}
+        for slot, title, kind in DAY
+    ]}],
+})
+
+
+def new_items(messages):
+    """Answer a slot request with one numbered item per requested slot."""
+    count = int(re.search(r"exactly (\d+) items", messages[-1]["content"]).group(1))
+    return json.dumps({"items": [{"title": f"Neu {n}", "description": "Neu"} for n in range(count)]})
+
+
+def titles(content):
+    return [[item["title"] for item in day["items"]] for day in json.loads(content)["days"]]
+
+
+def test_diff_marks_resized_and_removed_slots():
+    old = calculate_time_slots("2025-01-15T09:00", "2025-01-15T17:00")
+    new = calculate_time_slots("2025-01-15T09:00", "2025-01-15T17:15")
+
+    diff, removed = diff_schedules(old, new)
+
+    assert [status for status, _ in diff[0]][:6] == ["unchanged"] * 6
+    assert diff[0][6][0] == "resized"
+    assert removed == 0
+
+
+def test_extending_the_end_regenerates_only_the_last_slot(fake_llm):
+    llm = fake_llm(new_items)
+
+    content, stats = asyncio.run(reschedule_agenda(
+        AGENDA, "Planung", "DE", "2025-01-15T09:00", "2025-01-15T17:00", "2025-01-15T09:00", "2025-01-15T17:15"
+    ))
+
+    assert len(llm.requests) == 1
+    assert "previously: Abschluss" in llm.requests[0][-1]["content"]
+    assert titles(content) == [["Begrüßung", "Kaffeepause", "Roadmap", "Mittagspause", "Workshop", "Kaffeepause", "Neu 0"]]
+    assert json.loads(content)["days"][0]["items"][-1]["time_slot"] == "15:45 - 17:15"
+    assert stats == {"kept": 3, "generated": 1, "removed": 0, "full_regeneration": False}
+
+
+def test_moving_to_another_day_keeps_everything(fake_llm):
+    llm = fake_llm(new_items)
+
+    content, stats = asyncio.run(reschedule_agenda(
+        AGENDA, "Planung", "DE", "2025-01-15T09:00", "2025-01-15T17:00", "2025-01-16T09:00", "2025-01-16T17:00"
+    ))
+
+    assert llm.requests == []
+    assert titles(content) == [[title for _, title, _ in DAY]]
+    assert json.loads(content)["days"][0]["date"] == "2025-01-16"
+    assert stats["generated"] == 0
+
+
+def test_adding_a_day_generates_only_that_day(fake_llm):
+    fake_llm(new_items)
+
+    content, stats = asyncio.run(reschedule_agenda(
+        AGENDA, "Planung", "DE", "2025-01-15T09:00", "2025-01-15T17:00", "2025-01-15T09:00", "2025-01-16T17:00"
+    ))
+
+    days = titles(content)
+    assert len(days) == 2
+    assert days[0][:6] == ["Begrüßung", "Kaffeepause", "Roadmap", "Mittagspause", "Workshop", "Kaffeepause"]
+    assert all(title.startswith("Neu") or "pause" in title.lower() for title in days[1])
+    assert stats["full_regeneration"] is False
+    assert stats["generated"] > 0
+
+
+def test_switching_to_a_short_meeting_regenerates_everything(fake_llm):
+    llm = fake_llm('{"title": "Kurz", "items": [{"title": "Punkt", "duration": "10 mins"}]}')
+
+    content, stats = asyncio.run(reschedule_agenda(
+        AGENDA, "Planung", "DE", "2025-01-15T09:00", "2025-01-15T17:00", "2025-01-15T09:00", "2025-01-15T09:30"
+    ))
+
+    assert len(llm.requests) == 1
+    assert json.loads(content)["title"] == "Kurz"
+    assert stats["full_regeneration"] is True
+
+
+def test_reschedule_endpoint_stores_a_new_version(fake_llm):
+    fake_llm(new_items)
+    created = client.post("/agendas", data={
+        "topic": "Planung",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T17:00:00",
+        "language": "DE",
+        "agenda_content": AGENDA,
+    }).json()
+
+    resp = client.post(f"/agendas/{created['id']}/reschedule", data={
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T17:15:00",
+    })
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["version"] == created["version"] + 1
+    assert body["end_time"] == "2025-01-15T17:15:00"
+    assert body["reschedule"]["generated"] == 1
+    assert "Neu 0" in body["agenda"]
+
+
+def test_reschedule_endpoint_rejects_stale_versions_and_bad_times(fake_llm):
+    fake_llm(new_items)
+    created = client.post("/agendas", data={
+        "topic": "Planung",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T17:00:00",
+        "agenda_content": AGENDA,
+    }).json()
+
+    stale = client.post(f"/agendas/{created['id']}/reschedule", data={
+        "start_time": "2025-01-15T09:00:00", "end_time": "2025-01-15T17:15:00", "base_version": 0,
+    })
+    invalid = client.post(f"/agendas/{created['id']}/reschedule", data={
+        "start_time": "morgen", "end_time": "2025-01-15T17:15:00",
+    })
+    missing = client.post("/agendas/unknown/reschedule", data={
+        "start_time": "2025-01-15T09:00:00", "end_time": "2025-01-15T17:15:00",
+    })
+
+    assert stale.status_code == 409
+    assert invalid.status_code == 400
+    assert missing.status_code == 404
+
+
+def test_regenerating_a_recurring_agenda_keeps_series_and_context(fake_llm):
+    llm = fake_llm('{"title": "Kurz", "items": [{"title": "Punkt", "duration": "10 mins"}]}')
+    generated = client.post("/generate-agenda", data={
+        "topic": "Planung",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T17:00:00",
+        "language": "DE",
+        "email_content": "Bitte das Budget 2025 besprechen.",
+        "recurrence": "FREQ=WEEKLY;COUNT=10",
+    }).json()
+
+    resp = client.post(f"/agendas/{generated['agenda_id']}/reschedule", data={
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    })
+
+    assert resp.status_code == 200
+    assert resp.json()["reschedule"]["full_regeneration"] is True
+    prompt = llm.requests[-1][-1]["content"]
+    assert "recurring meeting" in prompt
+    assert "Budget 2025" in prompt
+    assert resp.json()["recurrence"] == "FREQ=WEEKLY;COUNT=10"
+    ics = client.get(f"/agendas/{generated['agenda_id']}/ics")
+    assert b"RRULE:FREQ=WEEKLY;COUNT=10" in ics.content
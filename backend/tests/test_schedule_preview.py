@@ -0,0 +1,70 @@
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import schedule_preview
+from services.time_slot_calculator import calculate_time_slots
+
+client = TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def empty_preview_cache():
+    schedule_preview.clear_cache()
+    yield
+    schedule_preview.clear_cache()
+
+
+def test_preview_matches_calculator():
+    resp = client.get("/schedule-preview", params={
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-16T15:00:00",
+    })
+
+    assert resp.status_code == 200
+    assert resp.json() == calculate_time_slots("2025-01-15T09:00:00", "2025-01-16T15:00:00")
+
+
+def test_preview_is_memoized_on_rounded_times(monkeypatch):
+    calls = []
+    original = schedule_preview.calculate_time_slots
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(schedule_preview, "calculate_time_slots", counting)
+
+    first = schedule_preview.schedule_preview("2025-01-15T09:05:00", "2025-01-15T12:10:00")
+    second = schedule_preview.schedule_preview("2025-01-15T09:10:00Z", "2025-01-15T12:14:00")
+
+    assert first == second
+    assert len(calls) == 1
+    assert schedule_preview.preview_stats()["hits"] == 1
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        schedule_preview.schedule_preview("2025-01-15T09:05:00", "2025-01-15T12:10:00")
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+def test_preview_etag_and_invalid_ranges():
+    params = {"start_time": "2025-01-15T09:00:00", "end_time": "2025-01-15T10:00:00"}
+    first = client.get("/schedule-preview", params=params)
+    cached = client.get("/schedule-preview", params=params, headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    reversed_range = client.get("/schedule-preview", params={
+        "start_time": "2025-01-15T10:00:00",
+        "end_time": "2025-01-15T09:00:00",
+    })
+    assert reversed_range.status_code == 400
+    assert client.get("/schedule-preview", params={"start_time": "soon", "end_time": "later"}).status_code == 400
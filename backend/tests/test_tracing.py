@@ -0,0 +1,122 @@
+from pathlib import Path
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import tracing
+
+client = TestClient(main.app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, finished):
+        self.spans.append(finished.to_dict())
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    exporter = CollectingExporter()
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    return exporter.spans
+
+
+def test_every_response_carries_a_trace_id(exported):
+    resp = client.get("/health")
+
+    trace_id = resp.headers["X-Trace-Id"]
+    assert len(trace_id) == 32
+    assert exported[-1]["trace_id"] == trace_id
+    assert exported[-1]["name"] == "GET /health"
+    assert exported[-1]["attributes"]["http_status"] == 200
+
+
+def test_incoming_trace_ids_are_kept(exported):
+    from_header = client.get("/health", headers={"X-Trace-Id": TRACE_ID})
+    from_traceparent = client.get("/health", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+    malformed = client.get("/health", headers={"X-Trace-Id": "not a trace id"})
+
+    assert from_header.headers["X-Trace-Id"] == TRACE_ID
+    assert from_traceparent.headers["X-Trace-Id"] == TRACE_ID
+    assert exported[1]["parent_id"] == "00f067aa0ba902b7"
+    assert malformed.headers["X-Trace-Id"] != "not a trace id"
+
+
+def test_generation_stages_are_spans_of_the_request(exported, fake_llm):
+    fake_llm('```json\n{"title": "Sync", "items": [{"title": "Punkt"}]}\n```')
+
+    resp = client.post("/generate-agenda", headers={"X-Trace-Id": TRACE_ID}, data={
+        "topic": "Sync",
+        "start_time": "2025-01-15T09:00:00",
+        "end_time": "2025-01-15T09:30:00",
+    })
+
+    assert resp.status_code == 200
+    spans = {span["name"]: span for span in exported}
+    assert set(spans) >= {"schedule.calculate", "prompt.build", "llm.complete", "agenda.parse", "POST /generate-agenda"}
+    assert {span["trace_id"] for span in exported} == {TRACE_ID}
+    root = spans["POST /generate-agenda"]
+    assert spans["llm.complete"]["parent_id"] == root["span_id"]
+    llm = spans["llm.complete"]["attributes"]
+    assert llm["task"] == "agenda"
+    assert llm["prompt_tokens"] > 0 and llm["completion_tokens"] > 0
+    assert spans["schedule.calculate"]["attributes"]["schedule_type"] == "simple"
+
+
+def test_llm_spans_record_the_servers_token_usage(exported, fake_llm):
+    reply = "{Begrüßung} und danach Ausblick"
+    fake_llm(reply)
+
+    client.post("/refine-text", data={"text": "Begrüßung, Ausblick"})
+
+    llm = next(span for span in exported if span["name"] == "llm.complete")["attributes"]
+    assert llm["token_counts"] == "usage"
+    assert llm["completion_tokens"] == len(reply) // 3 + 1
+
+
+def test_failed_stages_record_the_error(exported):
+    with pytest.raises(ValueError):
+        with tracing.span("outer"):
+            with tracing.span("inner"):
+                raise ValueError("boom")
+
+    inner, outer = exported
+    assert inner["parent_id"] == outer["span_id"]
+    assert inner["error"] == "ValueError: boom"
+
+
+def test_jsonl_exporter_rotates(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = tracing.JsonlExporter(str(path), max_bytes=2000, backups=2)
+
+    for index in range(50):
+        exporter.export(tracing.Span(f"stage-{index}", TRACE_ID, None, {"index": index}))
+    exporter.close()
+
+    assert path.exists() and (tmp_path / "spans.jsonl.1").exists()
+    assert not (tmp_path / "spans.jsonl.3").exists()
+    last = json.loads(path.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["name"] == "stage-49"
+
+
+def test_otlp_payload():
+    finished = tracing.Span("llm.complete", TRACE_ID, "00f067aa0ba902b7", {"prompt_tokens": 12, "model": "m"})
+    finished.end_ns = finished.start_ns + 1000
+
+    exported_span = tracing.otlp_payload([finished])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+
+    assert exported_span["traceId"] == TRACE_ID
+    assert exported_span["parentSpanId"] == "00f067aa0ba902b7"
+    assert {"key": "prompt_tokens", "value": {"intValue": "12"}} in exported_span["attributes"]
+    assert exported_span["status"] == {"code": 1}
@@ -0,0 +1,64 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import worker_pool
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    yield
+    worker_pool.configure(kind="thread", size=2, queue_depth=64)
+
+
+def test_run_cpu_executes_off_the_event_loop():
+    worker_pool.configure(kind="thread", size=2)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        worker_thread = await worker_pool.run_cpu(threading.get_ident)
+        return loop_thread, worker_thread
+
+    loop_thread, worker_thread = asyncio.run(scenario())
+    assert loop_thread != worker_thread
+    assert worker_pool.pool_stats()["completed"] >= 1
+
+
+def test_inline_mode_runs_on_the_loop():
+    worker_pool.configure(kind="inline")
+
+    async def scenario():
+        return threading.get_ident(), await worker_pool.run_cpu(threading.get_ident)
+
+    loop_thread, worker_thread = asyncio.run(scenario())
+    assert loop_thread == worker_thread
+
+
+def test_run_cpu_rejects_when_queue_is_full():
+    worker_pool.configure(kind="thread", size=1, queue_depth=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(worker_pool.run_cpu(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(worker_pool.WorkerPoolFull):
+            await worker_pool.run_cpu(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(scenario())
+    assert worker_pool.pool_stats()["rejected"] >= 1
+
+
+def test_health_exposes_pool_configuration():
+    stats = TestClient(main.app).get("/health").json()["worker_pool"]
+    assert {"kind", "size", "queue_depth", "queued", "running"} <= stats.keys()
@@ -0,0 +1,64 @@
+from pathlib import Path
+import sys
+from datetime import date
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from services import bulk_scheduler, time_slot_calculator
+from services.bulk_scheduler import bulk_time_slots, schedules_from_columns
+from services.time_slot_calculator import calculate_time_slots
+from services.working_days import WorkingDayCalendar, load_holidays, parse_weekday_mask
+
+
+@pytest.fixture
+def german_calendar(monkeypatch):
+    calendar = WorkingDayCalendar(parse_weekday_mask("Mon-Fri"), load_holidays(["DE"]))
+    monkeypatch.setattr(time_slot_calculator, "working_calendar", calendar)
+    monkeypatch.setattr(bulk_scheduler, "working_calendar", calendar)
+    return calendar
+
+
+def test_parse_weekday_mask():
+    assert parse_weekday_mask("Mon-Fri") == [True] * 5 + [False] * 2
+    assert parse_weekday_mask("Sun-Thu") == [True] * 4 + [False, False, True]
+    assert parse_weekday_mask("mon, wed,Friday") == [True, False, True, False, True, False, False]
+
+
+def test_holiday_files_per_region(tmp_path):
+    (tmp_path / "XX.txt").write_text("# test region\n2025-03-03  # carnival\n\n2025-03-04\n", encoding="utf-8")
+    assert load_holidays(["XX", "missing"], tmp_path) == [date(2025, 3, 3), date(2025, 3, 4)]
+
+
+def test_counting_and_listing_across_years(german_calendar):
+    assert german_calendar.count_working_days(date(2025, 1, 1), date(2025, 12, 31)) == 252
+    assert german_calendar.count_working_days(date(2025, 1, 1), date(2027, 12, 31)) == sum(
+        german_calendar.count_working_days(date(year, 1, 1), date(year, 12, 31)) for year in (2025, 2026, 2027)
+    )
+    # Easter 2025: Good Friday and Easter Monday are holidays
+    assert german_calendar.working_days(date(2025, 4, 17), date(2025, 4, 23)) == [
+        date(2025, 4, 17), date(2025, 4, 22), date(2025, 4, 23)
+    ]
+    assert not german_calendar.is_working_day(date(2025, 10, 3))
+    assert german_calendar.working_days(date(2025, 1, 5), date(2025, 1, 1)) == []
+    # The index extends to years outside the first lookup
+    assert german_calendar.is_working_day(date(1999, 12, 31))
+
+
+def test_multi_day_schedule_skips_weekends_and_holidays(german_calendar):
+    schedule = calculate_time_slots("2025-04-17T09:00:00", "2025-04-23T15:00:00")
+
+    assert [day["date"] for day in schedule["days"]] == ["2025-04-17", "2025-04-22", "2025-04-23"]
+    assert schedule["days"][0]["start_time"] == "09:00"
+    assert schedule["days"][1]["start_time"] == "08:30"
+
+    columns = bulk_time_slots(["2025-04-17T09:00:00"], ["2025-04-23T15:00:00"])
+    assert schedules_from_columns(columns) == [schedule]
+
+
+def test_meeting_on_non_working_days_only_keeps_its_days(german_calendar):
+    schedule = calculate_time_slots("2025-05-31T10:00:00", "2025-06-01T16:00:00")
+    assert [day["date"] for day in schedule["days"]] == ["2025-05-31", "2025-06-01"]
@@ -23,20 +23,79 @@ Examples:
         --end "2024-12-05T11:00:00" \
         --agenda-json agenda.json \
         --output dev_sync.ics
+
+  Generate agendas (and ICS files) for a whole list of meetings:
+    python3 cli/agenda_cli.py batch \
+        --input meetings.jsonl \
+        --output-dir agendas/ \
+        --workers 4 \
+        --ics
+
+  Preview the computed time slots (no backend required):
+    python3 cli/agenda_cli.py schedule \
+        --start "2024-12-05T09:00:00" \
+        --end "2024-12-06T17:30:00"
+
+  Render ICS in-process instead of calling the backend:
+    python3 cli/agenda_cli.py --local ics ...
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import csv
+import hashlib
 import json
 import os
+import re
 import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List
 
 import requests
+from requests.adapters import HTTPAdapter
 
 API_BASE = os.environ.get("AGENDA_API_BASE", "http://localhost:8086")
+BACKEND_PATH = Path(os.environ.get("AGENDA_BACKEND_PATH", Path(__file__).resolve().parents[1] / "backend"))
+LOCAL_MODE = False
+# Seconds to wait for LLM-backed calls; also sent as X-Request-Timeout so the
+# backend stops generating once the CLI has given up
+GENERATE_TIMEOUT = 120
+REFINE_TIMEOUT = 60
+
+
+class BatchRowsFailed(Exception):
+    """Some batch rows failed; ``main`` reports it and exits with status 1."""
+
+
+# Trace ID sent as X-Trace-Id with every request of a command (one per batch
+# row), so the backend's spans of a slow or failed run can be looked up
+_trace = threading.local()
+
+
+def _new_trace_id() -> str:
+    _trace.id = uuid.uuid4().hex
+    return _trace.id
+
+
+def _trace_headers(headers: dict | None = None) -> dict:
+    return {**(headers or {}), "X-Trace-Id": getattr(_trace, "id", None) or _new_trace_id()}
+
+
+def _backend_module(name: str):
+    """Import ``services.<name>`` from the backend tree for in-process use."""
+    backend = str(BACKEND_PATH)
+    if backend not in sys.path:
+        sys.path.insert(0, backend)
+    import importlib
+
+    return importlib.import_module(f"services.{name}")
 
 
 def _print_json(payload: str | dict) -> None:
@@ -49,11 +108,52 @@ def _print_json(payload: str | dict) -> None:
     print(json.dumps(payload, indent=2, ensure_ascii=False))
 
 
-def _open_files(file_paths: Iterable[Path]):
-    for path in file_paths:
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stored_attachment_hashes(http, values: Iterable[str]) -> List[str]:
+    """Content hashes of attachments, uploading only those the backend does not have yet.
+
+    Values are file paths or ``sha256:<hash>`` references to attachments
+    uploaded earlier. Each file is checked with a HEAD request first, so
+    retries and re-generations send just the hashes.
+    """
+    hashes = []
+    for value in values:
+        if value.startswith("sha256:"):
+            hashes.append(value[len("sha256:"):].lower())
+            continue
+        path = Path(value)
         if not path.exists():
             raise FileNotFoundError(path)
-        yield ("files", (path.name, path.open("rb")))
+        digest = _file_hash(path)
+        if http.head(f"{API_BASE}/attachments/{digest}", headers=_trace_headers(), timeout=30).status_code != 200:
+            with path.open("rb") as handle:
+                resp = http.post(
+                    f"{API_BASE}/attachments", files={"file": (path.name, handle)}, headers=_trace_headers(), timeout=120
+                )
+            resp.raise_for_status()
+        hashes.append(digest)
+    return hashes
+
+
+def _calendar_paths(values: Iterable[str]) -> List[Path]:
+    """Expand calendar arguments; directories contribute all their *.ics files."""
+    paths = []
+    for value in values:
+        path = Path(value)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.ics")))
+        elif path.exists():
+            paths.append(path)
+        else:
+            raise FileNotFoundError(path)
+    return paths
 
 
 def _prompt_value(current: str | None, label: str, default: str | None = None) -> str:
@@ -100,11 +200,58 @@ def _ensure_file(path_value: str | None, label: str) -> Path:
     return path
 
 
+def _request_generate(http, data: dict, files: list | None = None) -> dict:
+    """POST to /generate-agenda using ``http`` (the requests module or a Session).
+
+    Returns the response payload: ``agenda`` plus the stored ``agenda_id``.
+    """
+    resp = http.post(
+        f"{API_BASE}/generate-agenda",
+        data=data,
+        files=files or None,
+        headers=_trace_headers({"X-Request-Timeout": str(GENERATE_TIMEOUT)}),
+        timeout=GENERATE_TIMEOUT,
+    )
+    resp.raise_for_status()
+    payload = resp.json()
+    series = payload.get("series")
+    if series:
+        print(
+            f"Series {series['recurrence']}: one agenda for {len(series['occurrences'])} occurrence(s).",
+            file=sys.stderr,
+        )
+    return payload
+
+
+def _request_stored_ics(http, agenda_id: str) -> bytes:
+    """GET the ICS of an agenda stored on the backend, without re-uploading it."""
+    resp = http.get(f"{API_BASE}/agendas/{agenda_id}/ics", headers=_trace_headers(), timeout=60)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _request_ics(http, data: dict) -> bytes:
+    """POST to /create-ics using ``http`` (the requests module or a Session).
+
+    With ``--local`` the calendar is rendered in-process by the backend's
+    ICS builder instead, so no server round-trip is needed.
+    """
+    if LOCAL_MODE:
+        ics_builder = _backend_module("ics_builder")
+        return ics_builder.build_ics(
+            data["topic"], data["start_time"], data["end_time"], data["location"], data["agenda_content"],
+            data.get("recurrence"),
+        )
+    resp = http.post(f"{API_BASE}/create-ics", data=data, headers=_trace_headers(), timeout=60)
+    resp.raise_for_status()
+    return resp.content
+
+
 def handle_generate(args: argparse.Namespace) -> None:
     topic = _prompt_value(args.topic, "Topic")
     start_time = _prompt_value(args.start, "Start datetime (ISO)")
     end_time = _prompt_value(args.end, "End datetime (ISO)")
-    language = _prompt_choice(args.language, "Language", ["DE", "EN"], default="DE")
+    language = _prompt_choice(args.language, "Language", ["DE", "EN", "BOTH"], default="DE")
 
     data = {
         "topic": topic,
@@ -112,20 +259,50 @@ def handle_generate(args: argparse.Namespace) -> None:
         "end_time": end_time,
         "language": language,
         "email_content": args.email or "",
+        "location": args.location,
     }
 
-    attachments = args.attachments or []
-    files = list(_open_files(Path(p) for p in attachments))
-
-    resp = requests.post(f"{API_BASE}/generate-agenda", data=data, files=files or None, timeout=120)
-    resp.raise_for_status()
-
-    agenda = resp.json().get("agenda", "")
+    if args.attendees:
+        data["attendees"] = args.attendees
+    if args.recurrence:
+        data["recurrence"] = args.recurrence
+
+    if args.attachments:
+        data["attachment_hashes"] = ",".join(_stored_attachment_hashes(requests, args.attachments))
+    # Calendars are streamed from disk and closed once the request is done
+    with contextlib.ExitStack() as stack:
+        files = [
+            ("calendars", (path.name, stack.enter_context(path.open("rb"))))
+            for path in _calendar_paths(args.calendars or [])
+        ]
+        payload = _request_generate(requests, data, files)
+    agenda = payload.get("agenda", "")
+    if payload.get("agenda_id"):
+        print(f"Agenda ID: {payload['agenda_id']}", file=sys.stderr)
+    compaction = payload.get("context_compaction")
+    if compaction and compaction.get("saved_bytes"):
+        print(
+            f"Email/attachment context compacted: {compaction['original_bytes']} -> "
+            f"{compaction['compacted_bytes']} bytes",
+            file=sys.stderr,
+        )
+    translations = payload.get("translations") or []
+    for language in payload.get("untranslated") or []:
+        print(f"Translation into {language} failed; no {language} agenda was stored", file=sys.stderr)
     if args.output:
         Path(args.output).write_text(agenda, encoding="utf-8")
         print(f"Agenda JSON stored at {args.output}")
+        for translation in translations:
+            # agenda.json -> agenda.EN.json
+            path = Path(args.output)
+            path = path.with_name(f"{path.stem}.{translation['language']}{path.suffix}")
+            path.write_text(translation["agenda"], encoding="utf-8")
+            print(f"{translation['language']} agenda (ID {translation['agenda_id']}) stored at {path}")
     else:
         _print_json(agenda)
+        for translation in translations:
+            print(f"{translation['language']} agenda (ID {translation['agenda_id']}):", file=sys.stderr)
+            _print_json(translation["agenda"])
 
 
 def handle_refine(args: argparse.Namespace) -> None:
@@ -137,10 +314,17 @@ def handle_refine(args: argparse.Namespace) -> None:
         instruction = args.instruction
 
     data = {"text": text, "instruction": instruction}
-    resp = requests.post(f"{API_BASE}/refine-text", data=data, timeout=60)
+    resp = requests.post(
+        f"{API_BASE}/refine-text",
+        data=data,
+        headers=_trace_headers({"X-Request-Timeout": str(REFINE_TIMEOUT)}),
+        timeout=REFINE_TIMEOUT,
+    )
     resp.raise_for_status()
 
     refined = resp.json().get("refined_text", "")
+    if resp.json().get("partial"):
+        print("Warning: the backend deadline cut the refined text short.", file=sys.stderr)
     if args.output:
         Path(args.output).write_text(refined, encoding="utf-8")
         print(f"Refined text stored at {args.output}")
@@ -149,6 +333,13 @@ def handle_refine(args: argparse.Namespace) -> None:
 
 
 def handle_ics(args: argparse.Namespace) -> None:
+    if args.agenda_id:
+        content = _request_stored_ics(requests, args.agenda_id)
+        output = Path(args.output or f"agenda_{args.agenda_id}.ics")
+        output.write_bytes(content)
+        print(f"ICS saved to {output}")
+        return
+
     topic = _prompt_value(args.topic, "Topic")
     location = _prompt_value(args.location, "Location")
     start_time = _prompt_value(args.start, "Start datetime (ISO)")
@@ -171,14 +362,231 @@ def handle_ics(args: argparse.Namespace) -> None:
         "location": location,
         "agenda_content": agenda_content,
     }
-    resp = requests.post(f"{API_BASE}/create-ics", data=data, timeout=60)
-    resp.raise_for_status()
+    if args.recurrence:
+        data["recurrence"] = args.recurrence
+    content = _request_ics(requests, data)
 
     output = Path(args.output or f"{args.topic.replace(' ', '_')}.ics")
-    output.write_bytes(resp.content)
+    output.write_bytes(content)
     print(f"ICS saved to {output}")
 
 
+def _format_schedule(schedule: Dict[str, Any]) -> str:
+    lines = [f"Type: {schedule['type']} ({schedule['duration_minutes']} min)"]
+    if schedule["type"] == "simple":
+        lines.append(f"Agenda points: {schedule['num_items']} (no time slots)")
+        return "\n".join(lines)
+    for index, day in enumerate(schedule["days"], start=1):
+        lines.append("")
+        lines.append(f"Day {index} - {day['date']} ({day['start_time']} - {day['end_time']})")
+        for slot in day["slots"]:
+            if slot["type"] == "social":
+                lines.append(f"  {slot['start']}          {slot['type']}")
+            else:
+                lines.append(f"  {slot['start']} - {slot['end']}  {slot['type']} ({slot['duration_minutes']} min)")
+    return "\n".join(lines)
+
+
+def handle_schedule(args: argparse.Namespace) -> None:
+    start_time = _prompt_value(args.start, "Start datetime (ISO)")
+    end_time = _prompt_value(args.end, "End datetime (ISO)")
+
+    busy = None
+    calendars = _calendar_paths(args.calendars or [])
+    if calendars:
+        busy_calendar = _backend_module("busy_calendar")
+        window = (
+            datetime.fromisoformat(start_time.replace("Z", "")),
+            datetime.fromisoformat(end_time.replace("Z", "")),
+        )
+        busy = busy_calendar.build_busy_index(calendars, window)
+
+    calculator = _backend_module("time_slot_calculator")
+    schedule = calculator.calculate_time_slots(start_time, end_time, busy)
+    if args.json:
+        _print_json(schedule)
+    else:
+        print(_format_schedule(schedule))
+
+
+def _row_value(row: Dict[str, Any], *keys: str, default: str = "") -> str:
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return str(value)
+    return default
+
+
+def _load_batch_rows(path: Path) -> List[Dict[str, Any]]:
+    """Read meetings from a JSONL or CSV file (one meeting per line/row)."""
+    if not path.exists():
+        raise SystemExit(f"Batch input '{path}' does not exist.")
+    with path.open(encoding="utf-8", newline="") as handle:
+        if path.suffix.lower() == ".csv":
+            return [dict(row) for row in csv.DictReader(handle)]
+        rows = []
+        for line_no, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise SystemExit(f"{path}:{line_no}: invalid JSON ({exc.msg}).")
+        return rows
+
+
+def _batch_row_name(row: Dict[str, Any]) -> str:
+    """Output file stem from the row's ``id``, else its start and topic, so reruns find earlier results."""
+    explicit = _row_value(row, "id")
+    if explicit:
+        return re.sub(r"[^A-Za-z0-9_.-]+", "_", explicit)
+    start = re.sub(r"[^0-9T]+", "", _row_value(row, "start", "start_time"))[:13]
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", _row_value(row, "topic")).strip("_")[:40]
+    return "_".join(part for part in (start, slug) if part) or "meeting"
+
+
+def _row_attachments(row: Dict[str, Any]) -> List[str]:
+    value = row.get("attachments") or []
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(";")]
+    return [part for part in value if part]
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    # Write next to the target and rename, so an interrupted run never
+    # leaves a half-written file that --resume would mistake for output.
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_bytes(content)
+    tmp.replace(path)
+
+
+def _process_batch_row(session: requests.Session, row: Dict[str, Any], stem: str,
+                       output_dir: Path, with_ics: bool, trace_id: str | None = None,
+                       overwrite: bool = False) -> str:
+    _trace.id = trace_id
+    topic = _row_value(row, "topic")
+    start_time = _row_value(row, "start", "start_time")
+    end_time = _row_value(row, "end", "end_time")
+    if not (topic and start_time and end_time):
+        raise ValueError("topic, start and end are required")
+
+    json_path = output_dir / f"{stem}.json"
+    ics_path = output_dir / f"{stem}.ics"
+
+    # With overwrite, existing outputs stay in place until the new ones replace them
+    agenda_id = None
+    if json_path.exists() and not overwrite:
+        agenda = json_path.read_text(encoding="utf-8")
+    else:
+        data = {
+            "topic": topic,
+            "start_time": start_time,
+            "end_time": end_time,
+            "language": _row_value(row, "language", default="DE").upper(),
+            "email_content": _row_value(row, "email", "email_content"),
+            "location": _row_value(row, "location", default="TBD"),
+        }
+        if _row_value(row, "recurrence"):
+            data["recurrence"] = _row_value(row, "recurrence")
+        if _row_attachments(row):
+            data["attachment_hashes"] = ",".join(_stored_attachment_hashes(session, _row_attachments(row)))
+        payload = _request_generate(session, data)
+        agenda = payload.get("agenda", "")
+        agenda_id = payload.get("agenda_id")
+        _write_atomic(json_path, agenda.encode("utf-8"))
+
+    write_ics = with_ics and (overwrite or not ics_path.exists())
+    if write_ics and agenda_id and not LOCAL_MODE:
+        # Freshly generated agendas are stored server-side; export by ID
+        _write_atomic(ics_path, _request_stored_ics(session, agenda_id))
+    elif write_ics:
+        ics_data = {
+            "topic": topic,
+            "start_time": start_time,
+            "end_time": end_time,
+            "location": _row_value(row, "location", default="TBD"),
+            "agenda_content": agenda,
+        }
+        if _row_value(row, "recurrence"):
+            ics_data["recurrence"] = _row_value(row, "recurrence")
+        content = _request_ics(session, ics_data)
+        _write_atomic(ics_path, content)
+    return "ok"
+
+
+def handle_batch(args: argparse.Namespace) -> None:
+    rows = _load_batch_rows(Path(args.input))
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, args.workers)
+
+    pending = []
+    skipped = 0
+    stems: Dict[str, int] = {}
+    for row in rows:
+        stem = _batch_row_name(row)
+        # Rows with the same id (or start and topic) get numbered stems
+        stems[stem] = stems.get(stem, 0) + 1
+        if stems[stem] > 1:
+            stem = f"{stem}_{stems[stem]}"
+        done = (output_dir / f"{stem}.json").exists()
+        if args.ics:
+            done = done and (output_dir / f"{stem}.ics").exists()
+        if done and not args.overwrite:
+            skipped += 1
+            continue
+        pending.append((stem, row))
+
+    total = len(pending)
+    print(f"Batch: {len(rows)} rows, {skipped} already done, {total} to process with {workers} worker(s).",
+          file=sys.stderr)
+    if not total:
+        return
+
+    # One keep-alive session shared by all workers; size the connection
+    # pool so every worker can hold its own connection to the backend.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    failures = []
+    finished = 0
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    _process_batch_row, session, row, stem, output_dir, args.ics, trace_id, args.overwrite
+                ): (stem, trace_id)
+                for stem, row, trace_id in ((stem, row, uuid.uuid4().hex) for stem, row in pending)
+            }
+            for future in as_completed(futures):
+                stem, trace_id = futures[future]
+                try:
+                    status = future.result()
+                except requests.HTTPError as exc:
+                    status = f"HTTP {exc.response.status_code} (trace {trace_id})"
+                    failures.append(stem)
+                except Exception as exc:  # pylint: disable=broad-except
+                    status = f"error: {exc} (trace {trace_id})"
+                    failures.append(stem)
+                # Results are collected on this thread only
+                finished += 1
+                elapsed = time.monotonic() - started
+                rate = finished / elapsed if elapsed > 0 else 0.0
+                print(f"[{finished}/{total}] {stem}: {status} ({rate:.2f} rows/s)", file=sys.stderr)
+    finally:
+        session.close()
+
+    elapsed = time.monotonic() - started
+    print(f"Batch finished: {total - len(failures)} ok, {len(failures)} failed in {elapsed:.1f}s.",
+          file=sys.stderr)
+    if failures:
+        raise BatchRowsFailed(f"{len(failures)} row(s) failed; rerun the same command to retry them.")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Console helper for Agenda Planner.")
     parser.add_argument(
@@ -186,6 +594,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=API_BASE,
         help=f"Agenda Planner backend base URL (default: {API_BASE})",
     )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Render ICS in-process with the backend code instead of calling the API "
+        "(generate/refine still use the backend for the LLM)",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -194,10 +608,20 @@ def build_parser() -> argparse.ArgumentParser:
     gen.add_argument("--location", default="TBD")
     gen.add_argument("--start", help="Start timestamp (ISO, e.g. 2024-05-01T09:00:00)")
     gen.add_argument("--end", help="End timestamp (ISO)")
-    gen.add_argument("--language", choices=["DE", "EN"])
+    gen.add_argument("--language", choices=["DE", "EN", "BOTH"])
     gen.add_argument("--email", help="Email context or notes")
-    gen.add_argument("--attachments", nargs="*", help="Optional file paths to include")
+    gen.add_argument(
+        "--attachments", nargs="*",
+        help="Optional file paths to include (uploaded once, then referenced by hash) or sha256:<hash> references",
+    )
     gen.add_argument("--output", help="Optional file to store agenda JSON")
+    gen.add_argument(
+        "--calendars",
+        nargs="*",
+        help="Attendee .ics files or directories; slots are placed around their busy time",
+    )
+    gen.add_argument("--attendees", help="Comma-separated attendee names with calendars on the server")
+    gen.add_argument("--recurrence", help="RRULE for a meeting series, e.g. FREQ=WEEKLY;INTERVAL=2;COUNT=26")
     gen.set_defaults(func=handle_generate)
 
     refine = subparsers.add_parser("refine", help="Refine agenda text via LLM")
@@ -215,20 +639,44 @@ def build_parser() -> argparse.ArgumentParser:
     ics.add_argument("--agenda-json", help="Path to agenda JSON file")
     ics.add_argument("--agenda-text", help="Path to agenda text file")
     ics.add_argument("--output", help="Destination .ics file")
+    ics.add_argument("--agenda-id", help="ID of an agenda stored on the backend (skips uploading content)")
+    ics.add_argument("--recurrence", help="RRULE to export a single recurring event, e.g. FREQ=WEEKLY;COUNT=52")
     ics.set_defaults(func=handle_ics)
 
+    schedule = subparsers.add_parser("schedule", help="Print the computed time slots for a meeting")
+    schedule.add_argument("--start", help="Start timestamp (ISO)")
+    schedule.add_argument("--end", help="End timestamp (ISO)")
+    schedule.add_argument("--json", action="store_true", help="Print the raw schedule JSON")
+    schedule.add_argument("--calendars", nargs="*", help="Attendee .ics files or directories to schedule around")
+    schedule.set_defaults(func=handle_schedule)
+
+    batch = subparsers.add_parser("batch", help="Generate agendas for every meeting in a JSONL/CSV file")
+    batch.add_argument("--input", required=True, help="Path to .jsonl or .csv file with one meeting per row")
+    batch.add_argument("--output-dir", required=True, help="Directory for per-row agenda JSON / ICS files")
+    batch.add_argument("--workers", type=int, default=4, help="Number of concurrent requests (default: 4)")
+    batch.add_argument("--ics", action="store_true", help="Also export an ICS file per row")
+    batch.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Regenerate rows whose outputs already exist (default: skip them to resume)",
+    )
+    batch.set_defaults(func=handle_batch)
+
     return parser
 
 
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
-    global API_BASE
+    global API_BASE, LOCAL_MODE
     API_BASE = args.api_base
+    LOCAL_MODE = args.local
+    trace_id = _new_trace_id()
     try:
         args.func(args)
     except requests.HTTPError as exc:
         print(f"HTTP error: {exc.response.status_code} {exc.response.text}", file=sys.stderr)
+        print(f"Trace ID: {trace_id}", file=sys.stderr)
         return 1
     except Exception as exc:  # pylint: disable=broad-except
         print(f"Error: {exc}", file=sys.stderr)
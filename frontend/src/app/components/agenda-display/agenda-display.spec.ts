@@ -6,12 +6,19 @@ import { ApiService } from '../../services/api';
 
 describe('AgendaDisplayComponent', () => {
   let component: AgendaDisplayComponent;
-  let apiServiceMock: { createIcs: ReturnType<typeof vi.fn>; refineText: ReturnType<typeof vi.fn> };
+  let apiServiceMock: {
+    createIcs: ReturnType<typeof vi.fn>;
+    downloadAgendaIcs: ReturnType<typeof vi.fn>;
+    updateAgenda: ReturnType<typeof vi.fn>;
+    refineText: ReturnType<typeof vi.fn>;
+  };
   let clipboardSpy: ReturnType<typeof vi.fn>;
 
   beforeEach(() => {
     apiServiceMock = {
       createIcs: vi.fn().mockReturnValue(of(new Blob())),
+      downloadAgendaIcs: vi.fn().mockReturnValue(of(new Blob())),
+      updateAgenda: vi.fn().mockReturnValue(of({ agenda_id: 'abc123', version: 2 })),
       refineText: vi.fn().mockReturnValue(of({ refined_text: 'updated' }))
     };
 
@@ -79,7 +86,40 @@ describe('AgendaDisplayComponent', () => {
     expect(clipboardSpy).toHaveBeenCalled();
   });
 
-  it('downloads the full agenda using edited content', () => {
+  it('downloads a stored agenda by ID without uploading it again', () => {
+    component.agendaId = 'abc123';
+    component.version = 1;
+    component.agendaContent = '{"title":"x","summary":"","items":[]}';
+    component.ngOnChanges({ agendaContent: {} as any });
+
+    component.downloadIcs();
+
+    expect(apiServiceMock.downloadAgendaIcs).toHaveBeenCalledWith('abc123');
+    expect(apiServiceMock.updateAgenda).not.toHaveBeenCalled();
+    expect(apiServiceMock.createIcs).not.toHaveBeenCalled();
+  });
+
+  it('saves edits as a new version before downloading by ID', () => {
+    component.agendaId = 'abc123';
+    component.version = 1;
+    component.agendaContent = '{"title":"x","summary":"","items":[]}';
+    component.ngOnChanges({ agendaContent: {} as any });
+    component.dayEditableContent = ['Edited content'];
+    component.topic = 'Topic';
+    component.startTime = '2024-05-01T09:00:00';
+    component.endTime = '2024-05-01T10:00:00';
+    component.location = 'Room';
+
+    component.downloadIcs();
+
+    expect(apiServiceMock.updateAgenda).toHaveBeenCalledWith(
+      'abc123', 1, 'Edited content', 'Topic', '2024-05-01T09:00:00', '2024-05-01T10:00:00', 'Room'
+    );
+    expect(apiServiceMock.downloadAgendaIcs).toHaveBeenCalledWith('abc123');
+    expect(component.version).toBe(2);
+  });
+
+  it('downloads the full agenda using edited content when it is not stored', () => {
     component.dayEditableContent = ['Edited content'];
     component.agendaContent = '{"title":"x"}';
     component.topic = 'Topic';
@@ -5,6 +5,7 @@ import { MatButtonModule } from '@angular/material/button';
 import { MatIconModule } from '@angular/material/icon';
 import { MatListModule } from '@angular/material/list';
 import { MatDividerModule } from '@angular/material/divider';
+import { Observable, switchMap, tap } from 'rxjs';
 import { ApiService } from '../../services/api';
 
 interface AgendaItem {
@@ -41,6 +42,8 @@ import { FormsModule } from '@angular/forms';
 })
 export class AgendaDisplayComponent implements OnChanges {
   @Input() agendaContent: string = '';
+  @Input() agendaId: string | null = null;
+  @Input() version: number | null = null;
   @Input() topic: string = '';
   @Input() location: string = '';
   @Input() startTime: string = '';
@@ -51,6 +54,8 @@ export class AgendaDisplayComponent implements OnChanges {
   rawContent: string = '';
 
   dayEditableContent: string[] = [];
+  // Edited content last saved to the stored agenda (initially the generated text)
+  private savedContent: string | null = null;
 
   constructor(private apiService: ApiService) { }
 
@@ -60,11 +65,13 @@ export class AgendaDisplayComponent implements OnChanges {
         this.parsedAgenda = JSON.parse(this.agendaContent);
         this.rawContent = '';
         this.initializeEditableContent();
+        this.savedContent = this.editedContent();
       } catch (e) {
         console.warn('Could not parse agenda as JSON, falling back to raw text');
         this.parsedAgenda = null;
         this.rawContent = this.agendaContent;
         this.dayEditableContent = [];
+        this.savedContent = this.editedContent();
       }
     }
   }
@@ -191,18 +198,40 @@ export class AgendaDisplayComponent implements OnChanges {
     navigator.clipboard.writeText(textParts.join('\n'));
   }
 
-  downloadIcs() {
-    // Use edited content if available, otherwise use original
-    let contentToSend = this.agendaContent;
+  // Edited content if available, otherwise the original
+  private editedContent(): string {
     if (this.dayEditableContent.length === 1) {
-      contentToSend = this.dayEditableContent[0];
+      return this.dayEditableContent[0];
     } else if (this.dayEditableContent.length > 1) {
       // Concatenate all days for multi-day agendas
-      contentToSend = this.dayEditableContent.join('\n\n' + '='.repeat(20) + '\n\n');
+      return this.dayEditableContent.join('\n\n' + '='.repeat(20) + '\n\n');
     }
+    return this.agendaContent;
+  }
 
-    // Use API service to download ICS file
-    this.apiService.createIcs(this.topic, this.startTime, this.endTime, this.location, contentToSend)
+  private fullAgendaIcs(): Observable<Blob> {
+    const contentToSend = this.editedContent();
+    if (!this.agendaId) {
+      return this.apiService.createIcs(this.topic, this.startTime, this.endTime, this.location, contentToSend);
+    }
+    const agendaId = this.agendaId;
+    if (contentToSend === this.savedContent || this.version === null) {
+      return this.apiService.downloadAgendaIcs(agendaId);
+    }
+    // Save the edits as a new version first, then export that version by ID
+    return this.apiService.updateAgenda(
+      agendaId, this.version, contentToSend, this.topic, this.startTime, this.endTime, this.location
+    ).pipe(
+      tap((record) => {
+        this.version = record.version;
+        this.savedContent = contentToSend;
+      }),
+      switchMap(() => this.apiService.downloadAgendaIcs(agendaId))
+    );
+  }
+
+  downloadIcs() {
+    this.fullAgendaIcs()
       .subscribe({
         next: (blob) => {
           const url = window.URL.createObjectURL(blob);
@@ -11,7 +11,7 @@ describe('AgendaFormComponent', () => {
   beforeEach(() => {
     apiServiceMock = {
       generateAgenda: vi.fn().mockReturnValue({
-        subscribe: vi.fn().mockImplementation(({ next }) => next({ agenda: '{}' }))
+        subscribe: vi.fn().mockImplementation(({ next }) => next({ agenda: '{}', agenda_id: 'abc123', version: 1 }))
       })
     };
     component = new AgendaFormComponent(new FormBuilder(), apiServiceMock as unknown as ApiService);
@@ -46,6 +46,8 @@ describe('AgendaFormComponent', () => {
     component.onSubmit();
 
     expect(apiServiceMock.generateAgenda).toHaveBeenCalled();
+    expect(component.generatedAgendaId).toBe('abc123');
+    expect(component.generatedVersion).toBe(1);
   });
 
   it('skips API call when form is invalid', () => {
@@ -39,6 +39,8 @@ export class AgendaFormComponent {
   selectedFiles: File[] = [];
   isLoading = false;
   generatedAgenda: string | null = null;
+  generatedAgendaId: string | null = null;
+  generatedVersion: number | null = null;
 
   timeOptions: string[] = [];
 
@@ -100,6 +102,8 @@ export class AgendaFormComponent {
     if (this.agendaForm.valid) {
       this.isLoading = true;
       this.generatedAgenda = null;
+      this.generatedAgendaId = null;
+      this.generatedVersion = null;
 
       const formValue = this.agendaForm.value;
 
@@ -113,10 +117,13 @@ export class AgendaFormComponent {
         this.toLocalISOString(endDateTime),
         formValue.language,
         formValue.emailContent,
-        this.selectedFiles
+        this.selectedFiles,
+        formValue.location
       ).subscribe({
         next: (response) => {
           this.generatedAgenda = response.agenda;
+          this.generatedAgendaId = response.agenda_id ?? null;
+          this.generatedVersion = response.version ?? null;
           this.isLoading = false;
         },
         error: (error) => {
@@ -1,8 +1,8 @@
 import { HttpClientTestingModule, HttpTestingController } from '@angular/common/http/testing';
 import { TestBed } from '@angular/core/testing';
-import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
 
-import { ApiService } from './api';
+import { ApiService, newTraceId } from './api';
 
 describe('ApiService', () => {
   let service: ApiService;
@@ -27,9 +27,40 @@ describe('ApiService', () => {
     const req = httpMock.expectOne('http://localhost:8086/generate-agenda');
     expect(req.request.method).toBe('POST');
     expect(req.request.body).toBeInstanceOf(FormData);
+    expect(req.request.headers.get('X-Trace-Id')).toMatch(/^[0-9a-f]{32}$/);
     req.flush({ agenda: '{}' });
   });
 
+  it('creates trace IDs without crypto.randomUUID outside secure contexts', () => {
+    vi.stubGlobal('crypto', { getRandomValues: (bytes: Uint8Array) => bytes.fill(171) });
+    expect(newTraceId()).toBe('ab'.repeat(16));
+
+    vi.stubGlobal('crypto', undefined);
+    expect(newTraceId()).toMatch(/^[0-9a-f]{32}$/);
+    vi.unstubAllGlobals();
+  });
+
+  it('downloads stored agendas as ICS by ID', () => {
+    service.downloadAgendaIcs('abc123').subscribe(blob => {
+      expect(blob).toBeTruthy();
+    });
+
+    const req = httpMock.expectOne('http://localhost:8086/agendas/abc123/ics');
+    expect(req.request.method).toBe('GET');
+    expect(req.request.responseType).toBe('blob');
+    req.flush(new Blob());
+  });
+
+  it('saves edited agendas as a new version', () => {
+    service.updateAgenda('abc123', 1, 'Edited', 'Topic', 'start', 'end', 'Room').subscribe();
+
+    const req = httpMock.expectOne('http://localhost:8086/agendas/abc123');
+    expect(req.request.method).toBe('PUT');
+    expect(req.request.body.get('base_version')).toBe('1');
+    expect(req.request.body.get('agenda_content')).toBe('Edited');
+    req.flush({ agenda_id: 'abc123', version: 2 });
+  });
+
   it('sends ICS creation requests as blobs', () => {
     service.createIcs('Topic', 'start', 'end', 'Room', '{}').subscribe(blob => {
       expect(blob).toBeTruthy();
@@ -1,7 +1,23 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpHeaders } from '@angular/common/http';
 import { Observable } from 'rxjs';
 
+// 32 hex chars; crypto.randomUUID() only exists in secure contexts (HTTPS or localhost)
+export function newTraceId(): string {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID().replace(/-/g, '');
+  }
+  const bytes = new Uint8Array(16);
+  if (typeof crypto !== 'undefined' && typeof crypto.getRandomValues === 'function') {
+    crypto.getRandomValues(bytes);
+  } else {
+    for (let i = 0; i < bytes.length; i++) {
+      bytes[i] = Math.floor(Math.random() * 256);
+    }
+  }
+  return Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
 @Injectable({
   providedIn: 'root'
 })
@@ -10,12 +26,20 @@ export class ApiService {
 
   constructor(private http: HttpClient) { }
 
-  generateAgenda(topic: string, startTime: string, endTime: string, language: string, emailContent: string, files: File[]): Observable<any> {
+  // A fresh trace ID per request lets the backend's spans be found from the browser's network tab
+  private traceHeaders(): HttpHeaders {
+    return new HttpHeaders({ 'X-Trace-Id': newTraceId() });
+  }
+
+  generateAgenda(topic: string, startTime: string, endTime: string, language: string, emailContent: string, files: File[], location?: string): Observable<any> {
     const formData = new FormData();
     formData.append('topic', topic);
     formData.append('start_time', startTime);
     formData.append('end_time', endTime);
     formData.append('language', language);
+    if (location) {
+      formData.append('location', location);
+    }
     if (emailContent) {
       formData.append('email_content', emailContent);
     }
@@ -24,7 +48,7 @@ export class ApiService {
         formData.append('files', file, file.name);
       });
     }
-    return this.http.post(`${this.apiUrl}/generate-agenda`, formData);
+    return this.http.post(`${this.apiUrl}/generate-agenda`, formData, { headers: this.traceHeaders() });
   }
 
   refineText(text: string, instruction?: string): Observable<any> {
@@ -33,9 +57,26 @@ export class ApiService {
     if (instruction) {
       formData.append('instruction', instruction);
     }
-    return this.http.post(`${this.apiUrl}/refine-text`, formData);
+    return this.http.post(`${this.apiUrl}/refine-text`, formData, { headers: this.traceHeaders() });
+  }
+
+  // Generated agendas are stored server-side; export them by ID instead of uploading the content again
+  downloadAgendaIcs(agendaId: string): Observable<Blob> {
+    return this.http.get(`${this.apiUrl}/agendas/${agendaId}/ics`, { headers: this.traceHeaders(), responseType: 'blob' });
+  }
+
+  updateAgenda(agendaId: string, baseVersion: number, agendaContent: string, topic: string, startTime: string, endTime: string, location: string): Observable<any> {
+    const formData = new FormData();
+    formData.append('base_version', String(baseVersion));
+    formData.append('agenda_content', agendaContent);
+    formData.append('topic', topic);
+    formData.append('start_time', startTime);
+    formData.append('end_time', endTime);
+    formData.append('location', location);
+    return this.http.put(`${this.apiUrl}/agendas/${agendaId}`, formData, { headers: this.traceHeaders() });
   }
 
+  // Only for content that is not stored, e.g. a single day of a multi-day agenda
   createIcs(topic: string, startTime: string, endTime: string, location: string, agendaContent: string): Observable<Blob> {
     const formData = new FormData();
     formData.append('topic', topic);
@@ -44,6 +85,6 @@ export class ApiService {
     formData.append('location', location);
     formData.append('agenda_content', agendaContent);
 
-    return this.http.post(`${this.apiUrl}/create-ics`, formData, { responseType: 'blob' });
+    return this.http.post(`${this.apiUrl}/create-ics`, formData, { headers: this.traceHeaders(), responseType: 'blob' });
   }
 }
@@ -1,3 +1,4 @@
+import hashlib
 import json
 from pathlib import Path
 
@@ -33,6 +34,69 @@ def test_generate_writes_agenda_file(tmp_path):
     assert data["title"] == "Dev <> Research"
 
 
+@responses.activate
+def test_generate_closes_calendar_files(monkeypatch, tmp_path):
+    calendar = tmp_path / "alice.ics"
+    calendar.write_text("BEGIN:VCALENDAR\nEND:VCALENDAR\n", encoding="utf-8")
+    api_base = "http://mock-api"
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": "{}"})
+    sent = []
+    request_generate = agenda_cli._request_generate
+
+    def recording(http, data, files=None):
+        sent.extend(handle for _, (_, handle) in files)
+        return request_generate(http, data, files)
+
+    monkeypatch.setattr(agenda_cli, "_request_generate", recording)
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "generate",
+        "--topic", "Sync",
+        "--start", "2025-01-15T09:00:00",
+        "--end", "2025-01-15T10:00:00",
+        "--language", "EN",
+        "--calendars", str(calendar),
+    ])
+
+    assert exit_code == 0
+    assert len(sent) == 1 and sent[0].closed
+
+
+@responses.activate
+def test_generate_both_languages_writes_translation(tmp_path):
+    output = tmp_path / "agenda.json"
+    api_base = "http://mock-api"
+    responses.post(
+        f"{api_base}/generate-agenda",
+        json={
+            "agenda": json.dumps({"title": "Teamtreffen"}),
+            "agenda_id": "de1",
+            "version": 1,
+            "language": "DE",
+            "translations": [
+                {"language": "EN", "agenda": json.dumps({"title": "Team meeting"}), "agenda_id": "en1", "version": 1},
+            ],
+        },
+        status=200,
+    )
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "generate",
+        "--topic", "Teamtreffen",
+        "--location", "HQ Berlin",
+        "--start", "2025-01-15T09:00:00",
+        "--end", "2025-01-15T10:00:00",
+        "--language", "BOTH",
+        "--output", str(output),
+    ])
+
+    assert exit_code == 0
+    assert "language=BOTH" in responses.calls[0].request.body
+    assert json.loads(output.read_text(encoding="utf-8"))["title"] == "Teamtreffen"
+    assert json.loads((tmp_path / "agenda.EN.json").read_text(encoding="utf-8"))["title"] == "Team meeting"
+
+
 @responses.activate
 def test_refine_uses_instruction_and_outputs_file(tmp_path):
     text_file = tmp_path / "agenda.txt"
@@ -56,6 +120,7 @@ def test_refine_uses_instruction_and_outputs_file(tmp_path):
 
     assert exit_code == 0
     assert output.read_text(encoding="utf-8") == "Refined EN text"
+    assert responses.calls[0].request.headers["X-Request-Timeout"] == str(agenda_cli.REFINE_TIMEOUT)
 
 
 @responses.activate
@@ -87,23 +152,65 @@ def test_ics_downloads_calendar_file(tmp_path):
 
 
 @responses.activate
-def test_generate_supports_attachments(tmp_path):
+def test_generate_uploads_new_attachments_and_references_them_by_hash(tmp_path):
     attachment = tmp_path / "notes.txt"
     attachment.write_text("Notes", encoding="utf-8")
+    digest = hashlib.sha256(b"Notes").hexdigest()
+
+    api_base = "http://mock-api"
+    responses.head(f"{api_base}/attachments/{digest}", status=404)
+    responses.post(f"{api_base}/attachments", json={"hash": digest, "filename": "notes.txt", "size": 5}, status=200)
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": "{}"}, status=200)
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "generate",
+        "--topic", "Exchange Dev <> Research",
+        "--location", "HQ Berlin",
+        "--start", "2025-01-15T09:00:00",
+        "--end", "2025-01-15T10:00:00",
+        "--language", "EN",
+        "--attachments", str(attachment),
+    ])
 
+    assert exit_code == 0
+    assert [call.request.method for call in responses.calls] == ["HEAD", "POST", "POST"]
+    assert b"Notes" in responses.calls[1].request.body
+    generate_body = responses.calls[2].request.body
+    assert f"attachment_hashes={digest}" in generate_body
+    assert "Notes" not in generate_body
+    trace_ids = {call.request.headers["X-Trace-Id"] for call in responses.calls}
+    assert len(trace_ids) == 1 and len(trace_ids.pop()) == 32
+
+
+@responses.activate
+def test_http_errors_report_the_trace_id(capsys):
     api_base = "http://mock-api"
-    captured_headers = {}
+    responses.post(f"{api_base}/generate-agenda", json={"detail": "boom"}, status=500)
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "generate",
+        "--topic", "Sync",
+        "--start", "2025-01-15T09:00:00",
+        "--end", "2025-01-15T10:00:00",
+        "--language", "EN",
+    ])
 
-    def _callback(request):
-        captured_headers["content_type"] = request.headers.get("Content-Type")
-        return 200, {}, json.dumps({"agenda": "{}"})
+    assert exit_code == 1
+    trace_id = responses.calls[0].request.headers["X-Trace-Id"]
+    assert f"Trace ID: {trace_id}" in capsys.readouterr().err
 
-    responses.add_callback(
-        responses.POST,
-        f"{api_base}/generate-agenda",
-        callback=_callback,
-        content_type="application/json",
-    )
+
+@responses.activate
+def test_generate_skips_upload_of_known_attachments(tmp_path):
+    attachment = tmp_path / "notes.txt"
+    attachment.write_text("Notes", encoding="utf-8")
+    digest = hashlib.sha256(b"Notes").hexdigest()
+
+    api_base = "http://mock-api"
+    responses.head(f"{api_base}/attachments/{digest}", status=200)
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": "{}"}, status=200)
 
     exit_code = agenda_cli.main([
         "--api-base", api_base,
@@ -113,11 +220,12 @@ def test_generate_supports_attachments(tmp_path):
         "--start", "2025-01-15T09:00:00",
         "--end", "2025-01-15T10:00:00",
         "--language", "EN",
-        "--attachments", str(attachment),
+        "--attachments", str(attachment), "sha256:" + "a" * 64,
     ])
 
     assert exit_code == 0
-    assert "multipart/form-data" in captured_headers.get("content_type", "")
+    assert len(responses.calls) == 2
+    assert f"attachment_hashes={digest}%2C{'a' * 64}" in responses.calls[1].request.body
 
 
 @responses.activate
@@ -173,3 +281,228 @@ def test_ics_prompts_for_agenda_content(monkeypatch, tmp_path):
     assert exit_code == 0
     assert output_file.read_bytes() == b"ICS"
 
+
+
+@responses.activate
+def test_batch_generates_outputs_per_row(tmp_path):
+    meetings = tmp_path / "meetings.jsonl"
+    meetings.write_text(
+        "\n".join(json.dumps(row) for row in [
+            {"id": "sync-1", "topic": "Dev Sync", "start": "2025-01-15T09:00:00", "end": "2025-01-15T10:00:00"},
+            {"topic": "Research Review", "start": "2025-01-16T09:00:00", "end": "2025-01-16T12:00:00",
+             "language": "EN", "location": "Room B"},
+        ]),
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+
+    api_base = "http://mock-api"
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": json.dumps({"title": "Generated"})})
+    responses.post(f"{api_base}/create-ics", body=b"ICS")
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "batch",
+        "--input", str(meetings),
+        "--output-dir", str(out_dir),
+        "--workers", "2",
+        "--ics",
+    ])
+
+    assert exit_code == 0
+    assert json.loads((out_dir / "sync-1.json").read_text(encoding="utf-8"))["title"] == "Generated"
+    assert (out_dir / "sync-1.ics").read_bytes() == b"ICS"
+    assert (out_dir / "20250116T0900_Research_Review.json").exists()
+    assert (out_dir / "20250116T0900_Research_Review.ics").exists()
+    assert not list(out_dir.glob("*.part"))
+
+
+@responses.activate
+def test_batch_resume_skips_finished_rows(tmp_path):
+    meetings = tmp_path / "meetings.csv"
+    meetings.write_text(
+        "id,topic,start,end\n"
+        "a,Dev Sync,2025-01-15T09:00:00,2025-01-15T10:00:00\n"
+        "b,Planning,2025-01-16T09:00:00,2025-01-16T10:00:00\n",
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (out_dir / "a.json").write_text('{"title": "Existing"}', encoding="utf-8")
+
+    api_base = "http://mock-api"
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": '{"title": "New"}'})
+    ics_call = responses.post(f"{api_base}/create-ics", body=b"ICS")
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "batch",
+        "--input", str(meetings),
+        "--output-dir", str(out_dir),
+        "--ics",
+    ])
+
+    assert exit_code == 0
+    # Row "a" only needed its ICS; its agenda JSON is reused, not regenerated.
+    assert len(responses.calls) == 3
+    assert ics_call.call_count == 2
+    assert json.loads((out_dir / "a.json").read_text(encoding="utf-8"))["title"] == "Existing"
+    assert json.loads((out_dir / "b.json").read_text(encoding="utf-8"))["title"] == "New"
+
+    responses.calls.reset()
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "batch",
+        "--input", str(meetings),
+        "--output-dir", str(out_dir),
+        "--ics",
+    ])
+    assert exit_code == 0
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_batch_overwrite_keeps_outputs_until_replaced(tmp_path):
+    meetings = tmp_path / "meetings.csv"
+    meetings.write_text(
+        "id,topic,start,end\n"
+        "a,Dev Sync,2025-01-15T09:00:00,2025-01-15T10:00:00\n",
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (out_dir / "a.json").write_text('{"title": "Existing"}', encoding="utf-8")
+
+    api_base = "http://mock-api"
+    responses.post(f"{api_base}/generate-agenda", status=502, json={"detail": "cut off"})
+    args = ["--api-base", api_base, "batch", "--input", str(meetings), "--output-dir", str(out_dir), "--overwrite"]
+
+    assert agenda_cli.main(args) == 1
+    assert json.loads((out_dir / "a.json").read_text(encoding="utf-8"))["title"] == "Existing"
+
+    responses.replace(responses.POST, f"{api_base}/generate-agenda", json={"agenda": '{"title": "New"}'})
+    assert agenda_cli.main(args) == 0
+    assert json.loads((out_dir / "a.json").read_text(encoding="utf-8"))["title"] == "New"
+
+
+def test_schedule_prints_slots_without_backend(capsys):
+    exit_code = agenda_cli.main([
+        "schedule",
+        "--start", "2025-01-15T08:30:00",
+        "--end", "2025-01-15T17:30:00",
+    ])
+
+    assert exit_code == 0
+    out = capsys.readouterr().out
+    assert "Type: scheduled" in out
+    assert "12:30 - 13:30  lunch_break (60 min)" in out
+
+
+@responses.activate
+def test_local_ics_renders_without_http(tmp_path):
+    agenda = tmp_path / "agenda.json"
+    agenda.write_text(json.dumps({"title": "Dev Sync", "items": [{"title": "Intro"}]}), encoding="utf-8")
+    ics_output = tmp_path / "dev_sync.ics"
+
+    exit_code = agenda_cli.main([
+        "--local",
+        "ics",
+        "--topic", "Dev Sync",
+        "--location", "Room A",
+        "--start", "2025-01-15T09:00:00",
+        "--end", "2025-01-15T10:00:00",
+        "--agenda-json", str(agenda),
+        "--output", str(ics_output),
+    ])
+
+    assert exit_code == 0
+    assert len(responses.calls) == 0
+    content = ics_output.read_bytes()
+    assert content.startswith(b"BEGIN:VCALENDAR")
+    assert b"DTSTART:20250115T090000" in content
+
+
+def test_schedule_places_slots_around_calendar_busy_time(tmp_path, capsys):
+    calendars = tmp_path / "calendars"
+    calendars.mkdir()
+    (calendars / "alice.ics").write_text(
+        "BEGIN:VCALENDAR\nBEGIN:VEVENT\nDTSTART:20250115T093000\nDTEND:20250115T100000\nEND:VEVENT\nEND:VCALENDAR\n",
+        encoding="utf-8",
+    )
+
+    exit_code = agenda_cli.main([
+        "schedule",
+        "--start", "2025-01-15T08:30:00",
+        "--end", "2025-01-15T12:30:00",
+        "--calendars", str(calendars),
+    ])
+
+    assert exit_code == 0
+    out = capsys.readouterr().out
+    assert "08:30 - 09:30  work (60 min)" in out
+    assert "10:00 - 10:15  work (15 min)" in out
+
+
+def test_local_ics_with_recurrence_exports_rrule(tmp_path):
+    agenda = tmp_path / "agenda.json"
+    agenda.write_text(json.dumps({"title": "Weekly Sync"}), encoding="utf-8")
+    ics_output = tmp_path / "weekly.ics"
+
+    exit_code = agenda_cli.main([
+        "--local",
+        "ics",
+        "--topic", "Weekly Sync",
+        "--location", "Room A",
+        "--start", "2025-01-06T10:00:00",
+        "--end", "2025-01-06T11:00:00",
+        "--agenda-json", str(agenda),
+        "--recurrence", "FREQ=WEEKLY;INTERVAL=2;COUNT=26",
+        "--output", str(ics_output),
+    ])
+
+    assert exit_code == 0
+    content = ics_output.read_bytes()
+    assert content.count(b"BEGIN:VEVENT") == 1
+    assert b"RRULE:FREQ=WEEKLY;COUNT=26;INTERVAL=2" in content
+
+
+@responses.activate
+def test_ics_by_agenda_id_downloads_stored_calendar(tmp_path):
+    api_base = "http://mock-api"
+    responses.get(f"{api_base}/agendas/abc123/ics", body=b"STORED-ICS")
+    ics_output = tmp_path / "stored.ics"
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "ics",
+        "--agenda-id", "abc123",
+        "--output", str(ics_output),
+    ])
+
+    assert exit_code == 0
+    assert ics_output.read_bytes() == b"STORED-ICS"
+
+
+@responses.activate
+def test_batch_exports_ics_by_stored_agenda_id(tmp_path):
+    meetings = tmp_path / "meetings.jsonl"
+    meetings.write_text(
+        json.dumps({"id": "m1", "topic": "Dev Sync", "start": "2025-01-15T09:00:00", "end": "2025-01-15T10:00:00"}),
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+
+    api_base = "http://mock-api"
+    responses.post(f"{api_base}/generate-agenda", json={"agenda": "{}", "agenda_id": "id-1", "version": 1})
+    responses.get(f"{api_base}/agendas/id-1/ics", body=b"ICS-BY-ID")
+
+    exit_code = agenda_cli.main([
+        "--api-base", api_base,
+        "batch",
+        "--input", str(meetings),
+        "--output-dir", str(out_dir),
+        "--ics",
+    ])
+
+    assert exit_code == 0
+    assert (out_dir / "m1.ics").read_bytes() == b"ICS-BY-ID"